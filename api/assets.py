@@ -0,0 +1,229 @@
+"""
+Static asset pipeline: content-hashed filenames plus precompressed variants.
+
+`python -m api.assets` (also run at startup when static/ changed) copies
+every file under static/ to static/dist/ as name.<hash>.ext, next to
+.gz and .br (if the optional `brotli` package is installed) variants, and
+writes static/dist/manifest.json. Templates call static_url('js/game.js')
+to get the hashed URL.
+
+AssetFiles serves /static: a hashed path gets the best variant the client
+accepts, with an immutable one-year cache (the URL changes whenever the
+content does). Plain paths are still served as before. Responses are
+FileResponses built from a stat taken at load time, so servers offering
+the ASGI pathsend extension send the file with sendfile.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+
+from api.cache import accepted_encodings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+STATIC_DIR = BASE_DIR / "static"
+DIST_DIR = STATIC_DIR / "dist"
+MANIFEST = "manifest.json"
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+HASH_LENGTH = 10
+# Keep a compressed variant only if it saves at least this much (GIF/PNG don't)
+MIN_SAVING = 0.05
+# Preference order when the client accepts several
+ENCODINGS = ("br", "gzip")
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def _hashed_name(name: str, digest: str) -> str:
+    stem, dot, ext = name.rpartition(".")
+    return f"{stem}.{digest}.{ext}" if dot else f"{name}.{digest}"
+
+
+def _compress(data: bytes) -> dict[str, bytes]:
+    variants = {"gzip": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, quality=11)
+    limit = len(data) * (1 - MIN_SAVING)
+    return {enc: body for enc, body in variants.items() if len(body) <= limit}
+
+
+def _sources(source_dir: Path, out_dir: Path) -> list[Path]:
+    return sorted(
+        p for p in source_dir.rglob("*")
+        if p.is_file() and out_dir not in p.parents and not p.name.startswith(".")
+    )
+
+
+def build_assets(source_dir: Path = STATIC_DIR, out_dir: Path = DIST_DIR, force: bool = False) -> dict:
+    """
+    Fingerprint and precompress every file under source_dir into out_dir.
+    Files whose size and mtime match the existing manifest are skipped.
+
+    Returns the manifest: logical name -> {hashed, size, mtime_ns, encodings}.
+    """
+    manifest_path = out_dir / MANIFEST
+    previous: dict = {}
+    if manifest_path.exists() and not force:
+        try:
+            previous = json.loads(manifest_path.read_text())["files"]
+        except (OSError, ValueError, KeyError):
+            previous = {}
+
+    files = {}
+    changed = 0
+    for path in _sources(source_dir, out_dir):
+        name = path.relative_to(source_dir).as_posix()
+        stat = path.stat()
+        entry = previous.get(name)
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry.get("brotli", False) == (brotli is not None)
+            and (out_dir / entry["hashed"]).exists()
+        ):
+            files[name] = entry
+            continue
+
+        data = path.read_bytes()
+        hashed = _hashed_name(name, hashlib.sha256(data).hexdigest()[:HASH_LENGTH])
+        target = out_dir / hashed
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, target)
+        variants = _compress(data)
+        for encoding, body in variants.items():
+            (out_dir / (hashed + _SUFFIXES[encoding])).write_bytes(body)
+        files[name] = {
+            "hashed": hashed,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "brotli": brotli is not None,
+            "encodings": {enc: len(body) for enc, body in variants.items()},
+        }
+        changed += 1
+
+    if changed or len(files) != len(previous):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        live = {f["hashed"] for f in files.values()}
+        # Drop superseded builds so dist/ doesn't grow with every edit
+        for stale in _sources(out_dir, out_dir / ".none"):
+            rel = stale.relative_to(out_dir).as_posix()
+            base = rel.removesuffix(".gz").removesuffix(".br")
+            if rel != MANIFEST and base not in live:
+                stale.unlink()
+        tmp = manifest_path.with_name(MANIFEST + ".tmp")
+        tmp.write_text(json.dumps({"files": files}, indent=2, sort_keys=True))
+        os.replace(tmp, manifest_path)
+    return files
+
+
+@dataclass(frozen=True)
+class _Variant:
+    path: str
+    stat: os.stat_result
+
+
+class AssetManifest:
+    """Hashed URLs for templates, and the files behind them for AssetFiles."""
+
+    def __init__(self, files: dict, out_dir: Path = DIST_DIR, prefix: str = "/static/"):
+        self.prefix = prefix
+        self._urls = {name: prefix + entry["hashed"] for name, entry in files.items()}
+        self._variants: dict[str, tuple[str, dict[str, _Variant]]] = {}
+        for name, entry in files.items():
+            hashed = entry["hashed"]
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            variants = {}
+            for encoding in ("identity", *entry["encodings"]):
+                path = out_dir / (hashed + _SUFFIXES.get(encoding, ""))
+                try:
+                    variants[encoding] = _Variant(str(path), path.stat())
+                except OSError:
+                    continue
+            if "identity" in variants:
+                self._variants[hashed] = (media_type, variants)
+
+    def url(self, name: str) -> str:
+        """Hashed URL for a file under static/ (plain URL if it isn't built)."""
+        return self._urls.get(name.lstrip("/"), self.prefix + name.lstrip("/"))
+
+    def lookup(self, hashed: str) -> Optional[tuple[str, dict[str, _Variant]]]:
+        return self._variants.get(hashed)
+
+
+class AssetFiles(StaticFiles):
+    """StaticFiles that serves hashed assets precompressed and immutable."""
+
+    def __init__(self, *args, manifest: Optional[AssetManifest] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifest = manifest or AssetManifest({})
+
+    def build(self, source_dir: Path = STATIC_DIR, out_dir: Path = DIST_DIR) -> int:
+        """
+        Build (or refresh) dist/ and switch to its manifest. On a read-only
+        checkout, fall back to whatever dist/ already holds.
+
+        Returns the number of hashed assets.
+        """
+        try:
+            files = build_assets(source_dir, out_dir)
+        except OSError as e:
+            print(f"Warning: Static asset build failed ({e}), using existing {out_dir}")
+            try:
+                files = json.loads((out_dir / MANIFEST).read_text())["files"]
+            except (OSError, ValueError, KeyError):
+                files = {}
+        self.manifest = AssetManifest(files, out_dir)
+        return len(files)
+
+    def url(self, name: str) -> str:
+        return self.manifest.url(name)
+
+    async def get_response(self, path: str, scope) -> Response:
+        found = self.manifest.lookup(path) if scope["method"] in ("GET", "HEAD") else None
+        if found is None:
+            return await super().get_response(path, scope)
+
+        media_type, variants = found
+        accepted = accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        encoding = next((e for e in ENCODINGS if e in variants and e in accepted), "identity")
+        variant = variants[encoding]
+        headers = {"Cache-Control": IMMUTABLE}
+        if len(variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return FileResponse(variant.path, media_type=media_type, headers=headers, stat_result=variant.stat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static/ into static/dist/.")
+    parser.add_argument("--force", action="store_true", help="Rebuild every file")
+    args = parser.parse_args()
+
+    files = build_assets(force=args.force)
+    for name, entry in sorted(files.items()):
+        sizes = ", ".join(f"{enc} {size:,}" for enc, size in entry["encodings"].items()) or "no compressed variant"
+        print(f"{name:20} -> {entry['hashed']:32} {entry['size']:>10,} bytes ({sizes})")
+    if brotli is None:
+        print("(install `brotli` to also build .br variants)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Pre-serialized, ETag-validated responses.
+For endpoints whose payload only changes when the corpus reloads.
+"""
+
+import gzip
+import hashlib
+import json
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Browsers may reuse a catalog for a few minutes, then revalidate with the ETag
+CACHE_CONTROL = "public, max-age=300"
+
+
+def dumps(payload) -> bytes:
+    """Serialize like FastAPI's JSONResponse, without the jsonable_encoder pass."""
+    return json.dumps(
+        payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def json_response(payload, headers: dict | None = None) -> Response:
+    """One-shot response for a payload that is already plain JSON types."""
+    return Response(content=dumps(payload), media_type="application/json", headers=headers)
+
+
+class CachedBody:
+    """
+    A response body built once, with a strong ETag over its bytes.
+    With compress=True a gzip copy is kept too, for clients that accept it.
+    """
+
+    def __init__(self, body: bytes, media_type: str, cache_control: str = CACHE_CONTROL,
+                 compress: bool = False):
+        self.body = body
+        self.media_type = media_type
+        self.etag = '"' + hashlib.sha256(self.body).hexdigest()[:32] + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control}
+        self.gzipped = None
+        if compress:
+            self.gzipped = gzip.compress(body, 6, mtime=0)
+            self.headers["Vary"] = "Accept-Encoding"
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """True if an If-None-Match header already names this representation."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+    def response(self, request: Request) -> Response:
+        """200 with the cached bytes, or an empty 304 if the client has them."""
+        if self.matches(request.headers.get("if-none-match")):
+            return Response(status_code=304, headers=self.headers)
+        if self.gzipped is not None and "gzip" in accepted_encodings(request.headers.get("accept-encoding", "")):
+            headers = dict(self.headers, **{"Content-Encoding": "gzip"})
+            return Response(content=self.gzipped, media_type=self.media_type, headers=headers)
+        return Response(content=self.body, media_type=self.media_type, headers=self.headers)
+
+
+class CachedJSON(CachedBody):
+    """A JSON payload serialized once."""
+
+    def __init__(self, payload, cache_control: str = CACHE_CONTROL):
+        super().__init__(dumps(payload), "application/json", cache_control)
+
+
+def accepted_encodings(header: str) -> set[str]:
+    """Encodings an Accept-Encoding header allows (q > 0)."""
+    accepted = set()
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if token and q > 0:
+            accepted.add(token.strip().lower())
+    return accepted
@@ -4,43 +4,123 @@ B99 Quote Guesser
 A simple "Who Said It?" game for Brooklyn Nine-Nine fans.
 """
 
+import asyncio
+import signal
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 
-from api.routes import game_router
-from core.config import settings
+from api.assets import AssetFiles
+from api.metrics import MetricsMiddleware, metrics_response
+from api.page import GamePage
+from api.profiling import ProfilerMiddleware
+from api.routes import admin_router, game_router
+from core.config import get_settings
+from core.profiler import profiler
+from core.quotes import quotes_client
+from core.sessions import close_game_sessions, get_game_sessions
+from core.watcher import FileWatcher
+
+
+def _install_sighup_reload() -> bool:
+    """Reload the corpus on SIGHUP (POSIX, main thread only)."""
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, quotes_client.reload_in_background)
+    except (NotImplementedError, RuntimeError, ValueError):
+        return False
+    return True
+
+
+# --- Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the quote corpus before serving, off the event loop, and start
+    prefetching from the quotes API in B99_MODE="api".
+    Hot reload triggers: SIGHUP, POST /admin/reload, and a file watcher
+    when B99_WATCH_INTERVAL is set. DEBUG starts the request profiler.
+    Static assets are fingerprinted and precompressed (only what changed).
+    """
+    await asyncio.to_thread(quotes_client.load)
+    if static_files is not None:
+        await asyncio.to_thread(static_files.build, STATIC_DIR)
+        game_page.invalidate()
+    await quotes_client.start()
+
+    settings = get_settings()
+    sighup = _install_sighup_reload()
+    watcher = None
+    if settings.B99_WATCH_INTERVAL > 0:
+        watcher = FileWatcher(
+            [settings.B99_QUOTES_JSON, settings.B99_SNAPSHOT],
+            quotes_client.reload_in_background,
+            interval=settings.B99_WATCH_INTERVAL,
+        )
+        watcher.start()
+    if settings.DEBUG:
+        profiler.start(settings.B99_PROFILE_RATE, settings.B99_PROFILE_INTERVAL_MS / 1000)
+    try:
+        yield
+    finally:
+        profiler.stop()
+        await quotes_client.aclose()
+        close_game_sessions()
+        if watcher is not None:
+            watcher.stop()
+        if sighup:
+            asyncio.get_running_loop().remove_signal_handler(signal.SIGHUP)
+
 
 # --- App Setup ---
 app = FastAPI(
     title="B99 Quote Guesser",
     description="Captain Dad will encourage you to be happy",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
+# --- Metrics / Profiling ---
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 # --- Path Configuration ---
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
 
 # --- Static Files ---
+static_files = None
 if STATIC_DIR.is_dir():
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    static_files = AssetFiles(directory=str(STATIC_DIR))
+    app.mount("/static", static_files, name="static")
 
 # --- Templates ---
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+# Hashed URL from the asset manifest: {{ static_url('js/game.js') }}
+templates.env.globals["static_url"] = (
+    static_files.url if static_files is not None else (lambda name: "/static/" + name)
+)
+game_page = GamePage(templates, quotes_client, get_game_sessions)
 
 # --- Include Routers ---
 app.include_router(game_router)
+app.include_router(admin_router)
 
 
 # --- Game Page (single page) ---
 @app.get("/", response_class=HTMLResponse)
-async def game_page(request: Request):
-    return templates.TemplateResponse("game.html", {"request": request})
+async def index(request: Request):
+    """
+    The game page, pre-rendered with the bootstrap data (characters,
+    episodes, a pool of first-round quotes) inlined. Re-rendered after a
+    corpus reload.
+    """
+    return await game_page.response(request)
 
 
 # --- Health Check ---
@@ -50,4 +130,27 @@ async def health_check():
     Health check endpoint for monitoring.
     Reports status of external services.
     """
-    return {"status": "operational"}
\ No newline at end of file
+    return {"status": "operational"}
+
+
+# --- Readiness Check ---
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint: 200 once the quote corpus is loaded, 503 before.
+    Reports load time and corpus size.
+    """
+    stats = quotes_client.stats()
+    if not stats["loaded"]:
+        return JSONResponse(status_code=503, content={"status": "loading", **stats})
+    return {"status": "ready", **stats}
+
+
+# --- Metrics ---
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus text exposition: per-route request counts, errors and
+    latency, hot-path timing spans, corpus/index sizes and cache hit ratios.
+    """
+    return metrics_response()
@@ -0,0 +1,72 @@
+"""
+HTTP metrics: an ASGI middleware recording per-route request counts,
+errors and latency into core.metrics, and the /metrics exposition.
+"""
+
+import time
+
+from fastapi.responses import Response
+
+from core.metrics import registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+requests_total = registry.counter(
+    "b99_http_requests_total", "HTTP requests by route and status", ("method", "route", "status")
+)
+request_errors = registry.counter(
+    "b99_http_request_errors_total", "HTTP requests that failed (5xx or unhandled)", ("method", "route")
+)
+request_seconds = registry.histogram(
+    "b99_http_request_duration_seconds", "HTTP request latency, until the last body byte", ("method", "route")
+)
+
+
+def route_label(scope) -> str:
+    """The matched route template ('/game/quote'), so paths with IDs don't explode the label set."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path is not None:
+        return path
+    if "endpoint" in scope:
+        # Mounted app (static files): the mount point
+        return scope.get("root_path") or "/"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no per-request task or body buffering)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except BaseException:
+            status = 500
+            raise
+        finally:
+            method = scope["method"]
+            route = route_label(scope)
+            request_seconds.observe((method, route), time.perf_counter() - start)
+            requests_total.inc((method, route, str(status)))
+            if status >= 500:
+                request_errors.inc((method, route))
+
+
+def metrics_response() -> Response:
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
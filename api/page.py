@@ -0,0 +1,102 @@
+"""
+Pre-rendered game page.
+
+The index page is rendered once and served from memory (gzipped, with an
+ETag) instead of running the template on every visit. It inlines the
+bootstrap data game.js would otherwise fetch before the first round: the
+character list, the episode catalog and a pool of masked quotes. One is
+picked client-side for round one; the pool's answers stay on the server
+(a pool session, see core.sessions) and POST /game/session copies the
+picked round into the player's session, where it is verified as an
+unscored practice round.
+
+The page is re-rendered when the corpus version changes (hot reload) and
+every PAGE_TTL seconds, so visitors don't all start from the same pool.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+from api.cache import CachedBody
+from core.episodes import episode_catalog
+from core.quotes import QuotesClient
+from core.sessions import GameSessions
+
+# Quotes inlined per render
+BOOTSTRAP_QUOTES = 20
+# Seconds before a fresh quote pool is drawn
+PAGE_TTL = 60.0
+# Revalidate on every visit: a reload or asset rebuild changes the page
+PAGE_CACHE_CONTROL = "no-cache"
+
+
+def bootstrap_data(client: QuotesClient, sessions: GameSessions, n: int = BOOTSTRAP_QUOTES) -> dict:
+    """
+    Payload shared with /game/characters and /game/episodes, plus a pool of
+    n rounds (masked text only). Without a working session backend the
+    pool is left out and game.js deals round one from its session.
+    """
+    data = {
+        "characters": client.state.characters,
+        "episodes_by_season": episode_catalog.grouped(),
+    }
+    try:
+        pool, dealt = sessions.create_pool(n)
+    except Exception as e:
+        print(f"Warning: Could not create the page's quote pool ({e})")
+        return data
+    data["pool"] = pool.id
+    data["quotes"] = [
+        {"round": round_no, "text": quote.masked_text(), "episode": None, "season": None}
+        for round_no, quote in dealt
+    ]
+    return data
+
+
+class GamePage:
+    """The rendered index page, cached per corpus version."""
+
+    def __init__(self, templates: Jinja2Templates, client: QuotesClient,
+                 sessions: Callable[[], GameSessions], name: str = "game.html", ttl: float = PAGE_TTL):
+        self.templates = templates
+        self.client = client
+        self.sessions = sessions
+        self.name = name
+        self.ttl = ttl
+        self._page: Optional[CachedBody] = None
+        self._version = -1
+        self._rendered_at = 0.0
+
+    def invalidate(self) -> None:
+        self._page = None
+
+    def _stale(self) -> bool:
+        return (
+            self._page is None
+            or self._version != self.client.state.version
+            or time.monotonic() - self._rendered_at > self.ttl
+        )
+
+    def get(self) -> CachedBody:
+        """The page, re-rendered if stale (creating a pool does session backend I/O)."""
+        if self._stale():
+            version = self.client.state.version
+            bootstrap = bootstrap_data(self.client, self.sessions())
+            html = self.templates.get_template(self.name).render(bootstrap=bootstrap)
+            self._page = CachedBody(html.encode("utf-8"), "text/html; charset=utf-8",
+                                    PAGE_CACHE_CONTROL, compress=True)
+            self._version = version
+            self._rendered_at = time.monotonic()
+        return self._page
+
+    async def response(self, request: Request) -> Response:
+        if self._stale() and self.sessions().backend.blocking:
+            page = await asyncio.to_thread(self.get)
+        else:
+            page = self.get()
+        return page.response(request)
@@ -0,0 +1,30 @@
+"""
+Request profiling: marks a sample of requests for core.profiler while it
+is enabled (Settings.DEBUG at startup, or POST /admin/profile).
+"""
+
+from api.metrics import route_label
+from core.profiler import profiler
+
+
+def _profile_route(scope) -> str:
+    # Resolved when a stack is sampled: before the router has matched, say so
+    return route_label(scope) if "endpoint" in scope else "(routing)"
+
+
+class ProfilerMiddleware:
+    """Pure ASGI middleware; a single flag check per request while profiling is off."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if not profiler.enabled or scope["type"] != "http" or not profiler.should_profile():
+            await self.app(scope, receive, send)
+            return
+
+        profiler.begin(lambda: _profile_route(scope))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.end()
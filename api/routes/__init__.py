@@ -2,6 +2,7 @@
 API Route modules for B99 Quote Guesser.
 """
 
+from api.routes.admin import router as admin_router
 from api.routes.game import router as game_router
 
-__all__ = ["game_router"]
+__all__ = ["admin_router", "game_router"]
@@ -0,0 +1,110 @@
+"""
+Admin routes: corpus hot reload, request profiling.
+Disabled unless B99_ADMIN_TOKEN is set.
+"""
+
+import asyncio
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from core.config import get_settings
+from core.profiler import profiler
+from core.quotes import quotes_client
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+def _check_token(token: Optional[str]):
+    expected = get_settings().B99_ADMIN_TOKEN
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@router.post("/reload")
+async def reload_quotes(wait: bool = True, x_admin_token: Optional[str] = Header(None)):
+    """
+    Rebuild the quote corpus from disk and swap it in without a restart.
+    
+    Args:
+        wait: If true, respond once the new corpus is live (or the build failed);
+            otherwise start the build in the background and return 202 (queued
+            to run again after the current build if one is running)
+    """
+    _check_token(x_admin_token)
+
+    if not wait:
+        started = quotes_client.reload_in_background()
+        return JSONResponse(
+            status_code=202, content={"started": started, "queued": not started, **quotes_client.stats()}
+        )
+
+    ok = await asyncio.to_thread(quotes_client.reload)
+    if not ok:
+        return JSONResponse(status_code=500, content={"reloaded": False, **quotes_client.stats()})
+    return {"reloaded": True, **quotes_client.stats()}
+
+
+@router.get("/profile")
+async def profile_status(x_admin_token: Optional[str] = Header(None)):
+    """Profiler state and samples collected per route."""
+    _check_token(x_admin_token)
+    return profiler.status()
+
+
+@router.post("/profile")
+async def set_profiling(
+    enabled: bool = True,
+    rate: Optional[float] = Query(None, gt=0, le=1, description="Fraction of requests to profile"),
+    interval_ms: Optional[float] = Query(None, ge=0.5, le=1000, description="Stack sampling interval"),
+    reset: bool = Query(False, description="Discard the samples collected so far"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    Switch the sampling profiler on or off at runtime.
+    Defaults come from B99_PROFILE_RATE / B99_PROFILE_INTERVAL_MS.
+    """
+    _check_token(x_admin_token)
+    if reset:
+        profiler.reset()
+    if enabled:
+        settings = get_settings()
+        profiler.start(
+            rate if rate is not None else settings.B99_PROFILE_RATE,
+            (interval_ms if interval_ms is not None else settings.B99_PROFILE_INTERVAL_MS) / 1000,
+        )
+    else:
+        await asyncio.to_thread(profiler.stop)
+    return profiler.status()
+
+
+@router.get("/profile/collapsed")
+async def profile_collapsed(route: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Collapsed stacks ('route;frame;... count'), for flamegraph.pl or speedscope.
+    
+    Args:
+        route: Only this route template (e.g. /game/quote)
+    """
+    _check_token(x_admin_token)
+    return PlainTextResponse(profiler.collapsed(route))
+
+
+@router.get("/profile/pstats")
+async def profile_pstats(route: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """
+    Samples as a pstats file (`python -m pstats b99.prof`, snakeviz).
+    
+    Args:
+        route: Only this route template (e.g. /game/quote)
+    """
+    _check_token(x_admin_token)
+    return Response(
+        content=profiler.pstats(route),
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": 'attachment; filename="b99.prof"'},
+    )
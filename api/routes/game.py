@@ -3,28 +3,61 @@ Game routes: 'Who Said It?' quote challenge.
 Brooklyn 99 quote guesser.
 """
 
-from fastapi import APIRouter, Request, Query
-from fastapi.responses import HTMLResponse
+import asyncio
+import json
+import random
+from collections import deque
+from itertools import islice
+from fastapi import APIRouter, Body, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
-from typing import Optional
+from pydantic import BaseModel
+from typing import Callable, Optional, TypeVar
 
-from core.quotes import quotes_client, Quote, get_canonical_character
+from api.cache import CachedJSON, dumps, json_response
+from core.config import get_settings
+from core.difficulty import Difficulty
+from core.episodes import episode_catalog
+from core.metrics import registry
+from core.quotes import quotes_client, Quote, guess_verifier
+from core.sampler import Weighting
+from core.sessions import get_game_sessions
 
 router = APIRouter(prefix="/game", tags=["game"])
 
+# Quotes serialized per write to the client in /game/export
+EXPORT_CHUNK = 256
+
+# /game/ws: largest client message accepted (a guess is well under 1 KB),
+# and most rounds a connection may hold unanswered
+WS_MAX_MESSAGE = 4096
+WS_MAX_AHEAD = 5
+
+T = TypeVar("T")
+
 # Templates directory
 TEMPLATES_DIR = Path(__file__).resolve().parent.parent.parent / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
 
 @router.get("/quote")
-async def get_game_quote(hard_mode: bool = False):
+async def get_game_quote(
+    hard_mode: bool = False,
+    character: Optional[str] = Query(None, description="Only this character (name or alias)"),
+    season: Optional[int] = Query(None, ge=1, le=8, description="Only this season"),
+    episode: Optional[str] = Query(None, description="Only this episode (any spelling)"),
+    weighting: Weighting = Query("uniform", description="uniform, balanced (per character) or sqrt"),
+    difficulty: Optional[Difficulty] = Query(None, description="easy, medium or hard"),
+):
     """
     Get a random quote for the game.
     
     Args:
         hard_mode: If true, hides episode name (player must guess character + episode)
+        character, season, episode: Optional filters
+        weighting: "balanced" gives every character the same chance instead of every quote
+        difficulty: Only quotes in this difficulty third (scored offline, see core.difficulty)
     
     Response:
     {
@@ -36,7 +69,7 @@ async def get_game_quote(hard_mode: bool = False):
         "answer_season": 1-8 or null
     }
     """
-    quote = await quotes_client.get_random_quote()
+    quote = await quotes_client.get_random_quote(character, season, episode, weighting, difficulty)
 
     if not quote:
         return {
@@ -59,61 +92,191 @@ async def get_game_quote(hard_mode: bool = False):
     }
 
 
+@router.get("/quotes/batch")
+async def get_game_quotes_batch(
+    n: int = Query(20, ge=1, le=100, description="Number of quotes"),
+    character: Optional[str] = Query(None, description="Filter by character"),
+    season: Optional[int] = Query(None, ge=1, le=8, description="Filter by season"),
+    hard_mode: bool = True,
+):
+    """
+    Get N distinct random quotes in one response, so the game can prefetch rounds.
+    
+    Quotes are sampled without replacement (fewer than N if the filters match
+    fewer). Each item has the same fields as /game/quote. Masked text comes
+    from the corpus' memoized masks and the payload is serialized once.
+    """
+    quotes = quotes_client.sample_quotes(n, character=character, season=season)
+    items = [
+        {
+            "text": quote.masked_text(),
+            "episode": None if hard_mode else quote.episode,
+            "season": None if hard_mode else quote.season,
+            "answer_character": quote.character,
+            "answer_episode": quote.episode,
+            "answer_season": quote.season,
+        }
+        for quote in quotes
+    ]
+    return json_response({"count": len(items), "quotes": items}, headers={"Cache-Control": "no-store"})
+
+
+# Catalog responses, serialized once per corpus version
+_catalog: tuple[int, dict[str, CachedJSON]] | None = None
+
+
+async def _catalog_responses() -> dict[str, CachedJSON]:
+    """
+    Pre-serialized catalog payloads.
+    Rebuilt only when the corpus version changes (i.e. after a reload).
+    """
+    global _catalog
+    state = quotes_client.state
+    if _catalog is None or _catalog[0] != state.version:
+        responses = {
+            "characters": CachedJSON({"characters": state.characters}),
+            "episodes": CachedJSON({"episodes_by_season": episode_catalog.grouped()}),
+            "seasons": CachedJSON({"seasons": list(range(1, 9))}),
+        }
+        for season in episode_catalog.grouped():
+            responses[f"episodes:{season}"] = CachedJSON({"episodes": episode_catalog.by_season(season)})
+        _catalog = (state.version, responses)
+    return _catalog[1]
+
+
 @router.get("/characters")
-async def get_characters():
+async def get_characters(request: Request):
     """
     Get the list of characters for the autocomplete dropdown.
     """
-    characters = await quotes_client.get_characters()
-    return {"characters": characters}
+    return (await _catalog_responses())["characters"].response(request)
 
 
 @router.get("/episodes")
-async def get_episodes(season: Optional[int] = None):
+async def get_episodes(request: Request, season: Optional[int] = None):
     """
     Get episodes, optionally filtered by season.
     Returns dict of season -> episode list for dropdowns.
     """
-    from core.episodes import EPISODE_SEASONS, get_episodes_by_season
-    
+    responses = await _catalog_responses()
     if season:
-        return {"episodes": get_episodes_by_season(season)}
-    
-    # Return all episodes grouped by season
-    episodes_by_season = {}
-    for ep, s in EPISODE_SEASONS.items():
-        if s not in episodes_by_season:
-            episodes_by_season[s] = []
-        if ep not in episodes_by_season[s]:  # Avoid duplicates
-            episodes_by_season[s].append(ep)
-    
-    # Sort episodes within each season
-    for s in episodes_by_season:
-        episodes_by_season[s] = sorted(set(episodes_by_season[s]))
+        cached = responses.get(f"episodes:{season}")
+        if cached is None:
+            return {"episodes": []}
+        return cached.response(request)
     
-    return {"episodes_by_season": episodes_by_season}
+    # All episodes grouped by season (spelling variants collapsed)
+    return responses["episodes"].response(request)
 
 
 @router.get("/seasons")
-async def get_seasons():
+async def get_seasons(request: Request):
     """
     Get the list of seasons (1-8).
     """
-    return {"seasons": list(range(1, 9))}
+    return (await _catalog_responses())["seasons"].response(request)
+
+
+def _verdict_message(all_correct: bool, answer_character: str, answer_episode: Optional[str]) -> str:
+    if all_correct:
+        messages = [
+            "Correct. Your deductive skills are... adequate.",
+            "Indeed. You have identified the speaker and episode correctly.",
+            "Affirmative. A satisfactory display of B99 knowledge.",
+            "Exceptional. Captain Holt would be... mildly impressed.",
+        ]
+    else:
+        messages = [
+            f"Incorrect. The speaker was {answer_character} in '{answer_episode}'.",
+            f"A regrettable error. It was {answer_character}, episode: {answer_episode}.",
+            f"Negative. {answer_character} spoke those words in '{answer_episode}'.",
+        ]
+    
+    return random.choice(messages)
+
+
+async def _in_session_thread(fn: Callable[..., T], *args) -> T:
+    """Call a GameSessions method, in a thread if its backend does I/O (SQLite, Redis)."""
+    if get_game_sessions().backend.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+def _session_not_found() -> HTTPException:
+    return HTTPException(status_code=404, detail="Unknown or expired session")
+
+
+@router.post("/session")
+async def create_session(
+    pool: Optional[str] = Query(None, description="Pool ID inlined in the game page"),
+    pool_round: Optional[int] = Query(None, alias="round", description="Pool round shown as the first round"),
+    session_id: Optional[str] = Query(None, description="Continue this session instead (if it hasn't expired)"),
+):
+    """
+    Start a game session: a personal shuffled deck (no repeats until every
+    quote has been dealt) with answers kept on the server.
+    
+    With pool and round (from the page's bootstrap data), that round is
+    copied into the session (session_id's, if still alive) as its next round
+    and its number returned as "round", so the quote already on screen is
+    verified on the server. It is a practice round: the pool is shared by
+    every visitor of the cached page, so it doesn't count towards score or
+    streak. "round" is null if the pool expired.
+    """
+    sessions = get_game_sessions()
+    if pool is None or pool_round is None:
+        session = await _in_session_thread(sessions.create)
+        return {"session_id": session.id, "expires_in": sessions.backend.ttl}
+    session, round_no = await _in_session_thread(sessions.start, session_id, pool, pool_round)
+    return {
+        "session_id": session.id,
+        "expires_in": sessions.backend.ttl,
+        "round": round_no,
+        "streak": session.streak,
+        "best_streak": session.best_streak,
+    }
+
+
+@router.get("/session/quotes")
+async def deal_session_quotes(
+    session_id: str = Query(..., description="ID from POST /game/session"),
+    n: int = Query(1, ge=1, le=20, description="Number of rounds to deal"),
+):
+    """
+    Deal the next N rounds from the session's deck.
+    
+    Only the masked text and a round number are sent; answers stay on the
+    server until the round is verified.
+    """
+    dealt = await _in_session_thread(get_game_sessions().deal, session_id, n)
+    if dealt is None:
+        raise _session_not_found()
+    _, rounds = dealt
+    items = [
+        {"round": round_no, "text": quote.masked_text(), "episode": None, "season": None}
+        for round_no, quote in rounds
+    ]
+    return json_response({"count": len(items), "quotes": items}, headers={"Cache-Control": "no-store"})
 
 
 @router.post("/verify")
 async def verify_answer(
     guess_character: str = Query(..., alias="guess"),
-    answer_character: str = Query(..., alias="answer"),
+    answer_character: Optional[str] = Query(None, alias="answer"),
     guess_episode: Optional[str] = Query(None),
     answer_episode: Optional[str] = Query(None),
     guess_season: Optional[int] = Query(None),
     answer_season: Optional[int] = Query(None),
+    session_id: Optional[str] = Query(None),
+    round_no: Optional[int] = Query(None, alias="round"),
 ):
     """
     Verify if the user's guess matches the correct answer.
     
+    With session_id, the answer is the one the server holds for that round
+    (the oldest pending round if round is omitted); answer fields are ignored.
+    Without it, the answer must be passed in (legacy clients).
+    
     Always checks character. If episode data is provided, also checks episode.
     
     Returns:
@@ -124,77 +287,344 @@ async def verify_answer(
             "message": str
         }
     """
-    import random
-    
-    # Check character: use alias mapping (e.g. "Pontiac Bandit" -> "Doug Judy")
-    guess_char_clean = guess_character.strip().lower()
-    answer_char_clean = answer_character.strip().lower()
-    guess_canonical = get_canonical_character(guess_character)
-    if guess_canonical:
-        character_correct = guess_canonical.lower() == answer_char_clean
-    else:
-        # Fallback: substring match for characters not in alias map
-        character_correct = (
-            guess_char_clean == answer_char_clean
-            or guess_char_clean in answer_char_clean
-            or answer_char_clean in guess_char_clean
-        )
+    # Character: any alias or close spelling (e.g. "Pontiac Bandit" -> "Doug Judy");
+    # episode: any spelling of the same episode ("Pt. 1" / "(Part 1)")
+    def judge(answer: list):
+        return guess_verifier.grade(guess_character, answer[0], guess_episode, answer[1])
     
-    # Check episode if provided (exact match on episode name)
-    episode_correct = False
-    if guess_episode and answer_episode:
-        guess_ep_clean = guess_episode.strip().lower()
-        answer_ep_clean = answer_episode.strip().lower()
-        episode_correct = guess_ep_clean == answer_ep_clean
-    elif not guess_episode and answer_episode:
-        # No guess provided but answer exists = wrong
-        episode_correct = False
+    session = None
+    if session_id:
+        # Taking the round, grading it and updating the streak is one atomic update
+        verified = await _in_session_thread(get_game_sessions().verify, session_id, round_no, judge)
+        if verified is None:
+            raise _session_not_found()
+        session, result = verified
+        if result is None:
+            raise HTTPException(status_code=409, detail="No pending round to verify")
+        round_no, (answer_character, answer_episode, answer_season), grade, scored = result
+    elif answer_character is None:
+        raise HTTPException(status_code=422, detail="answer or session_id is required")
     else:
-        # No episode to check = consider it correct (not applicable)
-        episode_correct = True
+        grade = judge([answer_character, answer_episode, answer_season])
     
     # Overall: both must be correct
-    all_correct = character_correct and episode_correct
-    
-    # Generate message
-    if all_correct:
-        messages = [
-            "Correct. Your deductive skills are... adequate.",
-            "Indeed. You have identified the speaker and episode correctly.",
-            "Affirmative. A satisfactory display of B99 knowledge.",
-            "Exceptional. Captain Holt would be... mildly impressed.",
-        ]
-    else:
-        messages = [
-            f"Incorrect. The speaker was {answer_character} in '{answer_episode}'.",
-            f"A regrettable error. It was {answer_character}, episode: {answer_episode}.",
-            f"Negative. {answer_character} spoke those words in '{answer_episode}'.",
-        ]
+    all_correct = grade.correct
     
-    message = random.choice(messages)
-
-    return {
+    response = {
         "correct": all_correct,
-        "character_correct": character_correct,
-        "episode_correct": episode_correct,
-        "message": message,
+        "character_correct": grade.character_correct,
+        "episode_correct": grade.episode_correct,
+        "message": _verdict_message(all_correct, answer_character, answer_episode),
         "actual_character": answer_character,
         "actual_episode": answer_episode,
     }
+    if session is not None:
+        response.update(
+            round=round_no,
+            actual_season=answer_season,
+            scored=scored,
+            streak=session.streak,
+            best_streak=session.best_streak,
+        )
+    return response
+
+
+class GuessRecord(BaseModel):
+    """One guess to grade, as sent to /game/verify."""
+    guess: str
+    answer: str
+    guess_episode: Optional[str] = None
+    answer_episode: Optional[str] = None
+
+
+@router.post("/verify/batch")
+async def verify_answers_batch(guesses: list[GuessRecord] = Body(..., max_length=10_000)):
+    """
+    Grade many guesses at once (e.g. to replay or analyse a game log).
+    
+    Returns per-guess results in input order plus totals.
+    """
+    grades = guess_verifier.grade_many(
+        (g.guess, g.answer, g.guess_episode, g.answer_episode) for g in guesses
+    )
+    results = [
+        {
+            "correct": grade.correct,
+            "character_correct": grade.character_correct,
+            "episode_correct": grade.episode_correct,
+        }
+        for grade in grades
+    ]
+    return json_response({
+        "count": len(results),
+        "correct": sum(r["correct"] for r in results),
+        "character_correct": sum(r["character_correct"] for r in results),
+        "episode_correct": sum(r["episode_correct"] for r in results),
+        "results": results,
+    })
 
 
 @router.get("/search")
 async def search_quotes(
     q: str = Query(..., min_length=2, description="Search term"),
     character: Optional[str] = Query(None, description="Filter by character"),
+    season: Optional[int] = Query(None, ge=1, le=8, description="Filter by season"),
+    limit: int = Query(10, ge=1, le=100, description="Max quotes to return"),
+    offset: int = Query(0, ge=0, description="Number of results to skip"),
+    rank: bool = Query(False, description="BM25 ranking with prefix completion"),
 ):
     """
     Deep-Search Autocomplete: Search quotes by text content.
     Used for exploring the quote database.
+    
+    By default returns substring matches in file order. With rank=true, returns
+    the best matches first and treats the last word as a prefix, for search-as-you-type.
     """
-    quotes = await quotes_client.search_quotes(q, character)
+    count, quotes = quotes_client.search(
+        q, character, limit=limit, offset=offset, season=season, rank=rank
+    )
 
     return {
-        "count": len(quotes),
-        "quotes": [quote.to_dict() for quote in quotes[:10]],  # Limit to 10
+        "count": count,
+        "quotes": [quote.to_dict() for quote in quotes],
     }
+
+
+def _export_rows(state, ids, masked: bool):
+    """NDJSON lines for quote ids, written EXPORT_CHUNK quotes at a time."""
+    store = state.store
+    lines = []
+    for quote_id in ids:
+        quote = store[quote_id]
+        row = {"id": quote_id, "cursor": f"{state.version}.{quote_id}", **quote.to_dict()}
+        if masked:
+            row["masked_text"] = quote.masked_text()
+        lines.append(dumps(row))
+        if len(lines) >= EXPORT_CHUNK:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+@router.get("/export")
+async def export_quotes(
+    character: Optional[str] = Query(None, description="Filter by character"),
+    season: Optional[int] = Query(None, ge=1, le=8, description="Filter by season"),
+    q: Optional[str] = Query(None, min_length=1, description="Text filter (substring, as /game/search)"),
+    masked: bool = Query(False, description="Add each quote's masked text"),
+    cursor: Optional[str] = Query(None, description="Resume after this quote's cursor"),
+    limit: Optional[int] = Query(None, ge=1, description="Max quotes (default: all)"),
+):
+    """
+    Stream matching quotes as NDJSON, one object per line, in corpus order.
+    
+    Rows are produced lazily from the corpus, so any result size streams in
+    constant memory. Each row carries a cursor; pass the last one received to
+    continue a page (limit) or an interrupted download. Cursors belong to one
+    corpus load: after a reload they are rejected with 410 and the export
+    must restart.
+    """
+    state = quotes_client.state
+    start = 0
+    if cursor:
+        try:
+            version, last_id = (int(part) for part in cursor.split(".", 1))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if version != state.version:
+            raise HTTPException(status_code=410, detail="Cursor is from an older corpus, restart the export")
+        start = last_id + 1
+    
+    ids = quotes_client.iter_ids(character, season, q, start=start, state=state)
+    if limit is not None:
+        ids = islice(ids, limit)
+    return StreamingResponse(
+        _export_rows(state, ids, masked),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Corpus-Version": str(state.version)},
+    )
+
+
+# --- WebSocket play ---
+
+_ws_open = 0  # Open /game/ws connections in this worker
+
+ws_messages = registry.counter(
+    "b99_ws_messages_total", "/game/ws messages by direction and type", ("direction", "type")
+)
+registry.gauge("b99_ws_connections", "Open /game/ws connections", lambda: _ws_open)
+
+
+class _WSClose(Exception):
+    """End a /game/ws connection with a close code."""
+    
+    def __init__(self, code: int, reason: str = ""):
+        self.code = code
+        self.reason = reason
+
+
+def _ws_guess(text: str) -> tuple[str, Optional[str], Optional[int]]:
+    """(guess, episode, round) from a client message, or ValueError."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        raise ValueError("Invalid JSON")
+    if not isinstance(data, dict) or not isinstance(data.get("guess"), str) or not data["guess"].strip():
+        raise ValueError('Expected {"guess": "...", "episode": "...", "round": n}')
+    episode = data.get("episode")
+    round_no = data.get("round")
+    if episode is not None and not isinstance(episode, str):
+        raise ValueError("episode must be a string")
+    if round_no is not None and (not isinstance(round_no, int) or isinstance(round_no, bool)):
+        raise ValueError("round must be an integer")
+    return data["guess"], episode or None, round_no
+
+
+@router.websocket("/ws")
+async def game_websocket(websocket: WebSocket, session_id: Optional[str] = None, ahead: int = 1):
+    """
+    Continuous play over one WebSocket (JSON text messages).
+    
+    Server -> client:
+        {"type": "session", "session_id", "streak", "best_streak"}  once, on connect
+        {"type": "quote", "round", "text"}                           a dealt round
+        {"type": "verdict", "round", "correct", "character_correct", "episode_correct",
+         "message", "actual_character", "actual_episode", "actual_season",
+         "streak", "best_streak"}                                    then the next quote
+        {"type": "error", "detail"}                                  bad message (connection stays open)
+    
+    Client -> server:
+        {"guess": "Jake", "episode": "Pilot", "round": 3}  (episode optional; round
+                                                            defaults to the oldest dealt)
+    
+    Args:
+        session_id: Resume a session from POST /game/session or an earlier connection
+            (a new one is started if omitted or expired)
+        ahead: Rounds kept dealt ahead of the player (1-5)
+    
+    Rounds come from the same session decks as the HTTP flow, and guesses are
+    graded by the same verifier; every deal and verify is an atomic session
+    update, so a reconnect (or the HTTP flow) resumes the same session.
+    Backpressure: messages are handled one at a time and at most `ahead`
+    rounds are outstanding, so a client that floods guesses is slowed by
+    TCP flow control, and one that stops reading for B99_WS_SEND_TIMEOUT
+    seconds is dropped. Past B99_WS_MAX_CONNECTIONS per worker, new
+    connections are refused with 1013 (try again later).
+    """
+    global _ws_open
+    settings = get_settings()
+    if _ws_open >= settings.B99_WS_MAX_CONNECTIONS:
+        # Closing before accept() is a 403 handshake rejection: accept first
+        # so the client sees 1013
+        try:
+            await websocket.accept()
+            await websocket.close(code=1013, reason="Server busy")
+        except (RuntimeError, WebSocketDisconnect):
+            pass
+        return
+    
+    # Count the connection before awaiting the handshake, so a burst of
+    # handshakes can't all pass the check above
+    _ws_open += 1
+    try:
+        await websocket.accept()
+    except BaseException:
+        _ws_open -= 1
+        raise
+    sessions = get_game_sessions()
+    ahead = min(max(ahead, 1), WS_MAX_AHEAD)
+    outstanding: deque[int] = deque()  # Rounds dealt on this connection, oldest first
+    
+    async def send(kind: str, payload: dict):
+        try:
+            async with asyncio.timeout(settings.B99_WS_SEND_TIMEOUT):
+                await websocket.send_text(dumps({"type": kind, **payload}).decode("utf-8"))
+        except TimeoutError:
+            raise _WSClose(1008, "Client not reading")
+        ws_messages.inc(("out", kind))
+    
+    async def deal():
+        dealt = await _in_session_thread(sessions.deal, session.id, ahead - len(outstanding))
+        if dealt is None:
+            raise _WSClose(1008, "Session expired")
+        for round_no, quote in dealt[1]:
+            outstanding.append(round_no)
+            await send("quote", {"round": round_no, "text": quote.masked_text()})
+    
+    try:
+        session = await _in_session_thread(sessions.get, session_id) if session_id else None
+        if session is None or session.pool:
+            session = await _in_session_thread(sessions.create)
+        await send("session", {
+            "session_id": session.id,
+            "streak": session.streak,
+            "best_streak": session.best_streak,
+        })
+        await deal()
+        
+        while True:
+            try:
+                async with asyncio.timeout(settings.B99_WS_IDLE_TIMEOUT):
+                    message = await websocket.receive()
+            except TimeoutError:
+                raise _WSClose(1000, "Idle timeout")
+            if message["type"] == "websocket.disconnect":
+                break
+            text = message.get("text")
+            if text is None:
+                text = (message.get("bytes") or b"").decode("utf-8", "replace")
+            if len(text) > WS_MAX_MESSAGE:
+                raise _WSClose(1009, "Message too big")
+            
+            try:
+                guess, guess_episode, round_no = _ws_guess(text)
+            except ValueError as e:
+                ws_messages.inc(("in", "invalid"))
+                await send("error", {"detail": str(e)})
+                continue
+            ws_messages.inc(("in", "guess"))
+            
+            if round_no is None and outstanding:
+                round_no = outstanding[0]
+            if round_no not in outstanding:
+                await send("error", {"detail": "No such round on this connection"})
+                continue
+            outstanding.remove(round_no)
+            verified = await _in_session_thread(
+                sessions.verify, session.id, round_no,
+                lambda answer: guess_verifier.grade(guess, answer[0], guess_episode, answer[1]),
+            )
+            if verified is None:
+                raise _WSClose(1008, "Session expired")
+            session, result = verified
+            if result is None:
+                # Dropped from the session (too many pending rounds): deal a replacement
+                await send("error", {"detail": "Round expired"})
+                await deal()
+                continue
+            _, (answer_character, answer_episode, answer_season), grade, _ = result
+            
+            await send("verdict", {
+                "round": round_no,
+                "correct": grade.correct,
+                "character_correct": grade.character_correct,
+                "episode_correct": grade.episode_correct,
+                "message": _verdict_message(grade.correct, answer_character, answer_episode),
+                "actual_character": answer_character,
+                "actual_episode": answer_episode,
+                "actual_season": answer_season,
+                "streak": session.streak,
+                "best_streak": session.best_streak,
+            })
+            await deal()
+    except _WSClose as e:
+        try:
+            async with asyncio.timeout(settings.B99_WS_SEND_TIMEOUT):
+                await websocket.close(code=e.code, reason=e.reason)
+        except (TimeoutError, RuntimeError, WebSocketDisconnect):
+            pass
+    except WebSocketDisconnect:
+        pass
+    finally:
+        _ws_open -= 1
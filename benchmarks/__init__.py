@@ -0,0 +1,3 @@
+"""
+Benchmarks for B99 Quote Guesser hot paths.
+"""
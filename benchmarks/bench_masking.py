@@ -0,0 +1,93 @@
+"""
+Masking benchmark: original name-by-name masking vs the precompiled engine.
+
+Checks that both produce identical output over the whole corpus, then reports
+per-call latency for each.
+
+Usage:
+    python -m benchmarks.bench_masking [--repeat 3]
+"""
+
+import argparse
+import re
+import time
+
+from core.quotes import (
+    ALL_CHARACTERS, EXTRA_NAMES, Quote, get_speaker_aliases, name_masker, quotes_client,
+)
+
+
+def legacy_masked_text(quote: Quote) -> str:
+    """The original Quote.masked_text, kept verbatim for comparison."""
+    masked = quote.text
+    speaker_names = get_speaker_aliases(quote.character) if quote.character else set()
+
+    # Deterministic iteration (the original built a fresh set per call)
+    extra_names = sorted(EXTRA_NAMES, key=len, reverse=True)
+
+    name_colon_pattern = re.compile(r'\b([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)\s*:')
+    discovered_names = set()
+    for match in name_colon_pattern.finditer(quote.text):
+        name = match.group(1)
+        if name.lower() not in speaker_names:
+            discovered_names.add(name)
+
+    for name in sorted(speaker_names, key=len, reverse=True):
+        if len(name) > 2:
+            pattern = re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
+            masked = pattern.sub("__SPEAKER__", masked)
+
+    for char_name in ALL_CHARACTERS:
+        if char_name.lower() not in speaker_names and len(char_name) > 2:
+            pattern = re.compile(r'\b' + re.escape(char_name) + r'\b', re.IGNORECASE)
+            masked = pattern.sub("[CHARACTER]", masked)
+
+    for name in extra_names:
+        if name.lower() not in speaker_names:
+            pattern = re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
+            masked = pattern.sub("[CHARACTER]", masked)
+
+    for name in sorted(discovered_names, key=len, reverse=True):
+        if len(name) > 2:
+            pattern = re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
+            masked = pattern.sub("[CHARACTER]", masked)
+
+    return masked.replace("__SPEAKER__", "[SPEAKER]")
+
+
+def _time_per_call(fn, quotes: list[Quote], repeat: int) -> float:
+    """Best-of-N mean seconds per call over the corpus."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for quote in quotes:
+            fn(quote)
+        best = min(best, time.perf_counter() - start)
+    return best / len(quotes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    quotes = quotes_client.quotes
+    if not quotes:
+        raise SystemExit("No quotes loaded")
+
+    mismatches = [q for q in quotes if q.masked_text() != legacy_masked_text(q)]
+    print(f"Checked {len(quotes)} quotes: {len(mismatches)} mismatches")
+    for quote in mismatches[:5]:
+        print(f"  {quote.character} / {quote.episode}: {quote.text[:80]!r}")
+
+    legacy = _time_per_call(legacy_masked_text, quotes, args.repeat)
+    engine = _time_per_call(lambda q: name_masker.mask(q.text, q.character), quotes, args.repeat)
+    cached = _time_per_call(Quote.masked_text, quotes, args.repeat)  # warmed by the check above
+    print(f"legacy:  {legacy * 1e6:10.1f} us/call")
+    print(f"engine:  {engine * 1e6:10.1f} us/call")
+    print(f"cached:  {cached * 1e6:10.1f} us/call")
+    print(f"speedup: {legacy / engine:10.1f}x (uncached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Hot reload benchmark: reload time and release of the retired corpus while
+reader threads keep querying.
+
+Readers check that every call sees one consistent corpus (a page of search
+results and the version they came from never mix two loads).
+
+Usage:
+    python -m benchmarks.bench_reload [--reloads 5] [--readers 4] [--json]
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import threading
+import time
+
+from core.config import get_settings
+from core.quotes import QuotesClient
+
+
+def _reader(client: QuotesClient, stop: threading.Event, counts: list, errors: list):
+    n = 0
+    while not stop.is_set():
+        state = client.state
+        hits = state.index.search("title of your", limit=5)
+        for i in hits.ids:
+            if state.store[i].id != i:
+                errors.append(f"inconsistent view in version {state.version}")
+        client.search("nine-nine", limit=5)
+        n += 1
+    counts.append(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reloads", type=int, default=5)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Reload from JSON even if a snapshot exists")
+    args = parser.parse_args()
+
+    if args.json:
+        os.environ["B99_SNAPSHOT"] = ""
+        get_settings.cache_clear()
+
+    client = QuotesClient()
+    client.load()
+    print(f"initial load: {client.load_seconds * 1000:.1f} ms from {client.load_source}")
+
+    stop = threading.Event()
+    counts: list[int] = []
+    errors: list[str] = []
+    readers = [
+        threading.Thread(target=_reader, args=(client, stop, counts, errors))
+        for _ in range(args.readers)
+    ]
+    for t in readers:
+        t.start()
+
+    reloads = []
+    for _ in range(args.reloads):
+        client.reload()
+        # The stats dict is filled in later, when the retired corpus is freed
+        reloads.append(client.last_reload)
+        time.sleep(0.2)
+    stop.set()
+    for t in readers:
+        t.join()
+    gc.collect()
+
+    seconds = [r["seconds"] * 1000 for r in reloads]
+    released = [r for r in reloads if r["retired_released"]]
+    print(f"reloads: {len(reloads)}  median {statistics.median(seconds):.1f} ms  max {max(seconds):.1f} ms")
+    print(f"retired corpora released: {len(released)}/{len(reloads)}")
+    for r in released:
+        before, after = r["rss_before_release"], r["rss_after_release"]
+        rss = "" if before is None or after is None else f"  rss {(after - before) / 1e6:+.1f} MB"
+        print(f"  v{r['retired_version']} released {r['retired_release_seconds'] * 1000:.1f} ms after swap{rss}")
+    print(f"reader calls during reloads: {sum(counts)}  errors: {len(errors)}")
+
+
+if __name__ == "__main__":
+    main()
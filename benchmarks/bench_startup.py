@@ -0,0 +1,71 @@
+"""
+Startup benchmark: import cost vs corpus load cost.
+
+Each case runs in a fresh interpreter so nothing is cached between them:
+- import:   `import api.main` (no corpus work should happen here)
+- json:     import + load from data/quotes.json
+- snapshot: import + load from the binary snapshot (if one has been built)
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import api.main
+from core.quotes import quotes_client
+imported = time.perf_counter()
+if {load}:
+    quotes_client.load()
+done = time.perf_counter()
+print(json.dumps({{"import": imported - start, "total": done - start,
+                  "quotes": len(quotes_client.quotes) if {load} else 0,
+                  "source": quotes_client.load_source}}))
+"""
+
+
+def _run(load: bool, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _SCRIPT.format(load=load)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per case")
+    args = parser.parse_args()
+
+    base = dict(os.environ, PYTHONPATH=str(ROOT))
+    cases = [
+        ("import", False, base),
+        ("json", True, dict(base, B99_SNAPSHOT="")),
+    ]
+    snapshot = base.get("B99_SNAPSHOT", "data/quotes.snapshot")
+    if snapshot and (ROOT / snapshot).exists():
+        cases.append(("snapshot", True, base))
+    else:
+        print("(no snapshot found; run `python -m core.snapshot` to include it)")
+
+    for name, load, env in cases:
+        results = [_run(load, env) for _ in range(args.runs)]
+        total = statistics.median(r["total"] for r in results) * 1000
+        imported = statistics.median(r["import"] for r in results) * 1000
+        print(f"{name:9} import {imported:7.1f} ms   total {total:7.1f} ms   "
+              f"({results[0]['quotes']} quotes, source={results[0]['source']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Memory benchmark: one Quote object per quote vs the columnar QuoteStore.
+
+Each layout parses the JSON and keeps what it needs; the size reported is
+what stays allocated once the parsed records are gone, minus the quote
+texts, which both layouts keep.
+
+Usage:
+    python -m benchmarks.bench_store [--scale 10]
+"""
+
+import argparse
+import json
+import sys
+import tracemalloc
+
+from core.config import get_settings
+from core.episodes import get_season
+from core.quotes import Quote, QuoteStore
+
+
+def build_objects(records: list[dict]) -> tuple[list[Quote], dict[str, list[Quote]]]:
+    """The previous layout: a Quote per record plus per-character lists."""
+    quotes = []
+    by_character: dict[str, list[Quote]] = {}
+    for q in records:
+        character = q.get("Character", "Unknown").strip()
+        episode = q.get("Episode", "Unknown")
+        quote = Quote(
+            character=character,
+            episode=episode,
+            text=q.get("QuoteText", ""),
+            header=q.get("Header", ""),
+            season=get_season(episode),
+        )
+        quotes.append(quote)
+        by_character.setdefault(character, []).append(quote)
+    return quotes, by_character
+
+
+def _measure(build, raw: str) -> tuple[int, int]:
+    """(bytes retained by the built corpus, bytes of quote text it holds)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(json.loads(raw)["root"])
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    quotes = result[0] if isinstance(result, tuple) else result
+    if isinstance(quotes, QuoteStore):
+        texts = quotes.texts
+    else:
+        texts = [q.text for q in quotes]
+    return retained, sum(sys.getsizeof(t) for t in texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the corpus N times")
+    args = parser.parse_args()
+
+    with open(get_settings().B99_QUOTES_JSON, encoding="utf-8-sig") as f:
+        records = json.load(f)["root"] * args.scale
+    raw = json.dumps({"root": records})
+    n = len(records)
+
+    objects, text_bytes = _measure(build_objects, raw)
+    store, _ = _measure(QuoteStore.from_records, raw)
+    objects -= text_bytes
+    store -= text_bytes
+    print(f"{n} quotes ({text_bytes / n:.0f} bytes/quote of text, excluded)")
+    print(f"objects: {objects / n:8.1f} bytes/quote")
+    print(f"store:   {store / n:8.1f} bytes/quote")
+    print(f"ratio:   {objects / store:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
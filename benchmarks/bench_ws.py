@@ -0,0 +1,241 @@
+"""
+Game channel capacity: /game/ws against the HTTP session flow.
+
+Starts one uvicorn worker (or uses --url) and runs N simulated players
+back to back for each flow:
+
+- http: POST /game/session, then GET /game/session/quotes?n=20 whenever
+  the queue is empty and POST /game/verify per round (what game.js does)
+- ws:   one /game/ws connection per player; send a guess, receive the
+  verdict and the next quote
+
+Reports rounds/s, round latency and the worker's CPU time per round, and
+from that the concurrent players one worker can carry at full CPU when a
+player takes --round-seconds per round. --idle also opens that many idle
+WebSocket connections and reports the worker's memory per connection.
+
+CPU and memory come from /proc (Linux). The load generator shares the
+machine with the worker (and httpx saturates long before the worker does
+with many players), so rounds/s and latency are only indicative; CPU per
+round, and the capacity derived from it, is the number to compare.
+
+Usage:
+    python -m benchmarks.bench_ws [--players 50] [--duration 10] [--round-seconds 5] [--idle 500]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import httpx
+
+GUESSES = ["Jake", "Amy", "Rosa", "Charles", "Captain Holt", "Terry", "Gina", "Hitchcock", "Scully"]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _cpu_seconds(pid: Optional[int]) -> Optional[float]:
+    """utime + stime of a process, from /proc (None elsewhere)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def _rss_bytes(pid: Optional[int]) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, TypeError, ValueError):
+        pass
+    return None
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = dict(os.environ, B99_MODE="local", B99_WS_MAX_CONNECTIONS="1000000")
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+
+
+async def wait_ready(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{url}/ready")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+async def http_player(client: httpx.AsyncClient, stop: float, latencies: list, rng: random.Random):
+    session_id = (await client.post("/game/session")).json()["session_id"]
+    queue: list[int] = []
+    while time.perf_counter() < stop:
+        start = time.perf_counter()
+        if not queue:
+            response = await client.get("/game/session/quotes", params={"session_id": session_id, "n": 20})
+            queue = [q["round"] for q in response.json()["quotes"]]
+        round_no = queue.pop(0)
+        response = await client.post("/game/verify", params={
+            "session_id": session_id, "round": round_no, "guess": rng.choice(GUESSES),
+        })
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def ws_player(url: str, stop: float, latencies: list, rng: random.Random):
+    from websockets.asyncio.client import connect
+
+    async with connect(f"{url}/game/ws", compression=None) as ws:
+        json.loads(await ws.recv())  # session
+        json.loads(await ws.recv())  # first quote
+        while time.perf_counter() < stop:
+            start = time.perf_counter()
+            await ws.send(json.dumps({"guess": rng.choice(GUESSES)}))
+            verdict = json.loads(await ws.recv())
+            if verdict["type"] != "verdict":
+                raise RuntimeError(f"unexpected message: {verdict}")
+            json.loads(await ws.recv())  # next quote
+            latencies.append(time.perf_counter() - start)
+
+
+async def run_flow(flow: str, base: str, players: int, duration: float, pid: Optional[int]) -> dict:
+    latencies: list[float] = []
+    ws_base = "ws" + base[len("http"):]
+    limits = httpx.Limits(max_connections=players, max_keepalive_connections=players)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=60) as client:
+        cpu_before = _cpu_seconds(pid)
+        start = time.perf_counter()
+        stop = start + duration
+        if flow == "http":
+            tasks = [http_player(client, stop, latencies, random.Random(i)) for i in range(players)]
+        else:
+            tasks = [ws_player(ws_base, stop, latencies, random.Random(i)) for i in range(players)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        cpu_after = _cpu_seconds(pid)
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    rounds = len(latencies)
+    latencies.sort()
+    row = {
+        "players": players,
+        "errors": len(errors),
+        "rounds": rounds,
+        "rounds_per_s": round(rounds / elapsed, 1),
+        "p50_ms": round(latencies[rounds // 2] * 1000, 2) if rounds else None,
+        "p99_ms": round(latencies[min(int(rounds * 0.99), rounds - 1)] * 1000, 2) if rounds else None,
+        "cpu_ms_per_round": None,
+    }
+    if errors:
+        row["first_error"] = repr(errors[0])
+    if cpu_before is not None and cpu_after is not None and rounds:
+        row["cpu_ms_per_round"] = round((cpu_after - cpu_before) / rounds * 1000, 3)
+    return row
+
+
+async def idle_memory(base: str, n: int, pid: Optional[int]) -> Optional[dict]:
+    """Open n idle /game/ws connections and measure the worker's RSS growth."""
+    from websockets.asyncio.client import connect
+
+    before = _rss_bytes(pid)
+    sockets = []
+    try:
+        for _ in range(n):
+            ws = await connect("ws" + base[len("http"):] + "/game/ws", compression=None)
+            await ws.recv()
+            await ws.recv()
+            sockets.append(ws)
+        await asyncio.sleep(0.5)
+        after = _rss_bytes(pid)
+    finally:
+        await asyncio.gather(*(ws.close() for ws in sockets), return_exceptions=True)
+    if before is None or after is None:
+        return None
+    return {"connections": len(sockets), "rss_kb_per_connection": round((after - before) / len(sockets) / 1024, 1)}
+
+
+async def run(args, base: str, pid: Optional[int]) -> dict:
+    await wait_ready(base)
+    results: dict = {}
+    for flow in args.flow:
+        # Warm up the worker (masks, sessions, imports) before measuring
+        await run_flow(flow, base, min(args.players, 20), 1.0, pid)
+        results[flow] = row = await run_flow(flow, base, args.players, args.duration, pid)
+        if row["cpu_ms_per_round"]:
+            # Players one worker carries at 100% CPU, each playing a round every round_seconds
+            row["players_per_worker"] = int(args.round_seconds / (row["cpu_ms_per_round"] / 1000))
+    if args.idle:
+        results["idle"] = await idle_memory(base, args.idle, pid)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=None, help="Benchmark a running server instead of starting one")
+    parser.add_argument("--players", type=int, default=50, help="Concurrent players")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per flow")
+    parser.add_argument("--round-seconds", type=float, default=5.0, help="A real player's time per round")
+    parser.add_argument("--idle", type=int, default=0, help="Idle WebSocket connections for the memory check")
+    parser.add_argument("--flow", action="append", choices=["http", "ws"], default=None)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    args.flow = args.flow or ["http", "ws"]
+
+    # Every player (and idle socket) holds a descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, (args.players + args.idle) * 2 + 256))
+    resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+    server = None
+    if args.url:
+        base, pid = args.url.rstrip("/"), None
+    else:
+        port = _free_port()
+        server = start_server(port)
+        base, pid = f"http://127.0.0.1:{port}", server.pid
+    try:
+        results = asyncio.run(run(args, base, pid))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for flow in args.flow:
+        row = results[flow]
+        print(f"{flow:5} " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    if "http" in results and "ws" in results:
+        http, ws = results["http"], results["ws"]
+        if http.get("cpu_ms_per_round") and ws.get("cpu_ms_per_round"):
+            print(f"ws uses {http['cpu_ms_per_round'] / ws['cpu_ms_per_round']:.1f}x less worker CPU per round")
+    if results.get("idle"):
+        print("idle  " + "  ".join(f"{k}={v}" for k, v in results["idle"].items()))
+
+
+if __name__ == "__main__":
+    main()
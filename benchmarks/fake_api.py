@@ -0,0 +1,49 @@
+"""
+Local stand-in for the quotes API (B99_MODE="api").
+
+Serves GET /quotes/random?count=N from data/quotes.json, with optional
+latency and failure injection to exercise timeouts, retries and fallback.
+
+Usage:
+    B99_FAKE_LATENCY=0.05 B99_FAKE_FAILURE_RATE=0.2 uvicorn benchmarks.fake_api:app --port 8001
+    B99_MODE=api B99_API_URL=http://localhost:8001 uvicorn api.main:app
+
+In-process: httpx.ASGITransport(app=benchmarks.fake_api.app)
+"""
+
+import asyncio
+import json
+import os
+import random
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse
+
+from core.config import get_settings
+
+app = FastAPI(title="Fake B99 quotes API")
+
+LATENCY = float(os.environ.get("B99_FAKE_LATENCY") or 0)
+FAILURE_RATE = float(os.environ.get("B99_FAKE_FAILURE_RATE") or 0)
+
+_records: list[dict] = []
+requests_served = 0
+
+
+def _load() -> list[dict]:
+    if not _records:
+        with open(get_settings().B99_QUOTES_JSON, encoding="utf-8-sig") as f:
+            _records.extend(json.load(f)["root"])
+    return _records
+
+
+@app.get("/quotes/random")
+async def random_quotes(count: int = Query(1, ge=1, le=1000)):
+    global requests_served
+    requests_served += 1
+    if LATENCY:
+        await asyncio.sleep(LATENCY)
+    if FAILURE_RATE and random.random() < FAILURE_RATE:
+        return JSONResponse(status_code=503, content={"error": "injected failure"})
+    records = _load()
+    return random.sample(records, min(count, len(records)))
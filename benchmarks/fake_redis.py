@@ -0,0 +1,196 @@
+"""
+Local stand-in for a Redis server (B99_SESSION_BACKEND=redis).
+
+Speaks enough RESP for core.state.RedisStateStore: PING, SELECT, GET,
+SET (EX/PX), DEL, FLUSHDB, DBSIZE, QUIT, and WATCH / UNWATCH / MULTI /
+EXEC for atomic updates. Data lives in memory.
+
+Usage:
+    python -m benchmarks.fake_redis --port 6380
+    B99_SESSION_BACKEND=redis B99_STATE_URL=redis://localhost:6380/0 uvicorn api.main:app
+
+In-process: port, stop = serve_in_thread()
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import Callable, Optional
+
+
+class FakeRedis:
+    def __init__(self):
+        self._dbs: dict[int, dict[bytes, tuple[bytes, Optional[float]]]] = {}
+        # Bumped on every write to a key (and per db on FLUSHDB), for WATCH
+        self._versions: dict[tuple[int, bytes], int] = {}
+        self._epochs: dict[int, int] = {}
+        self.commands = 0
+
+    def version(self, db: int, key: bytes) -> tuple[int, int]:
+        return self._epochs.get(db, 0), self._versions.get((db, key), 0)
+
+    def _touch(self, db: int, key: bytes) -> None:
+        self._versions[(db, key)] = self._versions.get((db, key), 0) + 1
+
+    def _db(self, index: int) -> dict:
+        return self._dbs.setdefault(index, {})
+
+    def execute(self, db: int, args: list[bytes]):
+        self.commands += 1
+        name = args[0].upper()
+        data = self._db(db)
+        if name == b"PING":
+            return "+PONG"
+        if name == b"GET":
+            entry = data.get(args[1])
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                del data[args[1]]
+                return None
+            return value
+        if name == b"SET":
+            expires = None
+            options = [a.upper() for a in args[3:]]
+            for i, option in enumerate(options):
+                if option in (b"EX", b"PX"):
+                    amount = int(args[3 + i + 1])
+                    expires = time.monotonic() + (amount if option == b"EX" else amount / 1000)
+            data[args[1]] = (args[2], expires)
+            self._touch(db, args[1])
+            return "+OK"
+        if name == b"DEL":
+            for k in args[1:]:
+                self._touch(db, k)
+            return sum(data.pop(k, None) is not None for k in args[1:])
+        if name == b"FLUSHDB":
+            data.clear()
+            self._epochs[db] = self._epochs.get(db, 0) + 1
+            return "+OK"
+        if name == b"DBSIZE":
+            return len(data)
+        return f"-ERR unknown command '{name.decode()}'"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        db = 0
+        watched: dict[bytes, tuple[int, int]] = {}
+        queued: Optional[list] = None  # commands after MULTI
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                count = int(line[1:-2])
+                args = []
+                for _ in range(count):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                name = args[0].upper()
+                if name == b"QUIT":
+                    writer.write(b"+OK\r\n")
+                    break
+                if name == b"SELECT":
+                    db = int(args[1])
+                    reply = "+OK"
+                elif name == b"WATCH":
+                    watched.update((k, self.version(db, k)) for k in args[1:])
+                    reply = "+OK"
+                elif name == b"UNWATCH":
+                    watched.clear()
+                    reply = "+OK"
+                elif name == b"MULTI":
+                    queued = []
+                    reply = "+OK"
+                elif name == b"EXEC":
+                    if queued is None:
+                        reply = "-ERR EXEC without MULTI"
+                    elif any(self.version(db, k) != v for k, v in watched.items()):
+                        reply = _NIL_ARRAY  # a watched key changed: transaction discarded
+                    else:
+                        reply = [self.execute(db, c) for c in queued]
+                    queued = None
+                    watched.clear()
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "+QUEUED"
+                else:
+                    reply = self.execute(db, args)
+                writer.write(_encode(reply))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+
+_NIL_ARRAY = object()
+
+
+def _encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if reply is _NIL_ARRAY:
+        return b"*-1\r\n"
+    if isinstance(reply, list):
+        return b"*%d\r\n" % len(reply) + b"".join(_encode(r) for r in reply)
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, str):
+        return reply.encode() + b"\r\n"
+    return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 6380, server: Optional[FakeRedis] = None):
+    fake = server or FakeRedis()
+    return await asyncio.start_server(fake.handle, host, port)
+
+
+def serve_in_thread(port: int = 0) -> tuple[int, Callable[[], None]]:
+    """Run a fake server on a background thread. Returns (port, stop)."""
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    holder = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        srv = loop.run_until_complete(serve(port=port))
+        holder["port"] = srv.sockets[0].getsockname()[1]
+        holder["server"] = srv
+        ready.set()
+        loop.run_forever()
+        srv.close()
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        loop.close()
+
+    thread = threading.Thread(target=run, name="fake-redis", daemon=True)
+    thread.start()
+    ready.wait()
+
+    def stop():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=2)
+
+    return holder["port"], stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+
+    async def run():
+        srv = await serve(port=args.port)
+        print(f"Fake Redis listening on 127.0.0.1:{args.port}")
+        async with srv:
+            await srv.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""
+Benchmark suite: core hot paths and every /game endpoint, no network needed.
+
+- micro: Quote.masked_text (cold and memoized), search_quotes,
+  get_canonical_character, get_season and QuotesClient._load_from_json
+- http:  in-process ASGI load test (httpx.ASGITransport, N concurrent
+  clients) against /game/quote, /game/verify, /game/search, /game/episodes
+
+Results are written as JSON; --compare prints the change against an
+earlier run, so a regression shows up between two commits.
+
+Usage:
+    python -m benchmarks.suite [--corpus 100k] [--out bench.json] [--compare old.json] [--quick]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CANONICAL_GUESSES = [
+    "Jake", "peralta", "Captain Holt", "Sarge", "Pontiac Bandit", "Jefords",
+    "Rosa Diaz", "gina linetti", "Scully", "Hitchcok", "Nobody", "Adrian",
+]
+SEARCH_QUERIES = ["the", "bone", "title of your", "cool cool cool", "a", "Holt", "nine-nine", "zzz"]
+
+
+def _stats(samples_ns: Sequence[int]) -> dict:
+    """Per-call summary in microseconds."""
+    ordered = sorted(samples_ns)
+    n = len(ordered)
+    return {
+        "calls": n,
+        "mean_us": round(sum(ordered) / n / 1000, 3),
+        "p50_us": round(ordered[n // 2] / 1000, 3),
+        "p99_us": round(ordered[min(int(n * 0.99), n - 1)] / 1000, 3),
+    }
+
+
+def _time_calls(fn: Callable, args: Sequence, rounds: int) -> dict:
+    """Time fn(arg) for every arg, rounds times over."""
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(rounds):
+        for arg in args:
+            start = clock()
+            fn(arg)
+            samples.append(clock() - start)
+    return _stats(samples)
+
+
+def run_micro(rounds: int, sample: int) -> dict:
+    from core.episodes import get_all_episodes, get_season
+    from core.quotes import Quote, QuotesClient, get_canonical_character, quotes_client
+
+    store = quotes_client.state.store
+    rng = random.Random(0)
+    ids = rng.sample(range(len(store)), min(sample, len(store)))
+    results = {}
+
+    # Cold: fresh standalone quotes, so every call masks
+    def masked_cold(i):
+        quote = store[i]
+        Quote(quote.character, quote.episode, quote.text, quote.header).masked_text()
+    results["masked_text_cold"] = _time_calls(masked_cold, ids, 1)
+    for i in ids:
+        store[i].masked_text()
+    results["masked_text_cached"] = _time_calls(lambda i: store[i].masked_text(), ids, rounds)
+
+    loop = asyncio.new_event_loop()
+    try:
+        results["search_quotes"] = _time_calls(
+            lambda q: loop.run_until_complete(quotes_client.search_quotes(q, limit=10)),
+            SEARCH_QUERIES, rounds * 20,
+        )
+    finally:
+        loop.close()
+
+    results["get_canonical_character"] = _time_calls(get_canonical_character, CANONICAL_GUESSES, rounds * 100)
+    episodes = get_all_episodes()
+    variants = episodes + [e.upper() for e in episodes] + [e.replace("(Part ", "Pt. ") for e in episodes]
+    results["get_season"] = _time_calls(get_season, variants, rounds * 5)
+
+    def load_json(_):
+        client = QuotesClient()
+        client._load_from_json()
+    results["load_from_json"] = _time_calls(load_json, [None], max(rounds // 2, 1))
+    return results
+
+
+async def _load_endpoint(client, make_request: Callable, requests: int, concurrency: int) -> dict:
+    latencies: list[int] = []
+    errors = 0
+    remaining = requests
+    clock = time.perf_counter_ns
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, params = make_request()
+            start = clock()
+            response = await client.request(method, url, params=params)
+            latencies.append(clock() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    summary = _stats(latencies)
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(summary["p50_us"] / 1000, 3),
+        "p99_ms": round(summary["p99_us"] / 1000, 3),
+    }
+
+
+async def run_http(requests: int, concurrency: int) -> dict:
+    import httpx
+
+    from api.main import app
+    from core.quotes import CHARACTER_ALIASES, quotes_client
+
+    rng = random.Random(0)
+    store = quotes_client.state.store
+    characters = list(CHARACTER_ALIASES)
+    seasons = list(range(1, 9))
+
+    def quote():
+        params = rng.choice([{}, {"hard_mode": "true"}, {"character": rng.choice(characters)},
+                             {"season": rng.choice(seasons)}])
+        return "GET", "/game/quote", params
+
+    def verify():
+        answer = store[rng.randrange(len(store))]
+        guess = answer.character if rng.random() < 0.5 else rng.choice(characters)
+        return "POST", "/game/verify", {"guess": guess, "answer": answer.character,
+                                        "guess_episode": answer.episode, "answer_episode": answer.episode}
+
+    queries = [q for q in SEARCH_QUERIES if len(q) >= 2]  # the endpoint's min_length
+
+    def search():
+        return "GET", "/game/search", {"q": rng.choice(queries), "limit": 10}
+
+    def episodes():
+        return "GET", "/game/episodes", rng.choice([{}, {"season": rng.choice(seasons)}])
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, make_request in [("quote", quote), ("verify", verify), ("search", search), ("episodes", episodes)]:
+            await _load_endpoint(client, make_request, min(requests, 50), concurrency)  # warm up
+            results[name] = await _load_endpoint(client, make_request, requests, concurrency)
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> list[str]:
+    """Lines showing each shared metric's change (positive % = slower / fewer rps)."""
+    lines = []
+    for name, now in current.get("micro", {}).items():
+        then = baseline.get("micro", {}).get(name)
+        if then:
+            change = (now["mean_us"] - then["mean_us"]) / then["mean_us"] * 100
+            lines.append(f"micro {name:26} {then['mean_us']:10.2f} -> {now['mean_us']:10.2f} us  {change:+6.1f}%")
+    for name, now in current.get("http", {}).items():
+        then = baseline.get("http", {}).get(name)
+        if then:
+            change = (then["rps"] - now["rps"]) / then["rps"] * 100
+            lines.append(f"http  {name:26} {then['rps']:10.1f} -> {now['rps']:10.1f} rps {change:+6.1f}%")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", default=None, help="Synthetic size (10k, 100k, 1m) or a quotes JSON path")
+    parser.add_argument("--out", default=None, help="Write results JSON here")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations (smoke run)")
+    parser.add_argument("--only", choices=["micro", "http"], default=None)
+    parser.add_argument("--requests", type=int, default=None, help="Requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    # Point the app at the corpus before anything reads settings
+    if args.corpus:
+        from benchmarks.synthetic import ensure_corpus, parse_size
+        path = Path(args.corpus) if args.corpus.endswith(".json") else ensure_corpus(parse_size(args.corpus))
+        os.environ["B99_QUOTES_JSON"] = str(path)
+    os.environ["B99_SNAPSHOT"] = ""
+    os.environ["B99_MODE"] = "local"
+    from core.config import get_settings
+    get_settings.cache_clear()
+
+    from core.quotes import quotes_client
+    quotes_client.load()
+
+    rounds = 1 if args.quick else 5
+    requests = args.requests or (200 if args.quick else 2000)
+    results = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "corpus": get_settings().B99_QUOTES_JSON,
+            "quotes": len(quotes_client.state.store),
+        },
+    }
+    if args.only in (None, "micro"):
+        results["micro"] = run_micro(rounds, sample=200 if args.quick else 1000)
+    if args.only in (None, "http"):
+        results["http"] = asyncio.run(run_http(requests, args.concurrency))
+
+    for section in ("micro", "http"):
+        for name, row in results.get(section, {}).items():
+            print(f"{section:5} {name:26} " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(results, json.load(f)):
+                print(line)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+Synthetic corpora: data/quotes.json scaled to any size.
+
+Records are drawn from the real corpus and their text is spliced from two
+quotes of the same speaker, so texts aren't exact duplicates (the search
+index and masking caches see realistic variety) while characters,
+episodes and headers keep their real distribution.
+
+Usage:
+    python -m benchmarks.synthetic --size 100k [--out data/synthetic/quotes_100k.json]
+    python -m benchmarks.synthetic --size 10k --size 100k --size 1m
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Iterator
+
+from core.config import get_settings
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    """'10k', '1m' or a plain number."""
+    value = value.strip().lower()
+    if value in SIZES:
+        return SIZES[value]
+    if value[-1:] in ("k", "m"):
+        return int(float(value[:-1]) * (1_000 if value[-1] == "k" else 1_000_000))
+    return int(value)
+
+
+def load_records(path: str | Path | None = None) -> list[dict]:
+    with open(path or get_settings().B99_QUOTES_JSON, encoding="utf-8-sig") as f:
+        return json.load(f)["root"]
+
+
+def generate(records: list[dict], n: int, seed: int = 0) -> Iterator[dict]:
+    """n synthetic records in the quotes.json record format."""
+    rng = random.Random(seed)
+    by_character: dict[str, list[str]] = {}
+    for record in records:
+        by_character.setdefault(record.get("Character", ""), []).append(record.get("QuoteText", ""))
+
+    for i in range(n):
+        if i < len(records):
+            # The real corpus comes first, unchanged
+            yield records[i]
+            continue
+        record = rng.choice(records)
+        texts = by_character[record.get("Character", "")]
+        first, second = record.get("QuoteText", ""), rng.choice(texts)
+        cut_a = first.find(". ", len(first) // 2)
+        cut_b = second.find(". ", len(second) // 2)
+        text = first[:cut_a + 1] + second[cut_b + 1:] if cut_a > 0 and cut_b > 0 else first
+        yield dict(record, QuoteText=text)
+
+
+def write_corpus(records: list[dict], n: int, out: Path, seed: int = 0) -> Path:
+    """Stream n synthetic records to out as {"root": [...]} without holding them."""
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write('{"root": [\n')
+        for i, record in enumerate(generate(records, n, seed)):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n]}\n")
+    tmp.replace(out)
+    return out
+
+
+def corpus_path(n: int, directory: Path = Path("data/synthetic")) -> Path:
+    label = next((k for k, v in SIZES.items() if v == n), str(n))
+    return directory / f"quotes_{label}.json"
+
+
+def ensure_corpus(n: int, seed: int = 0) -> Path:
+    """Path of an n-quote synthetic corpus, generated on first use."""
+    path = corpus_path(n)
+    if not path.exists():
+        write_corpus(load_records(), n, path, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", action="append", required=True, help="10k, 100k, 1m or a number (repeatable)")
+    parser.add_argument("--out", default=None, help="Output path (single size only)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.out and len(args.size) > 1:
+        parser.error("--out needs a single --size")
+
+    records = load_records()
+    for size in args.size:
+        n = parse_size(size)
+        out = Path(args.out) if args.out else corpus_path(n)
+        write_corpus(records, n, out, args.seed)
+        print(f"Wrote {out}: {n} quotes, {out.stat().st_size:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
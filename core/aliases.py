@@ -0,0 +1,85 @@
+"""
+Character alias index.
+Resolves guesses and speaker names to canonical characters with dict lookups
+instead of walking the alias table on every call.
+"""
+
+from typing import Mapping, Optional, Sequence
+
+# Misspellings are only corrected for names at least this long, so short
+# names ("Amy", "Pam", "Rosa") never resolve to a neighbour by accident
+MIN_FUZZY_LENGTH = 5
+
+
+def normalize_name(name: str) -> str:
+    """Casefold and collapse whitespace: '  Captain   HOLT ' -> 'captain holt'."""
+    return " ".join(name.casefold().split())
+
+
+def _deletions(key: str) -> set[str]:
+    """The key plus every string one deletion away from it."""
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+class AliasIndex:
+    """
+    Normalized alias tables built once from a canonical -> aliases mapping.
+
+    - alias or canonical name -> canonical name (first group wins on clashes)
+    - canonical name -> frozenset of lowercase aliases
+    - deletion-neighbourhood index for one-typo lookups ('Fogel', 'Jefords')
+    """
+
+    def __init__(self, aliases: Mapping[str, Sequence[str]]):
+        self._canonical: dict[str, str] = {}
+        self._aliases: dict[str, frozenset[str]] = {}
+        self._neighbours: dict[str, set[str]] = {}
+
+        for canonical, names in aliases.items():
+            self._aliases[canonical] = frozenset(n.lower() for n in names)
+            for name in (canonical, *names):
+                key = normalize_name(name)
+                if not key or key in self._canonical:
+                    continue
+                self._canonical[key] = canonical
+                if len(key) >= MIN_FUZZY_LENGTH:
+                    for variant in _deletions(key):
+                        self._neighbours.setdefault(variant, set()).add(canonical)
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_name(name) in self._canonical
+
+    def canonical(self, name: str, fuzzy: bool = False) -> Optional[str]:
+        """
+        Map a name or alias to its canonical character.
+
+        With fuzzy=True, a name one edit away from a unique character's alias
+        (insertion, deletion, substitution or adjacent swap) also resolves.
+        """
+        key = normalize_name(name)
+        if not key:
+            return None
+        found = self._canonical.get(key)
+        if found is not None or not fuzzy or len(key) < MIN_FUZZY_LENGTH:
+            return found
+
+        matches: set[str] = set()
+        for variant in _deletions(key):
+            matches.update(self._neighbours.get(variant, ()))
+        if len(matches) == 1:
+            return next(iter(matches))
+        return None
+
+    def aliases(self, name: str) -> frozenset[str]:
+        """All lowercase name variations for a character (empty if unknown)."""
+        canonical = self._canonical.get(normalize_name(name))
+        if canonical is None:
+            return frozenset()
+        return self._aliases[canonical]
+
+    def names(self) -> list[str]:
+        """Every normalized name the index knows, sorted."""
+        return sorted(self._canonical)
@@ -1,34 +1,80 @@
 """
 Centralized configuration for B99 Quote Guesser.
 All environment variables and settings are managed here.
+
+Nothing is read at import time: the .env file and environment are read on
+the first get_settings() call (or first access to `settings`).
 """
 
 import os
 from functools import lru_cache
 from dotenv import load_dotenv
 
-load_dotenv()
-
 
 class Settings:
     """Application settings loaded from environment variables."""
 
     # --- App ---
-    BASE_URL: str = os.environ.get("BASE_URL", "http://localhost:8000")
-    DEBUG: bool = os.environ.get("DEBUG", "false").lower() == "true"
+    BASE_URL: str
+    DEBUG: bool
 
     # --- B99 Quotes ---
-    B99_MODE: str = os.environ.get("B99_MODE", "local")  # "local" or "api"
-    B99_QUOTES_JSON: str | None = os.environ.get("B99_QUOTES_JSON") or "data/quotes.json"
-    B99_API_URL: str = os.environ.get(
-        "B99_API_URL", "https://brooklyn-nine-nine-quotes.herokuapp.com/api/v1"
-    )
+    B99_MODE: str  # "local" or "api"
+    B99_QUOTES_JSON: str | None
+    B99_API_URL: str
+    B99_API_TIMEOUT: float  # Seconds per request to the quotes API
+    B99_API_BATCH: int  # Quotes prefetched per API request
+    B99_API_CACHE: str | None  # On-disk cache of fetched quotes ("" = off)
+    B99_API_CACHE_SIZE: int  # Max quotes kept in the disk cache
+    B99_SNAPSHOT: str | None
+    B99_SESSION_BACKEND: str  # "memory", "sqlite" or "redis"
+    B99_SESSION_TTL: float  # Idle seconds before a game session expires
+    B99_SESSION_MAX: int  # Max sessions kept in memory (least recently used evicted)
+    B99_STATE_URL: str  # SQLite path or redis://host:port/db for shared backends
+    B99_WATCH_INTERVAL: float  # Seconds between corpus file checks (0 = off)
+    B99_ADMIN_TOKEN: str | None  # Enables POST /admin/reload when set
+    B99_PROFILE_RATE: float  # Fraction of requests sampled while profiling (DEBUG or /admin/profile)
+    B99_PROFILE_INTERVAL_MS: float  # Stack sampling interval while profiling
+    B99_WS_MAX_CONNECTIONS: int  # Open /game/ws connections per worker (more are refused)
+    B99_WS_IDLE_TIMEOUT: float  # Seconds without a message before /game/ws closes
+    B99_WS_SEND_TIMEOUT: float  # Seconds a /game/ws client may leave a push unread
+
+    def __init__(self):
+        self.BASE_URL = os.environ.get("BASE_URL", "http://localhost:8000")
+        self.DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
+
+        self.B99_MODE = os.environ.get("B99_MODE", "local")
+        self.B99_QUOTES_JSON = os.environ.get("B99_QUOTES_JSON") or "data/quotes.json"
+        self.B99_API_URL = os.environ.get(
+            "B99_API_URL", "https://brooklyn-nine-nine-quotes.herokuapp.com/api/v1"
+        )
+        self.B99_API_TIMEOUT = float(os.environ.get("B99_API_TIMEOUT") or 5)
+        self.B99_API_BATCH = int(os.environ.get("B99_API_BATCH") or 100)
+        self.B99_API_CACHE = os.environ.get("B99_API_CACHE", "data/api_cache.json")
+        self.B99_API_CACHE_SIZE = int(os.environ.get("B99_API_CACHE_SIZE") or 5000)
+        self.B99_SNAPSHOT = os.environ.get("B99_SNAPSHOT", "data/quotes.snapshot")
+        self.B99_SESSION_BACKEND = os.environ.get("B99_SESSION_BACKEND", "memory")
+        self.B99_SESSION_TTL = float(os.environ.get("B99_SESSION_TTL") or 3600)
+        self.B99_SESSION_MAX = int(os.environ.get("B99_SESSION_MAX") or 10_000)
+        self.B99_STATE_URL = os.environ.get("B99_STATE_URL", "")
+        self.B99_WATCH_INTERVAL = float(os.environ.get("B99_WATCH_INTERVAL") or 0)
+        self.B99_ADMIN_TOKEN = os.environ.get("B99_ADMIN_TOKEN") or None
+        self.B99_PROFILE_RATE = float(os.environ.get("B99_PROFILE_RATE") or 0.05)
+        self.B99_PROFILE_INTERVAL_MS = float(os.environ.get("B99_PROFILE_INTERVAL_MS") or 5)
+        self.B99_WS_MAX_CONNECTIONS = int(os.environ.get("B99_WS_MAX_CONNECTIONS") or 10_000)
+        self.B99_WS_IDLE_TIMEOUT = float(os.environ.get("B99_WS_IDLE_TIMEOUT") or 600)
+        self.B99_WS_SEND_TIMEOUT = float(os.environ.get("B99_WS_SEND_TIMEOUT") or 10)
+
 
 @lru_cache
 def get_settings() -> Settings:
-    """Get cached settings instance."""
+    """Get cached settings instance (loads .env on first call)."""
+    load_dotenv()
     return Settings()
 
 
-# Convenience alias
-settings = get_settings()
+def __getattr__(name: str):
+    # Convenience alias: `from core.config import settings` resolves lazily
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
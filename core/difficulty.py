@@ -0,0 +1,183 @@
+"""
+Quote difficulty scoring.
+
+A batch pass over the corpus gives every quote a score in [0, 1] (higher =
+harder) and sorts quotes into equal-sized easy / medium / hard buckets.
+`python -m core.snapshot` stores both in the snapshot; the JSON load path
+scores on first use.
+
+Signals (per quote):
+- brevity:  short quotes give less context
+- hidden:   few capitalized names left after masking (nothing to go on)
+- crowd:    several speakers in one quote blur who the speaker is
+- rarity:   characters with few quotes are harder to place
+
+The per-quote signals (which need the masked text) are computed in a
+process pool for large corpora; the combination step is a few passes
+over arrays.
+"""
+
+import argparse
+import math
+import os
+import re
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Literal, Optional, Sequence
+
+from core.masking import NAME_COLON_PATTERN
+
+Difficulty = Literal["easy", "medium", "hard"]
+DIFFICULTY_LEVELS: tuple[str, ...] = ("easy", "medium", "hard")
+
+# Signal weights (sum to 1)
+WEIGHTS = {"brevity": 0.35, "hidden": 0.25, "crowd": 0.15, "rarity": 0.25}
+
+# Below this many quotes a process pool costs more than it saves
+POOL_THRESHOLD = 20_000
+
+_CAPITALIZED = re.compile(r"[A-Z][a-zA-Z'\-]+")
+_WORD = re.compile(r"\w+")
+# Capitalized words that are not names
+_NOT_NAMES = frozenset({
+    "I", "I'm", "I'll", "I've", "I'd", "OK", "Okay", "Oh", "God", "Mr", "Mrs", "Ms",
+    "Dr", "Sir", "Captain", "Sergeant", "Detective", "Lieutenant", "Officer",
+})
+
+
+def _leftover_names(masked: str) -> int:
+    """Capitalized words after masking that don't just start a sentence or line."""
+    count = 0
+    for match in _CAPITALIZED.finditer(masked):
+        word = match.group()
+        if word in _NOT_NAMES or word.isupper():
+            continue
+        j = match.start() - 1
+        while j >= 0 and masked[j].isspace():
+            j -= 1
+        # Sentence/line starts and the first word after an attribution aren't names
+        if j < 0 or masked[j] in '.!?:"([':
+            continue
+        count += 1
+    return count
+
+
+def raw_signals(
+    texts: Sequence[str],
+    characters: Sequence[str],
+    masked: Optional[Sequence[str]] = None,
+) -> tuple[array, array, array]:
+    """
+    (word count, leftover names, distinct speakers) per quote.
+    Masks the text itself when masked is None (so pool workers share the work).
+    """
+    if masked is None:
+        from core.quotes import name_masker
+        masked = [name_masker.mask(t, c) for t, c in zip(texts, characters)]
+    words, leftover, speakers = array("I"), array("I"), array("I")
+    for text, masked_text in zip(texts, masked):
+        words.append(len(_WORD.findall(text)))
+        leftover.append(_leftover_names(masked_text))
+        speakers.append(max(len(set(NAME_COLON_PATTERN.findall(text))), 1))
+    return words, leftover, speakers
+
+
+def _raw_signals_chunk(args):
+    return raw_signals(*args)
+
+
+def score_quotes(
+    texts: Sequence[str],
+    characters: Sequence[str],
+    masked: Optional[Sequence[str]] = None,
+    processes: Optional[int] = None,
+) -> array:
+    """
+    Difficulty score per quote (array of float32, 0 = easiest, 1 = hardest).
+
+    Args:
+        texts: Quote texts
+        characters: Speaker per quote
+        masked: Masked texts, if already computed
+        processes: Worker processes (None = CPU count for large corpora, 1 = in-process)
+    """
+    n = len(texts)
+    if n == 0:
+        return array("f")
+    if processes is None:
+        processes = (os.cpu_count() or 1) if n >= POOL_THRESHOLD else 1
+
+    if processes > 1:
+        size = math.ceil(n / (processes * 4))
+        chunks = [
+            (list(texts[i:i + size]), list(characters[i:i + size]),
+             list(masked[i:i + size]) if masked is not None else None)
+            for i in range(0, n, size)
+        ]
+        words, leftover, speakers = array("I"), array("I"), array("I")
+        with ProcessPoolExecutor(processes) as pool:
+            for w, l, s in pool.map(_raw_signals_chunk, chunks):
+                words.extend(w)
+                leftover.extend(l)
+                speakers.extend(s)
+    else:
+        words, leftover, speakers = raw_signals(texts, characters, masked)
+
+    counts: dict[str, int] = {}
+    for c in characters:
+        counts[c] = counts.get(c, 0) + 1
+    log_n = math.log(n) if n > 1 else 1.0
+    rarity = {c: math.log(n / k) / log_n for c, k in counts.items()}
+
+    # Brevity is relative to a long-but-typical quote (95th percentile)
+    long_quote = math.log1p(sorted(words)[int(0.95 * (n - 1))] or 1)
+
+    w_brevity, w_hidden, w_crowd, w_rarity = (
+        WEIGHTS["brevity"], WEIGHTS["hidden"], WEIGHTS["crowd"], WEIGHTS["rarity"]
+    )
+    scores = array("f")
+    for i in range(n):
+        brevity = 1.0 - min(math.log1p(words[i]) / long_quote, 1.0)
+        hidden = 1.0 / (1 + leftover[i])
+        crowd = min((speakers[i] - 1) / 3, 1.0)
+        scores.append(
+            w_brevity * brevity + w_hidden * hidden + w_crowd * crowd + w_rarity * rarity[characters[i]]
+        )
+    return scores
+
+
+def bucket_scores(scores: Sequence[float]) -> dict[str, array]:
+    """Split quote ids into equal-sized easy/medium/hard buckets (each sorted)."""
+    order = sorted(range(len(scores)), key=lambda i: (scores[i], i))
+    size = math.ceil(len(order) / len(DIFFICULTY_LEVELS)) if order else 0
+    return {
+        level: array("I", sorted(order[k * size:(k + 1) * size]))
+        for k, level in enumerate(DIFFICULTY_LEVELS)
+    }
+
+
+def main():
+    from core.config import get_settings
+    from core.quotes import load_quote_store
+
+    parser = argparse.ArgumentParser(description="Score quote difficulty and show the buckets.")
+    parser.add_argument("--json", default=get_settings().B99_QUOTES_JSON, help="Source quotes JSON")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: auto)")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat the corpus N times (timing)")
+    args = parser.parse_args()
+
+    store = load_quote_store(args.json)
+    texts = list(store.texts) * args.scale
+    characters = [store.characters[c] for c in store.character_ids] * args.scale
+    start = time.perf_counter()
+    scores = score_quotes(texts, characters, processes=args.processes)
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(scores)} quotes in {elapsed:.2f}s")
+    for level, ids in bucket_scores(scores).items():
+        sample = texts[ids[len(ids) // 2]][:80].replace("\n", " ") if ids else ""
+        print(f"{level:7} {len(ids):6} quotes, e.g. {sample!r}")
+
+
+if __name__ == "__main__":
+    main()
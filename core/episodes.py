@@ -3,6 +3,10 @@ Brooklyn 99 Episode to Season mapping.
 Used for the harder game mode where players guess season + episode.
 """
 
+import difflib
+import re
+from dataclasses import dataclass
+
 # Episode name -> Season number mapping
 EPISODE_SEASONS = {
     # Season 1
@@ -183,32 +187,125 @@ EPISODE_SEASONS = {
 }
 
 
-def get_season(episode_name: str) -> int | None:
+# "Pt. 1", "Pt.1", "(Part 1)", "Part 1" -> "part 1"
+_PART_PATTERN = re.compile(r'\(?\b(?:pt|part)\b\.?\s*(\d+)\)?')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_episode(name: str) -> str:
     """
-    Get the season number for an episode.
-    Returns None if episode not found.
+    Normalize an episode name for lookups.
+    'The Fugitive (Part 1)' and 'the fugitive pt.1' both become 'the fugitive part 1'.
+    """
+    key = name.casefold().replace("&", " and ")
+    key = _PART_PATTERN.sub(r" part \1 ", key)
+    return " ".join(_NON_ALNUM.sub(" ", key).split())
+
+
+@dataclass(frozen=True)
+class Episode:
+    """A canonical episode and every spelling that refers to it."""
+    id: str
+    name: str
+    season: int
+    variants: tuple[str, ...]
+
+
+class EpisodeCatalog:
     """
-    if not episode_name:
-        return None
+    Episode lookups built once from an episode -> season mapping.
+    
+    Spellings that normalize to the same key (e.g. 'The Fugitive Pt. 1' and
+    'The Fugitive (Part 1)') collapse into one Episode. The later spelling is
+    the display name, the same way a duplicate dict key keeps its last value.
+    """
+    
+    def __init__(self, seasons: dict[str, int]):
+        variants: dict[str, list[str]] = {}
+        season_of: dict[str, int] = {}
+        for name, season in seasons.items():
+            key = normalize_episode(name)
+            variants.setdefault(key, []).append(name)
+            season_of[key] = season
+        
+        self._by_key: dict[str, Episode] = {}
+        for key, names in variants.items():
+            self._by_key[key] = Episode(
+                id=key.replace(" ", "-"),
+                name=names[-1],
+                season=season_of[key],
+                variants=tuple(names),
+            )
+        self._by_id = {ep.id: ep for ep in self._by_key.values()}
+        
+        self._by_season: dict[int, list[str]] = {}
+        for ep in self._by_key.values():
+            self._by_season.setdefault(ep.season, []).append(ep.name)
+        for names in self._by_season.values():
+            names.sort()
+        self._by_season = dict(sorted(self._by_season.items()))
     
-    # Try exact match first
-    if episode_name in EPISODE_SEASONS:
-        return EPISODE_SEASONS[episode_name]
+    def __len__(self) -> int:
+        return len(self._by_key)
     
-    # Try case-insensitive match
-    episode_lower = episode_name.lower().strip()
-    for ep, season in EPISODE_SEASONS.items():
-        if ep.lower() == episode_lower:
-            return season
+    def __iter__(self):
+        return iter(self._by_key.values())
     
-    return None
+    def get(self, name: str, fuzzy: bool = False) -> Episode | None:
+        """
+        Look up an episode by any spelling.
+        With fuzzy=True, close misspellings (e.g. 'The Fugitve Part 1') also match.
+        """
+        if not name:
+            return None
+        key = normalize_episode(name)
+        episode = self._by_key.get(key)
+        if episode is None and fuzzy and key:
+            close = difflib.get_close_matches(key, self._by_key.keys(), n=1, cutoff=0.85)
+            if close:
+                episode = self._by_key[close[0]]
+        return episode
+    
+    def by_id(self, episode_id: str) -> Episode | None:
+        """Look up an episode by its canonical ID (e.g. 'the-fugitive-part-1')."""
+        return self._by_id.get(episode_id)
+    
+    def season_of(self, name: str) -> int | None:
+        """Season number for any spelling of an episode."""
+        episode = self.get(name)
+        return episode.season if episode else None
+    
+    def names(self) -> list[str]:
+        """Sorted display names of every episode."""
+        return sorted(ep.name for ep in self._by_key.values())
+    
+    def by_season(self, season: int) -> list[str]:
+        """Sorted display names of one season's episodes."""
+        return self._by_season.get(season, [])
+    
+    def grouped(self) -> dict[int, list[str]]:
+        """Season -> sorted display names, seasons in order."""
+        return self._by_season
+
+
+# Built once at import
+episode_catalog = EpisodeCatalog(EPISODE_SEASONS)
+
+
+def get_season(episode_name: str) -> int | None:
+    """
+    Get the season number for an episode.
+    Accepts any known spelling ('Pt. 1' / '(Part 1)', any case).
+    Returns None if episode not found.
+    """
+    return episode_catalog.season_of(episode_name)
 
 
 def get_all_episodes() -> list[str]:
     """Get list of all known episodes."""
-    return sorted(set(EPISODE_SEASONS.keys()))
+    return episode_catalog.names()
 
 
 def get_episodes_by_season(season: int) -> list[str]:
     """Get all episodes from a specific season."""
-    return [ep for ep, s in EPISODE_SEASONS.items() if s == season]
+    return list(episode_catalog.by_season(season))
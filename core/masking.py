@@ -0,0 +1,119 @@
+"""
+Character name masking for quote text.
+All known names are compiled into one pattern when the engine is built, so
+masking a quote costs a couple of regex scans instead of one pass per name.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Iterable
+
+# Dialogue attribution, e.g. "Amy:" or "Captain Holt:"
+NAME_COLON_PATTERN = re.compile(r'\b([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)\s*:')
+
+SPEAKER_TOKEN = "[SPEAKER]"
+CHARACTER_TOKEN = "[CHARACTER]"
+
+# Temporary marker for speaker names. Underscores are word characters, so no
+# name pattern can match inside it between the speaker and non-speaker scans.
+_SPEAKER_PLACEHOLDER = "__SPEAKER__"
+
+
+def _trie_regex(node: dict) -> str:
+    """Regex source for a character trie; deeper (longer) matches are tried first."""
+    end = "" in node
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if end:
+        return "(?:" + body + ")?"
+    return body
+
+
+def _names_pattern(names: Iterable[str]) -> re.Pattern | None:
+    """
+    Compile names into a single case-insensitive, word-bounded pattern.
+
+    Names are folded into a trie so the regex engine walks shared prefixes
+    once. Every candidate at a given position lies on one trie path, so the
+    greedy walk picks the longest name there ('Doug Judy' over 'Doug').
+    """
+    trie: dict = {}
+    for name in names:
+        node = trie
+        for ch in name.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    if not trie:
+        return None
+    return re.compile(r'\b(?:' + _trie_regex(trie) + r')\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def _word_pattern(name: str) -> re.Pattern:
+    """Compiled word-bounded pattern for a single name discovered in a quote."""
+    return re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
+
+
+class NameMasker:
+    """
+    Masks character names in quote text.
+
+    - Names of the speaker → [SPEAKER]
+    - Any other known or discovered name → [CHARACTER]
+
+    Output matches the original name-by-name masking: speaker names are
+    replaced first, then every other known name in one longest-first scan,
+    then names found via "Name:" attributions that are still left over.
+    """
+
+    def __init__(
+        self,
+        character_names: Iterable[str],
+        extra_names: Iterable[str],
+        speaker_aliases: Callable[[str], set[str]],
+    ):
+        """
+        Args:
+            character_names: Names from the alias table (names of 2 chars or
+                fewer are never masked, e.g. 'CJ')
+            extra_names: Guest/minor names that are always masked
+            speaker_aliases: Maps a character to its lowercase name variations
+        """
+        known = [n for n in character_names if len(n) > 2] + list(extra_names)
+        self._known_lower = frozenset(n.lower() for n in known)
+        self._names_pattern = _names_pattern(known)
+        self._speaker_aliases = speaker_aliases
+        self._speakers: dict[str, tuple[frozenset[str], re.Pattern | None]] = {}
+
+    def _speaker(self, character: str) -> tuple[frozenset[str], re.Pattern | None]:
+        """Lowercase aliases and compiled pattern for a speaker (cached)."""
+        cached = self._speakers.get(character)
+        if cached is None:
+            aliases = frozenset(self._speaker_aliases(character)) if character else frozenset()
+            cached = (aliases, _names_pattern(n for n in aliases if len(n) > 2))
+            self._speakers[character] = cached
+        return cached
+
+    def mask(self, text: str, character: str) -> str:
+        """Return text with every character name masked."""
+        speaker_names, speaker_pattern = self._speaker(character)
+
+        # "Name:" attributions for names the known-name scan does not cover
+        discovered = {
+            name for name in NAME_COLON_PATTERN.findall(text)
+            if len(name) > 2
+            and name.lower() not in speaker_names
+            and name.lower() not in self._known_lower
+        }
+
+        masked = text
+        if speaker_pattern is not None:
+            masked = speaker_pattern.sub(_SPEAKER_PLACEHOLDER, masked)
+        if self._names_pattern is not None:
+            masked = self._names_pattern.sub(CHARACTER_TOKEN, masked)
+        for name in sorted(discovered, key=len, reverse=True):
+            masked = _word_pattern(name).sub(CHARACTER_TOKEN, masked)
+
+        return masked.replace(_SPEAKER_PLACEHOLDER, SPEAKER_TOKEN)
@@ -0,0 +1,228 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms keep one shard per thread: a thread only ever
+writes its own shard, so recording takes no lock (only the first write
+from a new thread registers its shard). A scrape sums the shards; a value
+read mid-update is at most one observation behind. Gauges are callbacks
+evaluated at scrape time, for things the app already tracks (corpus and
+index sizes, cache hit counts).
+
+    requests = registry.counter("b99_requests_total", "Requests", ("route",))
+    requests.inc(("/game/quote",))
+    with span("search"):
+        ...
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Mapping, Sequence
+
+# Seconds; covers a cached lookup (microseconds) up to a full corpus load
+DEFAULT_BUCKETS = (
+    0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Sharded:
+    """Per-thread shards of label -> value, summed on read."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: list[dict] = []
+        self._register_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._register_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshot_shards(self) -> list[dict]:
+        with self._register_lock:
+            shards = list(self._shards)
+        # Copying a dict runs entirely under the GIL, so each copy is consistent
+        return [dict(shard) for shard in shards]
+
+
+class Counter(_Sharded):
+    """Monotonic count per label set."""
+
+    kind = "counter"
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def values(self) -> dict[Labels, float]:
+        totals: dict[Labels, float] = {}
+        for shard in self._snapshot_shards():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def render(self) -> Iterable[str]:
+        for labels, value in sorted(self.values().items()):
+            yield f"{self.name}{_label_text(self.labelnames, labels)} {_number(value)}"
+
+
+class Histogram(_Sharded):
+    """Bucketed observations (e.g. latency in seconds) per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, labels: Labels, value: float) -> None:
+        shard = self._shard()
+        entry = shard.get(labels)
+        if entry is None:
+            # [count per bucket..., +Inf bucket, sum]
+            entry = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        entry[bisect_left(self.buckets, value)] += 1
+        entry[-1] += value
+
+    def values(self) -> dict[Labels, list]:
+        totals: dict[Labels, list] = {}
+        for shard in self._snapshot_shards():
+            for labels, entry in shard.items():
+                total = totals.get(labels)
+                if total is None:
+                    totals[labels] = list(entry)
+                else:
+                    for i, v in enumerate(entry):
+                        total[i] += v
+        return totals
+
+    def render(self) -> Iterable[str]:
+        for labels, entry in sorted(self.values().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), entry):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}"
+            label_text = _label_text(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_number(entry[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class Gauge:
+    """Value(s) read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, read: Callable[[], float | Mapping[Labels, float] | None],
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._read = read
+
+    def render(self) -> Iterable[str]:
+        try:
+            value = self._read()
+        except Exception as e:
+            print(f"Warning: Metric {self.name} failed: {e}")
+            return
+        if value is None:
+            return
+        items = value.items() if isinstance(value, Mapping) else [((), value)]
+        for labels, v in sorted(items):
+            if v is not None:
+                yield f"{self.name}{_label_text(self.labelnames, labels)} {_number(v)}"
+
+
+class Registry:
+    """Named metrics, rendered together in Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, Counter | Histogram | Gauge] = {}
+
+    def _add(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable, labelnames: Sequence[str] = ()) -> Gauge:
+        """Register (or replace) a callback gauge."""
+        metric = Gauge(name, help, read, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Shared by the core modules' timing spans
+span_seconds = registry.histogram(
+    "b99_span_seconds", "Time spent in instrumented code paths", ("span",)
+)
+
+
+class span:
+    """
+    Time a block into b99_span_seconds{span=name}:
+
+        with span("search"):
+            ...
+    """
+
+    __slots__ = ("_labels", "_start")
+
+    def __init__(self, name: str):
+        self._labels = (name,)
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        span_seconds.observe(self._labels, time.perf_counter() - self._start)
+        return False
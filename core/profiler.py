@@ -0,0 +1,204 @@
+"""
+Sampling profiler for live requests.
+
+When enabled, a fraction of requests is marked for profiling. While any
+marked request is in flight, a background thread samples the event loop
+thread's stack every few milliseconds (sys._current_frames, no tracing
+hooks), so the request code itself runs at full speed. Each sample is
+credited to the route of the marked request whose middleware frame is on
+the stack; samples taken while the loop is busy elsewhere (other
+requests, scheduling, socket I/O) go to "(event loop)".
+
+Stacks aggregate per route and export as collapsed stacks (flamegraph.pl,
+speedscope) or a pstats file (snakeviz, `python -m pstats`). When the
+profiler is off, nothing runs and the middleware only checks one flag.
+"""
+
+import marshal
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+# Cap on distinct (route, stack) entries; later new stacks are counted as dropped
+MAX_STACKS = 20_000
+MAX_DEPTH = 128
+EVENT_LOOP = "(event loop)"
+
+_Frame = tuple[str, int, str]  # (filename, first line, function), as pstats keys
+
+
+class SamplingProfiler:
+    def __init__(self, rate: float = 0.05, interval: float = 0.005):
+        """
+        Args:
+            rate: Fraction of requests to profile (0-1)
+            interval: Seconds between stack samples
+        """
+        self.enabled = False
+        self.rate = rate
+        self.interval = interval
+        self._target: Optional[int] = None  # thread id of the event loop
+        # Frame of a profiled request's middleware call -> its route (resolved when sampled)
+        self._marks: dict[object, Callable[[], str]] = {}
+        self._stacks: dict[tuple[str, tuple[_Frame, ...]], int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.samples = 0
+        self.dropped = 0
+        self.requests = 0
+        self.started_at: Optional[float] = None
+
+    # --- control ---
+
+    def start(self, rate: Optional[float] = None, interval: Optional[float] = None) -> None:
+        if rate is not None:
+            self.rate = min(max(rate, 0.0), 1.0)
+        if interval is not None:
+            self.interval = max(interval, 0.0005)
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.enabled = False
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stacks = {}
+            self.samples = self.dropped = self.requests = 0
+
+    # --- request hooks (event loop thread) ---
+
+    def should_profile(self) -> bool:
+        return self.enabled and random.random() < self.rate
+
+    def begin(self, route: Callable[[], str]) -> None:
+        """
+        Mark the calling frame (the middleware's) as a profiled request.
+        route is called at sample time, so it can read the route the router
+        matched after this call.
+        """
+        frame = sys._getframe(1)
+        self._target = threading.get_ident()
+        self._marks[frame] = route
+        self.requests += 1
+        self._wake.set()
+
+    def end(self) -> None:
+        self._marks.pop(sys._getframe(1), None)
+
+    # --- sampling ---
+
+    def _run(self) -> None:
+        while self.enabled:
+            if not self._marks:
+                self._wake.wait(0.5)
+                self._wake.clear()
+                continue
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self._record(frame)
+            time.sleep(self.interval)
+
+    def _record(self, frame) -> None:
+        stack: list[_Frame] = []
+        route = EVENT_LOOP
+        marks = self._marks
+        while frame is not None and len(stack) < MAX_DEPTH:
+            if route == EVENT_LOOP:
+                mark = marks.get(frame)
+                if mark is not None:
+                    route = mark()
+            code = frame.f_code
+            stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        stack.reverse()
+        key = (route, tuple(stack))
+        with self._lock:
+            self.samples += 1
+            count = self._stacks.get(key)
+            if count is None and len(self._stacks) >= MAX_STACKS:
+                self.dropped += 1
+                return
+            self._stacks[key] = (count or 0) + 1
+
+    # --- export ---
+
+    def _entries(self, route: Optional[str]) -> list[tuple[str, tuple[_Frame, ...], int]]:
+        with self._lock:
+            items = list(self._stacks.items())
+        return [(r, stack, n) for (r, stack), n in items if route is None or r == route]
+
+    def collapsed(self, route: Optional[str] = None) -> str:
+        """'route;frame;frame... count' lines (Brendan Gregg's collapsed format)."""
+        lines = []
+        for r, stack, count in sorted(self._entries(route)):
+            frames = ";".join(_frame_label(f) for f in stack)
+            lines.append(f"{r};{frames} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def pstats(self, route: Optional[str] = None) -> bytes:
+        """
+        Samples as a marshaled pstats table (pstats.Stats(path) loads it).
+        Times are samples x interval: self time for the leaf frame, cumulative
+        time for every distinct frame on the stack.
+        """
+        stats: dict[_Frame, list] = {}
+        weight = self.interval
+        for _, stack, count in self._entries(route):
+            seconds = count * weight
+            seen = set()
+            for i, frame in enumerate(stack):
+                entry = stats.get(frame)
+                if entry is None:
+                    entry = stats[frame] = [0, 0, 0.0, 0.0, {}]
+                if frame not in seen:
+                    seen.add(frame)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if i == len(stack) - 1:
+                    entry[2] += seconds
+                if i:
+                    callers = entry[4]
+                    caller = callers.get(stack[i - 1], (0, 0, 0.0, 0.0))
+                    callers[stack[i - 1]] = (
+                        caller[0] + count, caller[1] + count, caller[2], caller[3] + seconds,
+                    )
+        return marshal.dumps({f: tuple(e) for f, e in stats.items()})
+
+    def status(self) -> dict:
+        with self._lock:
+            routes: dict[str, int] = {}
+            for (route, _), count in self._stacks.items():
+                routes[route] = routes.get(route, 0) + count
+        return {
+            "enabled": self.enabled,
+            "started_at": self.started_at,
+            "rate": self.rate,
+            "interval_ms": round(self.interval * 1000, 3),
+            "requests_profiled": self.requests,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "stacks": len(self._stacks),
+            "routes": routes,
+        }
+
+
+def _frame_label(frame: _Frame) -> str:
+    filename, line, name = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+profiler = SamplingProfiler()
@@ -3,15 +3,31 @@ Brooklyn 99 Quotes Fetcher.
 Loads quotes from a local JSON file for the 'Who Said It?' game.
 """
 
+import asyncio
 import json
+import os
 import random
-import re
-from dataclasses import dataclass, field
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional, Sequence
 
-from core.config import settings
-from core.episodes import get_season
+from core.aliases import AliasIndex
+from core.config import get_settings
+from core.difficulty import bucket_scores, score_quotes
+from core.episodes import episode_catalog
+from core.masking import NameMasker
+from core.metrics import registry, span, span_seconds
+from core.remote import DiskCache, RemoteQuoteSource
+from core.sampler import QuoteSampler
+from core.search import QuoteIndex
+from core.snapshot import Snapshot, SnapshotError, fingerprint
+from core.verify import GuessVerifier
 
 
 # Character name aliases (character -> all name variations)
@@ -70,6 +86,22 @@ CHARACTER_ALIASES = {
     "Sheriff Reynolds": ["Reynolds", "Sheriff Reynolds"],
 }
 
+# Extra guest/minor character names not in main list
+EXTRA_NAMES = frozenset({
+    "Esther", "Kurm", "Dustin", "Shaw", "Figi", "Marcus", "Frederick",
+    "Seamus", "Murphy", "Figgis", "Jimmy", "Kelly", "Dozerman",
+    "Parlov", "Romero", "Jason", "Derek", "Mlepnos", "Mlep", 
+    "Stevie", "Steve", "Melanie", "Hawkins", "Veronica", "Bob",
+    "Mervyn", "Carl", "Tommy", "Johnny", "Billy", "Eddie", "Jimmy",
+    "George", "Frank", "Harry", "Jack", "Joe", "Mike", "Nick",
+    "Paul", "Pete", "Phil", "Rick", "Sam", "Tim", "Tom", "Tony",
+    "Sal", "Vinny", "Danny", "Kenny", "Larry", "Gary", "Jerry",
+    "Barry", "Terry", "Mary", "Nancy", "Sarah", "Rachel", "Linda",
+    "Susan", "Barbara", "Lisa", "Betty", "Helen", "Sandra", "Donna",
+    "Carol", "Ruth", "Sharon", "Michelle", "Laura", "Cagney", "Lacey",
+    "O'Sullivan", "Sullivan",
+})
+
 # Build flat list of all character names for masking
 ALL_CHARACTERS = sorted(
     set(name for aliases in CHARACTER_ALIASES.values() for name in aliases),
@@ -77,37 +109,26 @@ ALL_CHARACTERS = sorted(
 )
 
 
-def get_canonical_character(guess: str) -> Optional[str]:
+# Alias lookup tables, built once at import
+alias_index = AliasIndex(CHARACTER_ALIASES)
+
+
+def get_canonical_character(guess: str, fuzzy: bool = True) -> Optional[str]:
     """
     Map a guess (e.g. 'Pontiac Bandit') to the canonical character name (e.g. 'Doug Judy').
     Returns the canonical name if the guess matches any alias, else None.
+    With fuzzy=True, a single typo in a longer name (e.g. 'Jefords') is tolerated.
     """
-    guess_lower = guess.strip().lower()
-    if not guess_lower:
-        return None
-    for canonical, aliases in CHARACTER_ALIASES.items():
-        if guess_lower == canonical.lower():
-            return canonical
-        if guess_lower in (a.lower() for a in aliases):
-            return canonical
-    return None
+    return alias_index.canonical(guess, fuzzy=fuzzy)
 
 
 def get_speaker_aliases(character: str) -> set[str]:
     """Get all name variations for a character."""
-    aliases = set()
-    char_lower = character.lower().strip()
-    
-    # Check each alias group
-    for main_name, name_list in CHARACTER_ALIASES.items():
-        name_list_lower = [n.lower() for n in name_list]
-        if char_lower in name_list_lower or char_lower == main_name.lower():
-            aliases.update(n.lower() for n in name_list)
-            break
+    aliases = set(alias_index.aliases(character))
     
     # Fallback: use the character name and its parts
     if not aliases:
-        aliases.add(char_lower)
+        aliases.add(character.lower().strip())
         for part in character.split():
             if len(part) > 2:
                 aliases.add(part.lower())
@@ -115,7 +136,34 @@ def get_speaker_aliases(character: str) -> set[str]:
     return aliases
 
 
-@dataclass
+# Masking engine: all name patterns are compiled once here, not per quote
+name_masker = NameMasker(ALL_CHARACTERS, EXTRA_NAMES, get_speaker_aliases)
+
+# Accepted guesses per character and episode, for /game/verify
+guess_verifier = GuessVerifier(CHARACTER_ALIASES, alias_index, episode_catalog)
+
+
+@lru_cache
+def snapshot_fingerprint() -> bytes:
+    """
+    Fingerprint of what a snapshot's masks, scores, seasons and indexes are
+    derived with: the name tables above and the code that applies them.
+    A snapshot built with different ones is not loaded.
+    """
+    tables = json.dumps({"aliases": CHARACTER_ALIASES, "extra": sorted(EXTRA_NAMES)}, sort_keys=True)
+    return fingerprint(tables, ["core.aliases", "core.difficulty", "core.episodes", "core.masking", "core.search", __name__])
+
+
+# Masked-text memo lookups (label tuples built once)
+mask_lookups = registry.counter("b99_mask_cache_lookups_total", "Masked text lookups by result", ("result",))
+HIT, MISS = ("hit",), ("miss",)
+
+
+# Every header follows this template except a handful of malformed rows
+HEADER_TEMPLATE = "Quote from {character} in the episode {episode}"
+
+
+@dataclass(slots=True)
 class Quote:
     """Represents a Brooklyn 99 quote."""
     character: str
@@ -123,6 +171,14 @@ class Quote:
     text: str
     header: str
     season: int | None = field(default=None)
+    _masked: str | None = field(default=None, init=False, repr=False, compare=False)
+    _store: Optional["QuoteStore"] = field(default=None, init=False, repr=False, compare=False)
+    _id: int = field(default=-1, init=False, repr=False, compare=False)
+    
+    @property
+    def id(self) -> Optional[int]:
+        """Position in the QuoteStore this quote was read from (None if standalone)."""
+        return self._id if self._store is not None else None
     
     def masked_text(self) -> str:
         """
@@ -135,64 +191,20 @@ class Quote:
         2. Any "Name:" pattern (dialogue attribution)
         3. Common B99 guest character names
         4. Names that appear to be proper nouns in context
-        """
-        masked = self.text
-        
-        # Get all name variations for the main speaker (the answer)
-        speaker_names = get_speaker_aliases(self.character) if self.character else set()
-        
-        # Extra guest/minor character names not in main list
-        EXTRA_NAMES = {
-            "Esther", "Kurm", "Dustin", "Shaw", "Figi", "Marcus", "Frederick",
-            "Seamus", "Murphy", "Figgis", "Jimmy", "Kelly", "Dozerman",
-            "Parlov", "Romero", "Jason", "Derek", "Mlepnos", "Mlep", 
-            "Stevie", "Steve", "Melanie", "Hawkins", "Veronica", "Bob",
-            "Mervyn", "Carl", "Tommy", "Johnny", "Billy", "Eddie", "Jimmy",
-            "George", "Frank", "Harry", "Jack", "Joe", "Mike", "Nick",
-            "Paul", "Pete", "Phil", "Rick", "Sam", "Tim", "Tom", "Tony",
-            "Sal", "Vinny", "Danny", "Kenny", "Larry", "Gary", "Jerry",
-            "Barry", "Terry", "Mary", "Nancy", "Sarah", "Rachel", "Linda",
-            "Susan", "Barbara", "Lisa", "Betty", "Helen", "Sandra", "Donna",
-            "Carol", "Ruth", "Sharon", "Michelle", "Laura", "Cagney", "Lacey",
-            "O'Sullivan", "Sullivan",
-        }
-        
-        # Step 1: Find any "Name:" patterns to discover unknown character names
-        name_colon_pattern = re.compile(r'\b([A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)?)\s*:')
-        discovered_names = set()
-        for match in name_colon_pattern.finditer(self.text):
-            name = match.group(1)
-            if name.lower() not in speaker_names:
-                discovered_names.add(name)
-        
-        # Step 2: Replace main speaker's name variations with temporary placeholder
-        for name in sorted(speaker_names, key=len, reverse=True):
-            if len(name) > 2:
-                pattern = re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
-                masked = pattern.sub("__SPEAKER__", masked)
-        
-        # Step 3: Replace all known character names with [CHARACTER]
-        for char_name in ALL_CHARACTERS:
-            if char_name.lower() not in speaker_names and len(char_name) > 2:
-                pattern = re.compile(r'\b' + re.escape(char_name) + r'\b', re.IGNORECASE)
-                masked = pattern.sub("[CHARACTER]", masked)
         
-        # Step 4: Replace extra guest character names
-        for name in EXTRA_NAMES:
-            if name.lower() not in speaker_names:
-                pattern = re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
-                masked = pattern.sub("[CHARACTER]", masked)
-        
-        # Step 5: Replace discovered names (from "Name:" patterns) EVERYWHERE in quote
-        for name in sorted(discovered_names, key=len, reverse=True):
-            if len(name) > 2:
-                pattern = re.compile(r'\b' + re.escape(name) + r'\b', re.IGNORECASE)
-                masked = pattern.sub("[CHARACTER]", masked)
-        
-        # Step 6: Convert temporary placeholder to [SPEAKER]
-        masked = masked.replace("__SPEAKER__", "[SPEAKER]")
-        
-        return masked
+        The speaker never changes, so the result is computed once and memoized
+        (in the QuoteStore for stored quotes, so it outlives this view).
+        """
+        if self._masked is None:
+            if self._store is not None:
+                self._masked = self._store.masked_text(self._id)
+            else:
+                mask_lookups.inc(MISS)
+                with span("mask"):
+                    self._masked = name_masker.mask(self.text, self.character)
+        else:
+            mask_lookups.inc(HIT)
+        return self._masked
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -205,116 +217,835 @@ class Quote:
         }
 
 
+class QuoteStore(Sequence[Quote]):
+    """
+    Columnar storage for the quote corpus.
+    
+    Character and episode names are interned into small tables; each quote
+    keeps only integer IDs in array columns plus its text. Headers follow
+    HEADER_TEMPLATE, so only the few that don't are stored. Per-character and
+    per-season selections are arrays of quote positions. Quote objects are
+    views created on access.
+    
+    Columns can be arrays/lists or memoryviews over a snapshot (see core.snapshot).
+    """
+    
+    def __init__(
+        self,
+        characters: Sequence[str],
+        episodes: Sequence[str],
+        character_ids: Sequence[int],
+        episode_ids: Sequence[int],
+        seasons: Sequence[int],
+        texts: Sequence[str],
+        header_overrides: dict[int, str],
+        by_character: dict[str, Sequence[int]],
+        by_season: dict[int, Sequence[int]],
+        masked: Optional[Sequence[str]] = None,
+        difficulty: Optional[Sequence[float]] = None,
+        by_difficulty: Optional[dict[str, Sequence[int]]] = None,
+    ):
+        """
+        Args:
+            characters: Character name table (ID -> name)
+            episodes: Episode name table (ID -> name)
+            character_ids: Character ID per quote
+            episode_ids: Episode ID per quote
+            seasons: Season per quote (0 = unknown)
+            texts: Quote text per quote
+            header_overrides: Quote position -> header, where it isn't HEADER_TEMPLATE
+            by_character: Character name -> sorted quote positions
+            by_season: Season -> sorted quote positions
+            masked: Precomputed masked text per quote (None = mask on first use)
+            difficulty: Difficulty score per quote (None = score on first use)
+            by_difficulty: Difficulty level -> sorted quote positions (with difficulty)
+        """
+        self.characters = characters
+        self.episodes = episodes
+        self.character_ids = character_ids
+        self.episode_ids = episode_ids
+        self.seasons = seasons
+        self.texts = texts
+        self.header_overrides = header_overrides
+        self.by_character = by_character
+        self.by_season = by_season
+        self._character_id = {name: i for i, name in enumerate(characters)}
+        self._precomputed = masked is not None
+        self._masked: Sequence[Optional[str]] = masked if masked is not None else [None] * len(texts)
+        self._difficulty = difficulty
+        self._by_difficulty = by_difficulty
+        self._difficulty_lock = threading.Lock()
+    
+    @classmethod
+    def from_records(cls, records: Iterable[dict]) -> "QuoteStore":
+        """Build a store from raw JSON records (Character/Episode/QuoteText/Header)."""
+        characters: dict[str, int] = {}
+        episodes: dict[str, int] = {}
+        episode_seasons: list[int] = []
+        character_ids = array("I")
+        episode_ids = array("I")
+        seasons = array("b")
+        texts: list[str] = []
+        header_overrides: dict[int, str] = {}
+        by_character: dict[str, array] = {}
+        by_season: dict[int, array] = {}
+        
+        for i, q in enumerate(records):
+            character = q.get("Character", "Unknown").strip()
+            episode = q.get("Episode", "Unknown")
+            cid = characters.get(character)
+            if cid is None:
+                cid = characters[character] = len(characters)
+                by_character[character] = array("I")
+            eid = episodes.get(episode)
+            if eid is None:
+                eid = episodes[episode] = len(episodes)
+                episode_seasons.append(episode_catalog.season_of(episode) or 0)
+            season = episode_seasons[eid]
+            
+            character_ids.append(cid)
+            episode_ids.append(eid)
+            seasons.append(season)
+            texts.append(q.get("QuoteText", ""))
+            header = q.get("Header", "")
+            if header != HEADER_TEMPLATE.format(character=character, episode=episode):
+                header_overrides[i] = header
+            by_character[character].append(i)
+            if season:
+                by_season.setdefault(season, array("I")).append(i)
+        
+        return cls(
+            characters=list(characters),
+            episodes=list(episodes),
+            character_ids=character_ids,
+            episode_ids=episode_ids,
+            seasons=seasons,
+            texts=texts,
+            header_overrides=header_overrides,
+            by_character=by_character,
+            by_season=dict(sorted(by_season.items())),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        character = self.characters[self.character_ids[i]]
+        episode = self.episodes[self.episode_ids[i]]
+        header = self.header_overrides.get(i)
+        if header is None:
+            header = HEADER_TEMPLATE.format(character=character, episode=episode)
+        quote = Quote(
+            character=character,
+            episode=episode,
+            text=self.texts[i],
+            header=header,
+            season=self.seasons[i] or None,
+        )
+        quote._masked = self._masked[i]
+        quote._store = self
+        quote._id = i
+        return quote
+    
+    def character_id(self, character: str) -> Optional[int]:
+        """Interned ID of a character name (exact), or None if it has no quotes."""
+        return self._character_id.get(character)
+    
+    def masked_text(self, i: int) -> str:
+        """Masked text of quote i, computed on first use and kept."""
+        masked = self._masked[i]
+        if masked is None:
+            mask_lookups.inc(MISS)
+            character = self.characters[self.character_ids[i]]
+            with span("mask"):
+                masked = name_masker.mask(self.texts[i], character)
+            self._masked[i] = masked
+        else:
+            mask_lookups.inc(HIT)
+        return masked
+    
+    def precompute_masks(self):
+        """Mask every quote now instead of on first use."""
+        if not self._precomputed:
+            masked, texts, characters, character_ids = self._masked, self.texts, self.characters, self.character_ids
+            with span("mask_all"):
+                for i in range(len(self)):
+                    if masked[i] is None:
+                        masked[i] = name_masker.mask(texts[i], characters[character_ids[i]])
+            self._precomputed = True
+    
+    def score_difficulty(self, processes: Optional[int] = None):
+        """
+        Score every quote's difficulty now (no-op if already scored).
+        Scoring needs every masked text, so the masks are precomputed (and
+        kept) first.
+        
+        Args:
+            processes: Worker processes for core.difficulty.score_quotes (None = auto)
+        """
+        with self._difficulty_lock:
+            if self._difficulty is not None:
+                return
+            self.precompute_masks()
+            characters = [self.characters[c] for c in self.character_ids]
+            scores = score_quotes(self.texts, characters, self._masked, processes=processes)
+            self._by_difficulty = bucket_scores(scores)
+            self._difficulty = scores
+    
+    @property
+    def difficulty(self) -> Sequence[float]:
+        """
+        Difficulty score per quote (see core.difficulty). QuotesClient scores
+        at load time; other stores are scored in-process on first use.
+        """
+        if self._difficulty is None:
+            self.score_difficulty(processes=1)
+        return self._difficulty
+    
+    @property
+    def by_difficulty(self) -> dict[str, Sequence[int]]:
+        """Difficulty level -> sorted quote positions."""
+        if self._by_difficulty is None:
+            self.score_difficulty(processes=1)
+        return self._by_difficulty
+
+
+def load_quote_store(path: Path) -> QuoteStore:
+    """Parse a quotes JSON file ({"root": [...]}) into a QuoteStore."""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        data = json.load(f)
+    return QuoteStore.from_records(data.get("root", []))
+
+
+def quote_from_record(record: dict) -> Quote:
+    """Standalone Quote from a raw record (e.g. from the quotes API), masked up front."""
+    character = record.get("Character", "Unknown").strip()
+    episode = record.get("Episode", "Unknown")
+    quote = Quote(
+        character=character,
+        episode=episode,
+        text=record["QuoteText"],
+        header=record.get("Header") or HEADER_TEMPLATE.format(character=character, episode=episode),
+        season=episode_catalog.season_of(episode),
+    )
+    quote.masked_text()
+    return quote
+
+
+def searchable_names(characters: Iterable[str]) -> list[str]:
+    """Character list for autocomplete/search: every alias of every character with quotes."""
+    seen = set()
+    char_list = []
+    for canon in sorted(characters):
+        aliases = CHARACTER_ALIASES.get(canon, [canon])
+        for name in aliases:
+            key = name.lower().strip()
+            if key and key not in seen:
+                seen.add(key)
+                char_list.append(name)
+    return sorted(char_list, key=lambda x: x.lower())
+
+
+class QuoteSelection(Sequence[Quote]):
+    """A subset of a quote store, held as an array of positions."""
+    
+    def __init__(self, store: QuoteStore, ids: Sequence[int]):
+        self.store = store
+        self.ids = ids
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.store[j] for j in self.ids[i]]
+        return self.store[self.ids[i]]
+
+
+class ColumnFilter:
+    """
+    Quote positions whose columns hold given values, as a Container.
+    Membership is a couple of array reads, so no per-filter id sets are built.
+    """
+    
+    def __init__(self, checks: list[tuple[Sequence[int], int]]):
+        self._checks = checks
+    
+    def __contains__(self, i: int) -> bool:
+        for column, value in self._checks:
+            if column[i] != value:
+                return False
+        return True
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident set size (Linux only; None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+@dataclass(frozen=True)
+class CorpusState:
+    """
+    Everything derived from one corpus load.
+    Never mutated: a reload builds a new state and swaps the reference.
+    """
+    store: QuoteStore
+    by_character: dict[str, QuoteSelection]
+    characters: list[str]
+    index: QuoteIndex
+    sampler: QuoteSampler
+    version: int = 0
+    source: Optional[str] = None  # "snapshot" or "json"
+    load_seconds: Optional[float] = None
+    
+    @classmethod
+    def build(cls, store: QuoteStore, index: QuoteIndex, **kwargs) -> "CorpusState":
+        by_character = {
+            character: QuoteSelection(store, ids) for character, ids in store.by_character.items()
+        }
+        # Build the common alias tables here (load thread), not on a first draw
+        sampler = QuoteSampler(store)
+        sampler.prebuild()
+        return cls(
+            store, by_character, searchable_names(store.by_character.keys()), index,
+            sampler, **kwargs
+        )
+
+
 class QuotesClient:
     """Client for fetching Brooklyn 99 quotes."""
     
     def __init__(self):
-        self.quotes: list[Quote] = []
-        self.quotes_by_character: dict[str, list[Quote]] = {}
-        self._characters: list[str] = []
-        self._load_quotes()
-    
-    def _load_quotes(self):
-        """Load quotes from the configured source."""
-        if settings.B99_MODE == "local":
-            self._load_from_json()
-        else:
-            print("API mode not yet implemented, falling back to local")
-            self._load_from_json()
+        """Cheap: nothing is read until load() or the first method that needs quotes."""
+        # The whole corpus hangs off this one reference. Readers take it once per
+        # call, so a concurrent reload is seen entirely or not at all.
+        self._state = CorpusState.build(QuoteStore.from_records([]), QuoteIndex([]))
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        # Guards only _reload_thread and _reload_pending, never held during a
+        # build, so triggers (SIGHUP on the event loop, /admin/reload) return at once
+        self._reload_lock = threading.Lock()
+        self._reload_thread: Optional[threading.Thread] = None
+        self._reload_pending = False
+        self._remote: Optional[RemoteQuoteSource[Quote]] = None
+        self.reloads = 0
+        self.last_reload: dict = {}
+    
+    def load(self) -> bool:
+        """
+        Load the corpus if it isn't loaded yet (thread-safe, runs at most once).
+        Called from the app's lifespan hook; library callers get it on first use.
+        Returns True if quotes are available.
+        """
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self._load_quotes()
+                    self._loaded = True
+        return len(self._state.store) > 0
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+    
+    @property
+    def state(self) -> CorpusState:
+        """The current corpus (loads on first use). Hold on to it for consistent reads."""
+        self.load()
+        return self._state
+    
+    @property
+    def quotes(self) -> QuoteStore:
+        return self.state.store
+    
+    @property
+    def quotes_by_character(self) -> dict[str, QuoteSelection]:
+        return self.state.by_character
+    
+    @property
+    def version(self) -> int:
+        return self.state.version
     
-    def _load_from_json(self):
-        """Load quotes from local JSON file."""
+    @property
+    def load_seconds(self) -> Optional[float]:
+        return self._state.load_seconds
+    
+    @property
+    def load_source(self) -> Optional[str]:
+        return self._state.source
+    
+    def reload(self) -> bool:
+        """
+        Rebuild the corpus from the configured source and swap it in.
+        Requests already holding the old state finish on it; the old store
+        (and every masked text cached in it) is freed once they are done.
+        On failure the current corpus stays in place. Returns True on success.
+        """
+        with self._load_lock:
+            ok = self._load_quotes()
+            self._loaded = True
+        return ok
+    
+    def reload_in_background(self) -> bool:
+        """
+        Start reload() on a daemon thread. Never waits for a build.
+        
+        If a reload is already running it may have read the files before this
+        change, so one more reload is queued to run after it (triggers
+        arriving meanwhile share that one). Returns True if a reload started,
+        False if it was queued.
+        """
+        with self._reload_lock:
+            if self._reload_thread is not None:
+                self._reload_pending = True
+                return False
+            self._reload_thread = threading.Thread(target=self._reload_until_idle, name="quotes-reload", daemon=True)
+            self._reload_thread.start()
+        return True
+    
+    def _reload_until_idle(self):
+        """Reload, then again while triggers were queued during the last build."""
+        while True:
+            self.reload()
+            with self._reload_lock:
+                if not self._reload_pending:
+                    self._reload_thread = None
+                    return
+                self._reload_pending = False
+    
+    async def start(self, transport=None):
+        """
+        Start the remote source when B99_MODE="api" (call on the serving event loop).
+        The local corpus stays loaded: it backs search and the catalog, and serves
+        random quotes whenever the remote buffer is empty.
+        
+        Args:
+            transport: httpx transport override, for a local stand-in server
+        """
+        settings = get_settings()
+        if settings.B99_MODE != "api" or self._remote is not None:
+            return
+        cache = None
+        if settings.B99_API_CACHE:
+            cache = DiskCache(settings.B99_API_CACHE, settings.B99_API_CACHE_SIZE)
+        self._remote = RemoteQuoteSource(
+            settings.B99_API_URL,
+            quote_from_record,
+            batch_size=settings.B99_API_BATCH,
+            max_buffer=max(settings.B99_API_BATCH * 5, 100),
+            low_water=max(settings.B99_API_BATCH // 4, 1),
+            timeout=settings.B99_API_TIMEOUT,
+            cache=cache,
+            transport=transport,
+            character_key=get_canonical_character,
+        )
+        await self._remote.start()
+    
+    async def aclose(self):
+        """Stop background fetches and close the HTTP client."""
+        if self._remote is not None:
+            await self._remote.aclose()
+            self._remote = None
+    
+    def _load_quotes(self) -> bool:
+        """Build a new corpus state from local files and swap it in."""
+        start = time.perf_counter()
+        state = self._load_from_snapshot() or self._load_from_json()
+        if state is None:
+            return False
+        seconds = time.perf_counter() - start
+        span_seconds.observe((f"load_{state.source}",), seconds)
+        self._swap(replace(state, load_seconds=seconds))
+        return True
+    
+    def _load_from_snapshot(self) -> Optional[CorpusState]:
+        """
+        Load quotes, masks and search indexes from a binary snapshot (see core.snapshot).
+        Returns None (so the caller falls back to JSON) if there is no usable snapshot.
+        """
+        settings = get_settings()
+        snapshot_path = settings.B99_SNAPSHOT
+        if not snapshot_path or not Path(snapshot_path).exists():
+            return None
+        
+        try:
+            snap = Snapshot(snapshot_path)
+        except (OSError, SnapshotError) as e:
+            print(f"Warning: Ignoring snapshot {snapshot_path}: {e}")
+            return None
+        if settings.B99_QUOTES_JSON and not snap.is_fresh(settings.B99_QUOTES_JSON):
+            print(f"Warning: Snapshot {snapshot_path} is older than {settings.B99_QUOTES_JSON}, ignoring it")
+            return None
+        if not snap.matches(snapshot_fingerprint()):
+            print(f"Warning: Snapshot {snapshot_path} was built with other name tables or masking code, ignoring it "
+                  "(rebuild with python -m core.snapshot)")
+            return None
+        
+        store = QuoteStore(
+            characters=list(snap.characters),
+            episodes=list(snap.episodes),
+            character_ids=snap.character_ids,
+            episode_ids=snap.episode_ids,
+            seasons=snap.seasons,
+            texts=snap.texts,
+            header_overrides=snap.header_overrides(),
+            by_character={snap.characters[int(cid)]: ids for cid, ids in snap.postings("bych").items()},
+            by_season={int(n): ids for n, ids in sorted(snap.postings("bysn").items())},
+            masked=snap.masked,
+            difficulty=snap.difficulty,
+            by_difficulty=snap.postings("diff"),
+        )
+        index = QuoteIndex.from_tables(
+            snap.lowered, snap.postings("tri"), snap.postings("tok"), snap.postings("tok", "wts")
+        )
+        
+        state = CorpusState.build(store, index, version=self._state.version + 1, source="snapshot")
+        print(f"Loaded {len(store)} quotes from snapshot {snapshot_path} ({len(state.characters)} searchable names)")
+        return state
+    
+    def _load_from_json(self) -> Optional[CorpusState]:
+        """Load quotes from local JSON file, masking and scoring every quote."""
+        settings = get_settings()
         json_path = settings.B99_QUOTES_JSON
         
         if not json_path:
             print("Warning: B99_QUOTES_JSON not configured")
-            return
+            return None
         
         path = Path(json_path)
         if not path.exists():
             print(f"Warning: Quotes file not found at {json_path}")
-            return
+            return None
         
         try:
-            with open(path, "r", encoding="utf-8-sig") as f:
-                data = json.load(f)
-            
-            raw_quotes = data.get("root", [])
-            
-            for q in raw_quotes:
-                character = q.get("Character", "Unknown").strip()
-                episode = q.get("Episode", "Unknown")
-                quote = Quote(
-                    character=character,
-                    episode=episode,
-                    text=q.get("QuoteText", ""),
-                    header=q.get("Header", ""),
-                    season=get_season(episode),
-                )
-                self.quotes.append(quote)
-                
-                # Index by character
-                if character not in self.quotes_by_character:
-                    self.quotes_by_character[character] = []
-                self.quotes_by_character[character].append(quote)
-            
-            # Build character list: include all aliases for autocomplete/search
-            seen = set()
-            char_list = []
-            for canon in sorted(self.quotes_by_character.keys()):
-                aliases = CHARACTER_ALIASES.get(canon, [canon])
-                for name in aliases:
-                    key = name.lower().strip()
-                    if key and key not in seen:
-                        seen.add(key)
-                        char_list.append(name)
-            self._characters = sorted(char_list, key=lambda x: x.lower())
+            store = load_quote_store(path)
+            # Score here (startup / reload thread), never in a difficulty= request.
+            # In-process: the server shouldn't fork a pool. This also masks every
+            # quote, and the masks are kept for serving.
+            store.score_difficulty(processes=1)
+            state = CorpusState.build(
+                store, QuoteIndex(store.texts), version=self._state.version + 1, source="json"
+            )
             
-            print(f"Loaded {len(self.quotes)} quotes from {len(self.quotes_by_character)} characters ({len(self._characters)} searchable names)")
+            print(f"Loaded {len(store)} quotes from {len(state.by_character)} characters ({len(state.characters)} searchable names)")
+            return state
         except Exception as e:
             print(f"Error loading quotes: {e}")
+            return None
     
-    async def get_random_quote(self, character: Optional[str] = None) -> Optional[Quote]:
-        """Get a random quote, optionally filtered by character."""
-        if character:
-            quotes = self.quotes_by_character.get(character, [])
-        else:
-            quotes = self.quotes
+    def _swap(self, state: CorpusState):
+        """
+        Install a fully built state with a single reference assignment.
+        The retired store is watched so reload stats show when its memory is released.
+        """
+        retired = self._state
+        self._state = state
+        if not self._loaded:
+            return
         
-        if not quotes:
-            return None
+        self.reloads += 1
+        stats = {
+            "version": state.version,
+            "source": state.source,
+            "seconds": round(state.load_seconds, 4),
+            "retired_version": retired.version,
+            "retired_released": False,
+            "retired_release_seconds": None,
+            "rss_before_release": _rss_bytes(),
+            "rss_after_release": None,
+        }
+        self.last_reload = stats
+        swapped_at = time.perf_counter()
+        
+        def released():
+            stats["retired_released"] = True
+            stats["retired_release_seconds"] = round(time.perf_counter() - swapped_at, 4)
+            stats["rss_after_release"] = _rss_bytes()
+        
+        weakref.finalize(retired.store, released)
+    
+    async def get_random_quote(
+        self,
+        character: Optional[str] = None,
+        season: Optional[int] = None,
+        episode: Optional[str] = None,
+        weighting: str = "uniform",
+        difficulty: Optional[str] = None,
+    ) -> Optional[Quote]:
+        """
+        Get a random quote, optionally filtered and weighted.
+        
+        Args:
+            character: Character name or alias
+            season: Season number
+            episode: Episode name (any spelling)
+            weighting: "uniform" (per quote), "balanced" (per character) or "sqrt"
+            difficulty: "easy", "medium" or "hard" (see core.difficulty)
         
-        return random.choice(quotes)
+        Unfiltered uniform draws in API mode are served from the prefetched
+        remote buffer when it has one.
+        """
+        if (
+            self._remote is not None and season is None and episode is None
+            and difficulty is None and weighting == "uniform"
+        ):
+            quote = self._remote.take(character)
+            if quote is not None:
+                return quote
+        
+        state = self.state
+        store = state.store
+        with span("random_quote"):
+            cid = None
+            if character:
+                cid = self._resolve_character(store, character)
+                if cid is None:
+                    return None
+            # Unknown episodes match nothing: don't build (and cache) an empty table
+            if episode and state.sampler.episode_key(episode) is None:
+                return None
+            
+            sampler = state.sampler
+            key = sampler.key(cid, season, episode, weighting, difficulty)
+            table = sampler.cached(key)
+            if table is None:
+                # New filter combination: an O(matching quotes) build, off the event loop
+                table = await asyncio.to_thread(sampler.table, key)
+            quote_id = sampler.draw(key, table=table)
+            if quote_id is None:
+                return None
+            return store[quote_id]
     
     async def get_characters(self) -> list[str]:
         """Get list of all characters with quotes."""
-        return self._characters
+        return self.state.characters
     
-    async def search_quotes(self, query: str, character: Optional[str] = None) -> list[Quote]:
+    async def search_quotes(
+        self,
+        query: str,
+        character: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> list[Quote]:
         """
         Search quotes by text content.
         
         Args:
             query: Search term
             character: Optional character filter
+            limit: Optional max number of results
+        """
+        with span("search_quotes"):
+            _, results = self.search(query, character, limit=limit, count=False)
+        return results
+    
+    def search(
+        self,
+        query: str,
+        character: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        count: bool = True,
+        season: Optional[int] = None,
+        rank: bool = False,
+    ) -> tuple[int, list[Quote]]:
+        """
+        Search quotes by text content using the load-time index.
+        
+        Args:
+            query: Search term
+            character: Optional character filter
+            limit: Max quotes to return (ranked search defaults to 10)
+            offset: Number of hits to skip
+            count: If false, an unranked scan stops once the page is full
+            season: Optional season filter
+            rank: BM25 ranking with prefix completion of the last word,
+                instead of substring matches in corpus order
+        
+        Returns (total matches, requested page of quotes).
         """
-        query_lower = query.lower()
-        results = []
+        state = self.state  # loads on first use
+        store = state.store
+        checks = []
+        if character:
+            cid = self._resolve_character(store, character)
+            if cid is None:
+                return 0, []
+            checks.append((store.character_ids, cid))
+        if season is not None:
+            if season not in store.by_season:
+                return 0, []
+            checks.append((store.seasons, season))
+        within = ColumnFilter(checks) if checks else None
         
-        source = self.quotes_by_character.get(character, []) if character else self.quotes
+        if rank:
+            with span("search_rank"):
+                hits = state.index.rank(query, limit=limit or 10, offset=offset, within=within)
+        else:
+            with span("search"):
+                hits = state.index.search(query, limit=limit, offset=offset, within=within, count=count)
+        return hits.total, [store[i] for i in hits.ids]
+    
+    @staticmethod
+    def _resolve_character(store: QuoteStore, character: str) -> Optional[int]:
+        """Character ID for an exact name, else for its canonical alias."""
+        cid = store.character_id(character)
+        if cid is None:
+            canonical = get_canonical_character(character)
+            cid = store.character_id(canonical) if canonical else None
+        return cid
+    
+    def sample_quotes(
+        self,
+        n: int,
+        character: Optional[str] = None,
+        season: Optional[int] = None,
+    ) -> list[Quote]:
+        """
+        Up to n distinct random quotes (sampled without replacement) from the
+        local corpus, optionally filtered by character and/or season.
         
-        for quote in source:
-            if query_lower in quote.text.lower():
-                results.append(quote)
+        Args:
+            n: Number of quotes wanted (fewer if the filters match fewer)
+            character: Optional character filter (aliases accepted)
+            season: Optional season filter
+        """
+        state = self.state
+        store = state.store
+        candidates: Sequence[int] = range(len(store))
+        if character:
+            cid = self._resolve_character(store, character)
+            if cid is None:
+                return []
+            candidates = store.by_character[store.characters[cid]]
+            if season is not None:
+                seasons = store.seasons
+                candidates = [i for i in candidates if seasons[i] == season]
+        elif season is not None:
+            candidates = store.by_season.get(season, ())
         
-        return results
+        ids = random.sample(candidates, min(n, len(candidates)))
+        return [store[i] for i in ids]
+    
+    def iter_ids(
+        self,
+        character: Optional[str] = None,
+        season: Optional[int] = None,
+        query: Optional[str] = None,
+        start: int = 0,
+        state: Optional[CorpusState] = None,
+    ) -> Iterator[int]:
+        """
+        Lazily yield matching quote ids in corpus order, from id start on.
+        Nothing is materialized, so a full-corpus export runs in flat memory.
+        
+        Args:
+            character: Optional character filter (aliases accepted)
+            season: Optional season filter
+            query: Optional text filter (case-insensitive substring, as /game/search)
+            start: First quote id to consider (resume point for cursors)
+            state: Corpus state to read (defaults to the current one); pin it
+                so ids stay meaningful across a reload
+        """
+        state = state or self.state
+        store = state.store
+        cid = None
+        if character:
+            cid = self._resolve_character(store, character)
+            if cid is None:
+                return
+        
+        if query:
+            checks = []
+            if cid is not None:
+                checks.append((store.character_ids, cid))
+            if season is not None:
+                checks.append((store.seasons, season))
+            yield from state.index.iter_matches(query, start, ColumnFilter(checks) if checks else None)
+            return
+        
+        # Walk the narrowest selection; a character + season pair checks the season column
+        candidates: Sequence[int] = range(len(store))
+        within = None
+        if cid is not None:
+            candidates = store.by_character[store.characters[cid]]
+            if season is not None:
+                within = ColumnFilter([(store.seasons, season)])
+        elif season is not None:
+            candidates = store.by_season.get(season, ())
+        
+        for i in range(bisect_left(candidates, start), len(candidates)):
+            quote_id = candidates[i]
+            if within is None or quote_id in within:
+                yield quote_id
+    
+    def stats(self) -> dict:
+        """Load status, corpus size and the last reload (never triggers a load)."""
+        state = self._state
+        return {
+            "loaded": self._loaded,
+            "source": state.source,
+            "load_seconds": None if state.load_seconds is None else round(state.load_seconds, 4),
+            "quotes": len(state.store),
+            "characters": len(state.by_character),
+            "version": state.version,
+            "reloading": self._reload_thread is not None and self._reload_thread.is_alive(),
+            "reloads": self.reloads,
+            "last_reload": dict(self.last_reload) or None,
+            "sampler": state.sampler.stats(),
+            "remote": self._remote.stats() if self._remote is not None else None,
+        }
     
     def get_quote_count(self, character: Optional[str] = None) -> int:
         """Get total number of quotes."""
+        state = self.state
         if character:
-            return len(self.quotes_by_character.get(character, []))
-        return len(self.quotes)
+            return len(state.by_character.get(character, []))
+        return len(state.store)
 
 
-# Singleton instance
+# Singleton instance (loads lazily; the API loads it in its lifespan hook)
 quotes_client = QuotesClient()
+
+
+def _corpus_gauge(read):
+    """Gauge callback over the current corpus state (nothing before it loads)."""
+    def value():
+        return read(quotes_client.state) if quotes_client.is_loaded else None
+    return value
+
+
+def _hit_ratio(hits: float, misses: float) -> Optional[float]:
+    total = hits + misses
+    return hits / total if total else None
+
+
+registry.gauge("b99_corpus_quotes", "Quotes in the loaded corpus", _corpus_gauge(lambda s: len(s.store)))
+registry.gauge("b99_corpus_characters", "Characters with quotes", _corpus_gauge(lambda s: len(s.by_character)))
+registry.gauge("b99_corpus_version", "Corpus version (bumped by each reload)", _corpus_gauge(lambda s: s.version))
+registry.gauge("b99_corpus_reloads", "Completed hot reloads", lambda: quotes_client.reloads)
+registry.gauge(
+    "b99_index_terms", "Search index size by table",
+    _corpus_gauge(lambda s: {("tokens",): s.index.vocabulary_size, ("trigrams",): s.index.trigram_count}),
+    ("table",),
+)
+registry.gauge("b99_sampler_tables", "Cached alias tables", _corpus_gauge(lambda s: s.sampler.stats()["tables"]))
+registry.gauge(
+    "b99_sampler_hit_ratio", "Share of draws served by a cached alias table",
+    _corpus_gauge(lambda s: _hit_ratio(s.sampler.hits, s.sampler.misses)),
+)
+registry.gauge(
+    "b99_mask_cache_hit_ratio", "Share of masked text lookups served from the memo",
+    lambda: _hit_ratio(*(mask_lookups.values().get(result, 0) for result in (HIT, MISS))),
+)
+registry.gauge(
+    "b99_remote_buffered", "Prefetched remote quotes waiting (B99_MODE=api)",
+    lambda: quotes_client._remote.stats()["buffered"] if quotes_client._remote is not None else None,
+)
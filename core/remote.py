@@ -0,0 +1,306 @@
+"""
+Remote quote source for B99_MODE="api".
+
+Quotes are fetched in bulk over one pooled, keep-alive HTTP client into an
+in-memory buffer, so serving a quote never waits on the network: when the
+buffer runs low a refill is started in the background, and when it is empty
+the caller falls back to the local corpus. Fetched records are also kept in
+a bounded on-disk cache that warms the buffer on the next start.
+
+The API is expected to answer GET {B99_API_URL}/quotes/random?count=N with
+records shaped like data/quotes.json (Character/Episode/QuoteText/Header),
+either as a list or as {"root": [...]}. benchmarks/fake_api.py is a local
+stand-in.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Generic, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+# Worth retrying: rate limited or the server had a bad moment
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class RemoteError(Exception):
+    """The quotes API could not be reached or returned an unusable response."""
+
+
+def _valid(record) -> bool:
+    return isinstance(record, dict) and bool(record.get("QuoteText")) and bool(record.get("Character"))
+
+
+class DiskCache:
+    """
+    Bounded cache of fetched records, stored in the data/quotes.json format.
+    Keeps the most recently fetched max_records (deduplicated); writes are atomic.
+    """
+
+    def __init__(self, path: str | Path, max_records: int = 5000):
+        self.path = Path(path)
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        self._records: Optional[OrderedDict] = None
+
+    @staticmethod
+    def _key(record: dict) -> tuple[str, str]:
+        return record.get("Character", ""), record.get("QuoteText", "")
+
+    def load(self) -> list[dict]:
+        with self._lock:
+            return list(self._load().values())
+
+    def _load(self) -> OrderedDict:
+        if self._records is None:
+            self._records = OrderedDict()
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    records = json.load(f).get("root", [])
+            except (OSError, ValueError, AttributeError):
+                records = []
+            for record in records[-self.max_records:]:
+                if _valid(record):
+                    self._records[self._key(record)] = record
+        return self._records
+
+    def add(self, records: list[dict]) -> None:
+        """Add records (newest last), evict the oldest beyond max_records, save."""
+        with self._lock:
+            cached = self._load()
+            for record in records:
+                key = self._key(record)
+                cached.pop(key, None)
+                cached[key] = record
+            while len(cached) > self.max_records:
+                cached.popitem(last=False)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"root": list(cached.values())}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+
+
+class RemoteQuoteSource(Generic[T]):
+    """
+    Prefetching client for the quotes API.
+
+    take() is synchronous and never touches the network; it returns a
+    buffered quote or None. Refills run as background tasks on the event
+    loop the source was started on.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        parse: Callable[[dict], T],
+        *,
+        batch_size: int = 100,
+        low_water: int = 25,
+        max_buffer: int = 500,
+        timeout: float = 5.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        cooldown: float = 30.0,
+        cache: Optional[DiskCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        character_key: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        """
+        Args:
+            base_url: API root (B99_API_URL)
+            parse: Turns a raw record into the buffered object (runs at refill
+                time, so any per-quote preparation stays off the request path)
+            batch_size: Quotes requested per fetch
+            low_water: Start a refill when the buffer drops below this
+            max_buffer: Buffer capacity
+            timeout: Per-request timeout in seconds
+            retries: Retries per fetch after the first attempt
+            backoff: Base delay of the exponential backoff between retries
+            cooldown: After a fetch has failed all retries, wait this long
+                before trying again
+            cache: On-disk cache of fetched records (None = no disk cache)
+            transport: httpx transport override (e.g. httpx.ASGITransport for a stand-in app)
+            character_key: Maps a character name to the form take() matches on
+                (e.g. alias -> canonical name; a name it maps to None is kept as is)
+        """
+        self.base_url = base_url.rstrip("/")
+        self._parse = parse
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.max_buffer = max_buffer
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.cache = cache
+        self._transport = transport
+        self._character_key = character_key
+        self._client: Optional[httpx.AsyncClient] = None
+        # (character key, quote): keys are resolved once, at refill time
+        self._buffer: deque[tuple[Optional[str], T]] = deque()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+        self.fetched = 0
+        self.served = 0
+        self.misses = 0
+        self.last_error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _http(self) -> httpx.AsyncClient:
+        """The one shared client: pooled connections, kept alive between fetches."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=4, max_keepalive_connections=4, keepalive_expiry=60),
+                headers={"Accept": "application/json"},
+                transport=self._transport,
+            )
+        return self._client
+
+    async def start(self) -> None:
+        """Warm the buffer from the disk cache, then start fetching."""
+        if self.cache is not None:
+            records = await asyncio.to_thread(self.cache.load)
+            random.shuffle(records)
+            self._extend(records[:self.max_buffer])
+        self._schedule_refill()
+
+    async def aclose(self) -> None:
+        task = self._refill_task
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _key(self, character: Optional[str]) -> Optional[str]:
+        if character is None or self._character_key is None:
+            return character
+        key = self._character_key(character)
+        return character if key is None else key
+
+    def take(self, character: Optional[str] = None) -> Optional[T]:
+        """
+        Pop a buffered quote (the first one by character, if given; names are
+        compared through character_key). Returns None if none is buffered;
+        never waits for the network.
+        """
+        quote = None
+        if character is None:
+            if self._buffer:
+                quote = self._buffer.popleft()[1]
+        else:
+            wanted = self._key(character)
+            for i, (key, candidate) in enumerate(self._buffer):
+                if key == wanted:
+                    quote = candidate
+                    del self._buffer[i]
+                    break
+        if len(self._buffer) < self.low_water:
+            self._schedule_refill()
+        if quote is None:
+            self.misses += 1
+        else:
+            self.served += 1
+        return quote
+
+    def _schedule_refill(self) -> None:
+        if self._refill_task is not None and not self._refill_task.done():
+            return
+        if time.monotonic() < self._retry_at:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Not on an event loop: nothing to run the refill on
+        self._refill_task = loop.create_task(self.refill())
+
+    async def refill(self) -> int:
+        """Fetch one batch into the buffer. Returns the number of quotes added."""
+        try:
+            records = await self.fetch(self.batch_size)
+            added = self._extend(records)
+        except Exception as e:
+            # Anything but RemoteError is unexpected, but gets the same cooldown:
+            # without it every take() would start another failing refill
+            self.last_error = str(e) if isinstance(e, RemoteError) else f"{type(e).__name__}: {e}"
+            self._retry_at = time.monotonic() + self.cooldown
+            print(f"Warning: Quotes API unavailable, serving local quotes: {self.last_error}")
+            return 0
+        self.last_error = None
+        if self.cache is not None and records:
+            try:
+                await asyncio.to_thread(self.cache.add, records)
+            except OSError as e:
+                print(f"Warning: Could not update the quotes cache {self.cache.path}: {e}")
+        return added
+
+    def _extend(self, records: list[dict]) -> int:
+        room = self.max_buffer - len(self._buffer)
+        added = 0
+        for record in records[:max(room, 0)]:
+            try:
+                quote = self._parse(record)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                continue
+            self._buffer.append((self._key(getattr(quote, "character", None)), quote))
+            added += 1
+        return added
+
+    async def fetch(self, count: int) -> list[dict]:
+        """
+        GET /quotes/random?count=N with timeouts and exponential backoff (with jitter).
+        Raises RemoteError once every attempt has failed.
+        """
+        client = self._http()
+        error = "no attempt made"
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.0))
+            try:
+                response = await client.get("/quotes/random", params={"count": count})
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            if response.status_code in RETRY_STATUSES:
+                error = f"HTTP {response.status_code}"
+                continue
+            if response.status_code != 200:
+                raise RemoteError(f"HTTP {response.status_code} from {response.url}")
+            try:
+                data = response.json()
+            except ValueError as e:
+                raise RemoteError(f"invalid JSON from {response.url}") from e
+            records = data.get("root", []) if isinstance(data, dict) else data
+            if not isinstance(records, list):
+                raise RemoteError(f"unexpected payload from {response.url}")
+            valid = [r for r in records if _valid(r)]
+            self.fetched += len(valid)
+            return valid
+        raise RemoteError(f"{self.retries + 1} attempts failed, last: {error}")
+
+    def stats(self) -> dict:
+        return {
+            "url": self.base_url,
+            "buffered": len(self._buffer),
+            "fetched": self.fetched,
+            "served": self.served,
+            "misses": self.misses,
+            "last_error": self.last_error,
+        }
@@ -0,0 +1,201 @@
+"""
+Filtered, weighted random quote draws.
+
+Each (filters, weighting) combination gets a Walker alias table, kept in
+a small LRU cache. The unfiltered tables (every weighting, with and without
+a difficulty) are built with the corpus (prebuild); the rest on first use,
+which takes O(matching quotes), so async callers build them in a thread.
+After that a draw is two random numbers and two array reads, whatever the
+filters or weights.
+"""
+
+import random
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Literal, NamedTuple, Optional, Sequence
+
+from core.difficulty import DIFFICULTY_LEVELS
+from core.episodes import normalize_episode
+
+Weighting = Literal["uniform", "balanced", "sqrt"]
+WEIGHTINGS: tuple[str, ...] = ("uniform", "balanced", "sqrt")
+
+
+class AliasTable:
+    """
+    Walker's alias method (Vose's construction) over a set of quote ids.
+
+    Slot i is picked uniformly; it yields ids[i] with probability prob[i],
+    otherwise ids[alias[i]]. Built in O(n), drawn in O(1).
+    """
+
+    __slots__ = ("ids", "_prob", "_alias")
+
+    def __init__(self, ids: Sequence[int], weights: Optional[Sequence[float]] = None):
+        self.ids = ids if isinstance(ids, array) else array("I", ids)
+        n = len(self.ids)
+        self._prob = array("d", [1.0]) * n
+        self._alias = array("I", range(n))
+        if weights is None or n == 0:
+            return
+
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large[-1]
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+        # Leftovers are 1.0 up to rounding
+        for i in small + large:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def draw(self, rng: random.Random = random) -> int:
+        """One quote id (the table must not be empty)."""
+        u = rng.random() * len(self.ids)
+        i = int(u)
+        if u - i < self._prob[i]:
+            return self.ids[i]
+        return self.ids[self._alias[i]]
+
+
+class SampleKey(NamedTuple):
+    character_id: Optional[int]
+    season: Optional[int]
+    episode: Optional[str]  # normalized episode key
+    weighting: str
+    difficulty: Optional[str] = None  # "easy" / "medium" / "hard"
+
+
+class QuoteSampler:
+    """
+    Random draws over a QuoteStore with optional character/season/episode/
+    difficulty filters and weighting:
+    - uniform:  every quote equally likely
+    - balanced: every character equally likely (Jake doesn't dominate)
+    - sqrt:     in between, character mass grows with sqrt(quote count)
+    """
+
+    def __init__(self, store, max_tables: int = 256):
+        """
+        Args:
+            store: QuoteStore to draw from
+            max_tables: Alias tables kept (least recently used dropped)
+        """
+        self._store = store
+        self.max_tables = max_tables
+        self._tables: OrderedDict[SampleKey, AliasTable] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # Episode spellings collapse to one key ('Pt. 1' and '(Part 1)')
+        self._episode_ids: dict[str, list[int]] = {}
+        for eid, name in enumerate(store.episodes):
+            self._episode_ids.setdefault(normalize_episode(name), []).append(eid)
+
+    def prebuild(self) -> None:
+        """Build the unfiltered tables: every weighting, alone and per difficulty."""
+        for weighting in WEIGHTINGS:
+            for difficulty in (None, *DIFFICULTY_LEVELS):
+                self.table(SampleKey(None, None, None, weighting, difficulty))
+
+    def cached(self, key: SampleKey) -> Optional[AliasTable]:
+        """The table for key if it is already built, else None."""
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+            return table
+
+    def table(self, key: SampleKey) -> AliasTable:
+        """Alias table for a filter/weighting combination (cached)."""
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+        table = self._build(key)
+        with self._lock:
+            self.misses += 1
+            self._tables[key] = table
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+        return table
+
+    def _build(self, key: SampleKey) -> AliasTable:
+        store = self._store
+        if key.character_id is not None:
+            ids: Sequence[int] = store.by_character[store.characters[key.character_id]]
+        elif key.season is not None:
+            ids = store.by_season.get(key.season, ())
+        elif key.difficulty is not None:
+            ids = store.by_difficulty[key.difficulty]
+        else:
+            ids = range(len(store))
+
+        if key.season is not None and key.character_id is not None:
+            seasons = store.seasons
+            ids = [i for i in ids if seasons[i] == key.season]
+        if key.episode is not None:
+            episode_ids = set(self._episode_ids.get(key.episode, ()))
+            column = store.episode_ids
+            ids = [i for i in ids if column[i] in episode_ids]
+        if key.difficulty is not None and (key.character_id is not None or key.season is not None):
+            bucket = set(store.by_difficulty[key.difficulty])
+            ids = [i for i in ids if i in bucket]
+
+        ids = array("I", ids)
+        if key.weighting == "uniform" or not ids:
+            return AliasTable(ids)
+
+        column = store.character_ids
+        counts: dict[int, int] = {}
+        for i in ids:
+            counts[column[i]] = counts.get(column[i], 0) + 1
+        if key.weighting == "balanced":
+            weights = [1.0 / counts[column[i]] for i in ids]
+        else:
+            weights = [counts[column[i]] ** -0.5 for i in ids]
+        return AliasTable(ids, weights)
+
+    def episode_key(self, episode: str) -> Optional[str]:
+        """Normalized key of an episode (any spelling), or None if no quote is from it."""
+        episode_key = normalize_episode(episode)
+        return episode_key if episode_key in self._episode_ids else None
+
+    def key(
+        self,
+        character_id: Optional[int] = None,
+        season: Optional[int] = None,
+        episode: Optional[str] = None,
+        weighting: str = "uniform",
+        difficulty: Optional[str] = None,
+    ) -> SampleKey:
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting!r}")
+        if difficulty is not None and difficulty not in DIFFICULTY_LEVELS:
+            raise ValueError(f"Unknown difficulty: {difficulty!r}")
+        episode_key = normalize_episode(episode) if episode else None
+        return SampleKey(character_id, season, episode_key, weighting, difficulty)
+
+    def draw(self, key: SampleKey, rng: random.Random = random, table: Optional[AliasTable] = None) -> Optional[int]:
+        """A quote id matching the key (from table, if already fetched), or None if nothing matches."""
+        if table is None:
+            table = self.table(key)
+        if not len(table):
+            return None
+        return table.draw(rng)
+
+    def stats(self) -> dict:
+        return {"tables": len(self._tables), "hits": self.hits, "misses": self.misses}
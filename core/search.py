@@ -0,0 +1,374 @@
+"""
+Text index for quote search.
+Built once per corpus load so /game/search never scans every quote.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Container, Iterable, Iterator, Optional, Sequence
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Queries shorter than this can't use the trigram index
+NGRAM = 3
+
+# Probe a posting list by binary search once it is this many times longer
+# than the current candidate set
+_GALLOP_RATIO = 16
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Max vocabulary terms a partial last token expands to (most frequent first)
+MAX_PREFIX_TERMS = 64
+
+# Distinct 1-2 character queries whose results are kept (least recently used dropped)
+SHORT_CACHE_SIZE = 256
+
+
+@dataclass
+class SearchHits:
+    """Matching quote ids (corpus order, or best first when ranked) plus the total."""
+    total: int
+    ids: list[int] = field(default_factory=list)
+    scores: list[float] = field(default_factory=list)
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _contains(postings: array, doc_id: int) -> bool:
+    """Binary search a sorted posting list."""
+    i = bisect_left(postings, doc_id)
+    return i < len(postings) and postings[i] == doc_id
+
+
+class QuoteIndex:
+    """
+    Token-level inverted index plus a character-trigram index over quote text.
+
+    Matching keeps the original semantics: a quote matches when the lowercased
+    query is a substring of the lowercased quote text.
+    - Queries of 3+ characters: intersect trigram posting lists, then verify
+    - Shorter word-character queries: union the postings of every token that
+      contains the query (exact, no verification needed)
+
+    Ranked search uses BM25 weights precomputed per (token, quote) posting, so
+    scoring a query is just summing array entries.
+    """
+
+    def __init__(self, texts: Iterable[str]):
+        self._lowered: list[str] = []
+        self._trigrams: dict[str, array] = {}
+        self._tokens: dict[str, array] = {}
+        self._weights: dict[str, array] = {}
+        self._short_cache: OrderedDict[str, list[int]] = OrderedDict()
+        term_freqs: dict[str, array] = {}
+        doc_lengths = array("I")
+
+        for doc_id, text in enumerate(texts):
+            lowered = text.lower()
+            self._lowered.append(lowered)
+            for gram in _trigrams(lowered):
+                postings = self._trigrams.get(gram)
+                if postings is None:
+                    postings = self._trigrams[gram] = array("I")
+                postings.append(doc_id)
+            tokens = Counter(TOKEN_PATTERN.findall(lowered))
+            doc_lengths.append(sum(tokens.values()))
+            for token, tf in tokens.items():
+                postings = self._tokens.get(token)
+                if postings is None:
+                    postings = self._tokens[token] = array("I")
+                    term_freqs[token] = array("I")
+                postings.append(doc_id)
+                term_freqs[token].append(tf)
+
+        self._build_weights(term_freqs, doc_lengths)
+        self._vocabulary = sorted(self._tokens)
+
+    @classmethod
+    def from_tables(
+        cls,
+        lowered: Sequence[str],
+        trigrams: dict[str, Sequence[int]],
+        tokens: dict[str, Sequence[int]],
+        weights: dict[str, Sequence[float]],
+    ) -> "QuoteIndex":
+        """
+        Rebuild an index from previously exported tables (see tables()).
+        Posting lists may be any sorted int sequence, e.g. memoryviews over an mmap.
+        """
+        index = cls.__new__(cls)
+        index._lowered = lowered
+        index._trigrams = trigrams
+        index._tokens = tokens
+        index._weights = weights
+        index._short_cache = OrderedDict()
+        index._vocabulary = sorted(tokens)
+        return index
+
+    def tables(self) -> tuple[Sequence[str], dict, dict, dict]:
+        """(lowered texts, trigram postings, token postings, token BM25 weights)."""
+        return self._lowered, self._trigrams, self._tokens, self._weights
+
+    def _build_weights(self, term_freqs: dict[str, array], doc_lengths: array):
+        """Turn raw term frequencies into per-posting BM25 weights."""
+        n_docs = len(doc_lengths)
+        avg_length = (sum(doc_lengths) / n_docs) if n_docs else 0.0
+        for token, freqs in term_freqs.items():
+            postings = self._tokens[token]
+            df = len(postings)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            weights = array("f")
+            for doc_id, tf in zip(postings, freqs):
+                norm = 1 - BM25_B + BM25_B * doc_lengths[doc_id] / avg_length
+                weights.append(idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm))
+            self._weights[token] = weights
+
+    def __len__(self) -> int:
+        return len(self._lowered)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._tokens)
+
+    @property
+    def trigram_count(self) -> int:
+        return len(self._trigrams)
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        within: Optional[Container[int]] = None,
+        count: bool = True,
+    ) -> SearchHits:
+        """
+        Find quotes whose text contains query (case-insensitive).
+
+        Args:
+            query: Substring to look for
+            limit: Max ids to return (None = all)
+            offset: Number of matching ids to skip
+            within: Only consider these quote ids (e.g. one character's quotes)
+            count: If false, stop as soon as the page is full; total is then
+                only a lower bound
+        """
+        query = query.lower()
+        stop = None if limit is None else offset + limit
+
+        if len(query) >= NGRAM:
+            return self._search_trigrams(query, stop, offset, within, count)
+        if query and TOKEN_PATTERN.fullmatch(query):
+            candidates = self._short_query_postings(query)
+            if within is None:
+                return self._page(candidates, len(candidates), stop, offset)
+            return self._filter(candidates, lambda _: True, stop, offset, within, count)
+        # Empty query or punctuation: nothing to index on, check every quote
+        return self._filter(range(len(self._lowered)), lambda i: query in self._lowered[i],
+                            stop, offset, within, count)
+
+    def iter_matches(
+        self,
+        query: str,
+        start: int = 0,
+        within: Optional[Container[int]] = None,
+    ) -> Iterator[int]:
+        """
+        Lazily yield ids of quotes containing query, in corpus order, from id start on.
+
+        Unlike search(), nothing is collected: trigram queries walk the rarest
+        posting list and verify each candidate, so memory stays flat however
+        many quotes match.
+        """
+        query = query.lower()
+        lowered = self._lowered
+        if len(query) >= NGRAM:
+            postings = []
+            for gram in _trigrams(query):
+                p = self._trigrams.get(gram)
+                if p is None:
+                    return
+                postings.append(p)
+            candidates: Sequence[int] = min(postings, key=len)
+            verify = len(postings) > 1 or len(query) > NGRAM
+        elif query and TOKEN_PATTERN.fullmatch(query):
+            candidates = self._short_query_postings(query)
+            verify = False
+        else:
+            candidates = range(len(lowered))
+            verify = True
+
+        for i in range(bisect_left(candidates, start), len(candidates)):
+            doc_id = candidates[i]
+            if within is not None and doc_id not in within:
+                continue
+            if verify and query not in lowered[doc_id]:
+                continue
+            yield doc_id
+
+    def rank(
+        self,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        within: Optional[Container[int]] = None,
+        prefix: bool = True,
+    ) -> SearchHits:
+        """
+        BM25-ranked search, best match first.
+
+        Every query token must appear in a quote. With prefix=True and no
+        trailing space, the last token is treated as a partial word and
+        matches any vocabulary term it starts (autocomplete as you type).
+
+        Args:
+            query: Free text
+            limit: Max ids to return
+            offset: Number of ranked hits to skip
+            within: Only consider these quote ids
+            prefix: Complete the last token as a prefix
+        """
+        lowered = query.lower()
+        tokens = TOKEN_PATTERN.findall(lowered)
+        if not tokens:
+            return SearchHits(total=0)
+
+        partial = None
+        if prefix and TOKEN_PATTERN.match(lowered[-1]):
+            partial = tokens.pop()
+
+        scores: Optional[dict[int, float]] = None
+        # Rarest full term first keeps the candidate set small
+        for token in sorted(set(tokens), key=lambda t: len(self._tokens.get(t, ()))):
+            postings = self._tokens.get(token)
+            if postings is None:
+                return SearchHits(total=0)
+            scores = self._accumulate(scores, zip(postings, self._weights[token]), within)
+            if not scores:
+                return SearchHits(total=0)
+
+        if partial is not None:
+            best: dict[int, float] = {}
+            for term in self._complete(partial):
+                for doc_id, weight in zip(self._tokens[term], self._weights[term]):
+                    if weight > best.get(doc_id, 0.0):
+                        best[doc_id] = weight
+            scores = self._accumulate(scores, best.items(), within)
+
+        if not scores:
+            return SearchHits(total=0)
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda kv: (kv[1], -kv[0]))
+        page = top[offset:]
+        return SearchHits(
+            total=len(scores),
+            ids=[doc_id for doc_id, _ in page],
+            scores=[score for _, score in page],
+        )
+
+    def _complete(self, partial: str) -> list[str]:
+        """Vocabulary terms starting with partial, most frequent first."""
+        start = bisect_left(self._vocabulary, partial)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(partial):
+                break
+            terms.append(term)
+        if len(terms) > MAX_PREFIX_TERMS:
+            terms = heapq.nlargest(MAX_PREFIX_TERMS, terms, key=lambda t: len(self._tokens[t]))
+        return terms
+
+    @staticmethod
+    def _accumulate(scores, postings, within) -> dict[int, float]:
+        """AND a term's (doc_id, weight) postings into the running scores."""
+        if scores is None:
+            if within is None:
+                return dict(postings)
+            return {d: w for d, w in postings if d in within}
+        return {d: scores[d] + w for d, w in postings if d in scores}
+
+    def _search_trigrams(self, query, stop, offset, within, count) -> SearchHits:
+        grams = _trigrams(query)
+        postings = []
+        for gram in grams:
+            p = self._trigrams.get(gram)
+            if p is None:
+                return SearchHits(total=0)
+            postings.append(p)
+        postings.sort(key=len)
+
+        rarest, others = postings[0], postings[1:]
+        if len(query) == NGRAM and within is None:
+            # A 3-char query is a single trigram: the posting list is the answer
+            # (longer queries with one distinct trigram, like "mmmm", still verify)
+            return self._page(rarest, len(rarest), stop, offset)
+
+        candidates = set(rarest)
+        for p in others:
+            if not candidates:
+                break
+            if len(p) > _GALLOP_RATIO * len(candidates):
+                # Much longer list: probe it instead of walking it
+                candidates = {d for d in candidates if _contains(p, d)}
+            else:
+                candidates.intersection_update(p)
+
+        lowered = self._lowered
+        return self._filter(sorted(candidates), lambda d: query in lowered[d],
+                            stop, offset, within, count)
+
+    def _short_query_postings(self, query: str) -> list[int]:
+        """Sorted ids of quotes with a token containing query (LRU-cached per query)."""
+        cache = self._short_cache
+        cached = cache.get(query)
+        if cached is not None:
+            try:
+                cache.move_to_end(query)
+            except KeyError:  # evicted by another thread meanwhile
+                pass
+            return cached
+        ids: set[int] = set()
+        for token, postings in self._tokens.items():
+            if query in token:
+                ids.update(postings)
+        cached = cache[query] = sorted(ids)
+        while len(cache) > SHORT_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+        return cached
+
+    @staticmethod
+    def _page(ids: Sequence[int], total: int, stop, offset) -> SearchHits:
+        return SearchHits(total=total, ids=list(ids[offset:stop]))
+
+    @staticmethod
+    def _filter(candidates, matches, stop, offset, within, count) -> SearchHits:
+        if within is not None:
+            candidates = [d for d in candidates if d in within]
+        if count:
+            matched = [d for d in candidates if matches(d)]
+            return SearchHits(total=len(matched), ids=matched[offset:stop])
+
+        # Early termination: stop as soon as the requested page is full
+        total = 0
+        page = []
+        for doc_id in candidates:
+            if not matches(doc_id):
+                continue
+            if total >= offset:
+                page.append(doc_id)
+            total += 1
+            if stop is not None and total >= stop:
+                break
+        return SearchHits(total=total, ids=page)
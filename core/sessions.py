@@ -0,0 +1,460 @@
+"""
+Server-side game sessions.
+
+Each session deals quotes from its own shuffled deck without repeats. The
+deck is never materialized: a seeded Feistel permutation maps deck position
+-> quote index, so a session stores a seed and a cursor, not O(corpus) state.
+Answers for dealt rounds stay on the server; /game/verify only needs the
+session ID and the guess.
+
+A pool is a session holding the rounds inlined in the pre-rendered page
+(api.page). It is never played: a new session copies one of its rounds as
+its own next round (GameSessions.start), so round one is graded on the
+server. Anyone can copy the same pool round into any number of sessions,
+so copied rounds are practice: graded, but never scored.
+
+Every change (deal, verify) is one atomic read-modify-write on the
+backend: in-process under a lock, or StateStore.update on a shared store,
+so a refill on one worker and a verify on another never overwrite each
+other's rounds or streak.
+"""
+
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Callable, Optional, TypeVar
+
+from core.config import get_settings
+from core.quotes import Quote, QuotesClient, quotes_client
+from core.state import StateStore, open_state_store
+
+# Dealt-but-unanswered rounds kept per session (enough for a prefetch queue);
+# the oldest are dropped beyond this
+MAX_PENDING = 32
+
+T = TypeVar("T")
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(x: int) -> int:
+    """SplitMix64 finalizer: a fast, well-distributed 64-bit hash."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+class FeistelPermutation:
+    """
+    A pseudorandom permutation of range(n), evaluated one position at a time.
+
+    A balanced Feistel network is a bijection on [0, 2^(2h)) for any round
+    function; cycle-walking (re-encrypting until the value lands below n)
+    restricts it to a bijection on [0, n). The domain is < 4n, so that takes
+    fewer than four steps on average.
+    """
+
+    ROUNDS = 4
+
+    def __init__(self, n: int, seed: int):
+        self.n = n
+        self._half = max(((n - 1).bit_length() + 1) // 2, 1)
+        self._mask = (1 << self._half) - 1
+        self._keys = [_mix64(seed ^ (r * 0xD1B54A32D192ED03)) for r in range(self.ROUNDS)]
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _encrypt(self, x: int) -> int:
+        half, mask = self._half, self._mask
+        left, right = x >> half, x & mask
+        for key in self._keys:
+            left, right = right, left ^ (_mix64(right ^ key) & mask)
+        return (left << half) | right
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self.n:
+            raise IndexError(i)
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
+
+
+@dataclass(slots=True)
+class Session:
+    """
+    One player's game state. Small and flat, so backends can store it as JSON.
+
+    pending maps round number -> [character, episode, season] for rounds dealt
+    but not yet answered; practice lists those copied from a pool, which
+    don't count towards score or streak. A pool (see GameSessions.create_pool)
+    only lends its rounds to other sessions.
+    """
+    id: str
+    seed: int
+    cursor: int = 0  # Next deck position
+    deck_size: int = 0  # Corpus size the deck permutes
+    corpus_version: int = 0
+    next_round: int = 1
+    pending: dict[int, list] = field(default_factory=dict)
+    practice: list[int] = field(default_factory=list)
+    played: int = 0
+    correct: int = 0
+    streak: int = 0
+    best_streak: int = 0
+    expires_at: float = 0.0
+    pool: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "seed": self.seed,
+            "cursor": self.cursor,
+            "deck_size": self.deck_size,
+            "corpus_version": self.corpus_version,
+            "next_round": self.next_round,
+            "pending": {str(r): answer for r, answer in self.pending.items()},
+            "practice": self.practice,
+            "played": self.played,
+            "correct": self.correct,
+            "streak": self.streak,
+            "best_streak": self.best_streak,
+            "expires_at": self.expires_at,
+            "pool": self.pool,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        data = dict(data)
+        data["pending"] = {int(r): answer for r, answer in data.get("pending", {}).items()}
+        return cls(**data)
+
+
+class SessionBackend(ABC):
+    """Where sessions live. Swap the in-process store for a shared one across workers."""
+
+    # True if calls do I/O (async callers should run them in a thread)
+    blocking = False
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Session]:
+        """The session, or None if unknown or expired."""
+
+    @abstractmethod
+    def save(self, session: Session) -> None:
+        """Store the session and push its expiry out by ttl."""
+
+    @abstractmethod
+    def update(self, session_id: str, change: Callable[[Session], T]) -> Optional[tuple[Session, T]]:
+        """
+        Atomically apply change to the stored session and save it (pushing its
+        expiry out by ttl). change may run more than once if another worker
+        updated the session meanwhile, so it must only touch the session.
+        Returns (session, change's result), or None if unknown or expired.
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    def __len__(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionBackend(SessionBackend):
+    """
+    In-process store with sliding TTL and an LRU cap.
+
+    Entries are kept in save order, which is also expiry order, so expired
+    and least recently used sessions are both evicted from the front.
+    """
+
+    def __init__(self, ttl: float = 3600, max_sessions: int = 10_000):
+        super().__init__(ttl)
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self, now: float) -> None:
+        sessions = self._sessions
+        while sessions:
+            oldest = next(iter(sessions.values()))
+            if oldest.expires_at > now and len(sessions) <= self.max_sessions:
+                break
+            sessions.popitem(last=False)
+
+    def load(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires_at <= time.time():
+                del self._sessions[session_id]
+                return None
+            return session
+
+    def _save(self, session: Session) -> None:
+        now = time.time()
+        session.expires_at = now + self.ttl
+        self._sessions[session.id] = session
+        self._sessions.move_to_end(session.id)
+        self._evict(now)
+
+    def save(self, session: Session) -> None:
+        with self._lock:
+            self._save(session)
+
+    def update(self, session_id: str, change: Callable[[Session], T]) -> Optional[tuple[Session, T]]:
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.expires_at <= time.time():
+                self._sessions.pop(session_id, None)
+                return None
+            result = change(session)
+            self._save(session)
+            return session, result
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class StoreSessionBackend(SessionBackend):
+    """
+    Sessions as compact JSON in a shared StateStore (SQLite or Redis), so any
+    worker can serve any player. Expiry is left to the store. Writes go
+    straight to the store (StateStore.update), so another worker sees a
+    session or a dealt round as soon as the request that made it returns.
+    """
+
+    blocking = True
+
+    def __init__(self, store: StateStore, ttl: float = 3600):
+        super().__init__(ttl)
+        self.store = store
+
+    def _encode(self, session: Session) -> bytes:
+        session.expires_at = time.time() + self.ttl
+        return json.dumps(session.to_dict(), separators=(",", ":")).encode("utf-8")
+
+    def load(self, session_id: str) -> Optional[Session]:
+        data = self.store.get("session:" + session_id)
+        if data is None:
+            return None
+        return Session.from_dict(json.loads(data))
+
+    def save(self, session: Session) -> None:
+        self.store.set("session:" + session.id, self._encode(session), self.ttl)
+
+    def update(self, session_id: str, change: Callable[[Session], T]) -> Optional[tuple[Session, T]]:
+        updated: list = []
+
+        def apply(data: bytes) -> bytes:
+            session = Session.from_dict(json.loads(data))
+            result = change(session)
+            updated[:] = [session, result]
+            return self._encode(session)
+
+        if self.store.update("session:" + session_id, apply, self.ttl) is None:
+            return None
+        return updated[0], updated[1]
+
+    def delete(self, session_id: str) -> None:
+        self.store.delete("session:" + session_id)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+def make_backend(
+    kind: str,
+    ttl: float,
+    max_sessions: int,
+    url: str = "",
+) -> SessionBackend:
+    """
+    Build the session backend named by B99_SESSION_BACKEND.
+
+    Args:
+        kind: "memory" (this process only), "sqlite" or "redis"
+        ttl: Idle seconds before a session expires
+        max_sessions: LRU cap (memory backend)
+        url: SQLite path or redis:// URL (B99_STATE_URL)
+    """
+    if kind == "memory":
+        return MemorySessionBackend(ttl=ttl, max_sessions=max_sessions)
+    return StoreSessionBackend(open_state_store(kind, url), ttl=ttl)
+
+
+class GameSessions:
+    """
+    Deals rounds from per-session decks and holds their answers.
+    Methods do backend I/O for shared backends (see SessionBackend.blocking).
+    """
+
+    def __init__(self, backend: SessionBackend, client: QuotesClient):
+        self.backend = backend
+        self._client = client
+
+    def create(self) -> Session:
+        session = Session(id=secrets.token_urlsafe(16), seed=secrets.randbits(64))
+        self.backend.save(session)
+        return session
+
+    def create_pool(self, n: int) -> tuple[Session, list[tuple[int, Quote]]]:
+        """Deal n rounds into a new pool: (pool, [(pool round, quote), ...])."""
+        pool = Session(id=secrets.token_urlsafe(16), seed=secrets.randbits(64), pool=True)
+        dealt = self._deal(pool, n)
+        self.backend.save(pool)
+        return pool, dealt
+
+    def start(
+        self,
+        session_id: Optional[str],
+        pool_id: str,
+        pool_round: int,
+    ) -> tuple[Session, Optional[int]]:
+        """
+        Continue session_id (a new session if it is unknown or not given) with
+        round pool_round of pool pool_id as its next round.
+
+        The copied round is practice: a pool round is public for as long as
+        the page is cached, so it earns no score or streak.
+
+        Returns (session, round number), with None for the round if the pool
+        or the round is gone (expired); the session is then just started.
+        """
+        pool = self.backend.load(pool_id) if pool_id else None
+        answer = pool.pending.get(pool_round) if pool is not None and pool.pool else None
+
+        def change(session: Session) -> Optional[int]:
+            if answer is None:
+                return None
+            round_no = session.next_round
+            session.next_round += 1
+            session.pending[round_no] = list(answer)
+            while len(session.pending) > MAX_PENDING:
+                del session.pending[min(session.pending)]
+            session.practice = [r for r in session.practice if r in session.pending] + [round_no]
+            return round_no
+
+        if session_id:
+            updated = self.backend.update(session_id, change)
+            if updated is not None:
+                return updated
+        session = Session(id=secrets.token_urlsafe(16), seed=secrets.randbits(64))
+        round_no = change(session)
+        self.backend.save(session)
+        return session, round_no
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self.backend.load(session_id) if session_id else None
+
+    def deal(self, session_id: str, n: int = 1) -> Optional[tuple[Session, list[tuple[int, Quote]]]]:
+        """
+        Deal up to n rounds: (session, [(round number, quote), ...]), or None
+        if the session is unknown. Each pass through the deck visits every
+        quote once; a new pass (or a corpus reload) reshuffles. Pools deal
+        nothing.
+        """
+        return self.backend.update(session_id, lambda session: [] if session.pool else self._deal(session, n))
+
+    def _deal(self, session: Session, n: int) -> list[tuple[int, Quote]]:
+        state = self._client.state
+        store = state.store
+        if not len(store):
+            return []
+        if session.deck_size != len(store) or session.corpus_version != state.version:
+            session.deck_size = len(store)
+            session.corpus_version = state.version
+            session.cursor = 0
+        deck = FeistelPermutation(session.deck_size, session.seed)
+
+        dealt = []
+        for _ in range(n):
+            if session.cursor >= session.deck_size:
+                session.seed = _mix64(session.seed)
+                session.cursor = 0
+                deck = FeistelPermutation(session.deck_size, session.seed)
+            quote = store[deck[session.cursor]]
+            session.cursor += 1
+            round_no = session.next_round
+            session.next_round += 1
+            session.pending[round_no] = [quote.character, quote.episode, quote.season]
+            dealt.append((round_no, quote))
+
+        while len(session.pending) > MAX_PENDING:
+            del session.pending[min(session.pending)]
+        return dealt
+
+    def verify(
+        self,
+        session_id: str,
+        round_no: Optional[int],
+        judge: Callable[[list], T],
+    ) -> Optional[tuple[Session, Optional[tuple[int, list, T]]]]:
+        """
+        Take a pending round (the oldest if round_no is None), grade its
+        [character, episode, season] answer with judge (which returns a grade
+        with a .correct attribute) and update score and streak (unless it is a
+        practice round), in one atomic update.
+
+        Returns None if the session is unknown, else (session, result) where
+        result is (round, answer, grade, scored), or None if there is no such
+        round (or the session is a pool). scored is False for practice rounds.
+        """
+        def change(session: Session):
+            if session.pool or not session.pending:
+                return None
+            taken = round_no if round_no is not None else min(session.pending)
+            answer = session.pending.pop(taken, None)
+            if answer is None:
+                return None
+            grade = judge(answer)
+            if taken in session.practice:
+                session.practice.remove(taken)
+                return taken, answer, grade, False
+            session.played += 1
+            if grade.correct:
+                session.correct += 1
+                session.streak += 1
+                session.best_streak = max(session.best_streak, session.streak)
+            else:
+                session.streak = 0
+            return taken, answer, grade, True
+
+        return self.backend.update(session_id, change)
+
+
+@lru_cache
+def get_game_sessions() -> GameSessions:
+    """Shared GameSessions for the app (backend chosen by settings)."""
+    settings = get_settings()
+    backend = make_backend(
+        settings.B99_SESSION_BACKEND,
+        settings.B99_SESSION_TTL,
+        settings.B99_SESSION_MAX,
+        url=settings.B99_STATE_URL,
+    )
+    return GameSessions(backend, quotes_client)
+
+
+def close_game_sessions() -> None:
+    """Flush pending writes and close the backend, if sessions were used."""
+    if get_game_sessions.cache_info().currsize:
+        get_game_sessions().backend.close()
+        get_game_sessions.cache_clear()
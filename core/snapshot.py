@@ -0,0 +1,273 @@
+"""
+Binary snapshot of the quote corpus.
+
+`python -m core.snapshot` compiles data/quotes.json into one file holding
+the QuoteStore columns (string tables, per-quote ID columns, selections),
+precomputed masked text, difficulty scores and buckets (core.difficulty)
+and the search indexes. QuotesClient mmaps it and decodes strings only when they are read.
+Forked workers then share one page-cached copy instead of each parsing JSON.
+
+The masked text, difficulty scores and indexes are derived with the alias
+tables and the masking/difficulty/search code of the build. The header
+keeps a fingerprint of those inputs (see core.quotes.snapshot_fingerprint),
+and a snapshot whose fingerprint differs from the running code's is
+ignored like a stale one, so an alias added to the masker can't be
+undone by old masks.
+
+Layout (native byte order, every section 8-byte aligned):
+    header   magic, format version, section count, source size/mtime, table offset,
+             fingerprint
+    sections raw arrays / UTF-8 blobs
+    table    (name, offset, length) per section
+"""
+
+import argparse
+import hashlib
+import importlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Sequence
+
+MAGIC = b"B99SNAP\0"
+FORMAT_VERSION = 4
+FINGERPRINT_SIZE = 16
+
+_HEADER = struct.Struct(f"=8sIIQQQ{FINGERPRINT_SIZE}s")
+_NAME_SIZE = 16
+_ENTRY = struct.Struct(f"={_NAME_SIZE}sQQ")
+_BYTE_ORDER = {"little": 1, "big": 2}[sys.byteorder]
+
+
+class SnapshotError(Exception):
+    """Snapshot file is missing, corrupt or built for another format."""
+
+
+def fingerprint(data: str, modules: Iterable[str]) -> bytes:
+    """Digest of what derived sections depend on: data (deterministic text) and the named modules' source."""
+    digest = hashlib.sha256(data.encode("utf-8"))
+    for name in modules:
+        digest.update(Path(importlib.import_module(name).__file__).read_bytes())
+    return digest.digest()[:FINGERPRINT_SIZE]
+
+
+class StringTable(Sequence[str]):
+    """Strings stored as one UTF-8 blob plus offsets; decoded on access."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+class _Writer:
+    """Collects named sections and writes them with the header and section table."""
+
+    def __init__(self):
+        self._sections: list[tuple[str, bytes]] = []
+
+    def add(self, name: str, data) -> None:
+        if len(name) > _NAME_SIZE:
+            raise ValueError(f"section name too long: {name}")
+        self._sections.append((name, bytes(data)))
+
+    def add_strings(self, name: str, strings: Iterable[str]) -> None:
+        offsets = array("Q", [0])
+        blob = bytearray()
+        for s in strings:
+            blob += s.encode("utf-8")
+            offsets.append(len(blob))
+        self.add(name + ".off", offsets)
+        self.add(name + ".dat", blob)
+
+    def add_postings(self, name: str, postings: dict, weights: Optional[dict] = None) -> None:
+        """term -> sorted ids (and optional float weights), terms stored in sorted order."""
+        terms = sorted(postings)
+        offsets = array("Q", [0])
+        ids = array("I")
+        wts = array("f")
+        for term in terms:
+            ids.extend(postings[term])
+            if weights is not None:
+                wts.extend(weights[term])
+            offsets.append(len(ids))
+        self.add_strings(name + ".keys", terms)
+        self.add(name + ".off", offsets)
+        self.add(name + ".ids", ids)
+        if weights is not None:
+            self.add(name + ".wts", wts)
+
+    def write(self, path: Path, source_size: int, source_mtime: int, fingerprint: bytes) -> None:
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(b"\0" * _HEADER.size)
+            table = []
+            for name, data in self._sections:
+                f.write(b"\0" * (-f.tell() % 8))
+                table.append((name, f.tell(), len(data)))
+                f.write(data)
+            f.write(b"\0" * (-f.tell() % 8))
+            table_offset = f.tell()
+            for name, offset, length in table:
+                f.write(_ENTRY.pack(name.encode("ascii"), offset, length))
+            f.seek(0)
+            f.write(_HEADER.pack(
+                MAGIC, FORMAT_VERSION | (_BYTE_ORDER << 16), len(table),
+                source_size, source_mtime, table_offset, fingerprint,
+            ))
+        # Readers never see a half-written file
+        os.replace(tmp, path)
+
+
+def build_snapshot(store, index, source: Path, out: Path, fingerprint: bytes) -> None:
+    """
+    Write a snapshot of a quote store and its search index.
+
+    Args:
+        store: QuoteStore parsed from source
+        index: QuoteIndex built over the store's texts
+        source: JSON file the quotes came from (its size/mtime mark freshness)
+        out: Snapshot path
+        fingerprint: Digest of the code and tables the derived sections came from
+    """
+    lowered, trigrams, tokens, weights = index.tables()
+    overrides = sorted(store.header_overrides.items())
+    character_ids = {name: i for i, name in enumerate(store.characters)}
+
+    writer = _Writer()
+    writer.add_strings("characters", store.characters)
+    writer.add_strings("episodes", store.episodes)
+    writer.add("quote.character", array("I", store.character_ids))
+    writer.add("quote.episode", array("I", store.episode_ids))
+    writer.add("quote.season", array("b", store.seasons))
+    writer.add_strings("text", store.texts)
+    writer.add("header.ids", array("I", (i for i, _ in overrides)))
+    writer.add_strings("header", (h for _, h in overrides))
+    writer.add_strings("masked", (store.masked_text(i) for i in range(len(store))))
+    writer.add("difficulty", array("f", store.difficulty))
+    writer.add_postings("diff", store.by_difficulty)
+    writer.add_strings("lowered", lowered)
+    writer.add_postings("bych", {str(character_ids[c]): ids for c, ids in store.by_character.items()})
+    writer.add_postings("bysn", {str(n): ids for n, ids in store.by_season.items()})
+    writer.add_postings("tri", trigrams)
+    writer.add_postings("tok", tokens, weights)
+
+    stat = source.stat()
+    writer.write(out, stat.st_size, stat.st_mtime_ns, fingerprint)
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file through mmap.
+    Columns are memoryviews over the mapping; nothing is copied up front.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise SnapshotError(f"empty snapshot: {path}") from e
+        view = memoryview(self._mmap)
+        if len(view) < _HEADER.size:
+            raise SnapshotError(f"truncated snapshot: {path}")
+
+        magic, version, count, self.source_size, self.source_mtime, table_offset, self.fingerprint = \
+            _HEADER.unpack_from(view)
+        if magic != MAGIC or version & 0xFFFF != FORMAT_VERSION:
+            raise SnapshotError(f"not a v{FORMAT_VERSION} snapshot: {path}")
+        if version >> 16 != _BYTE_ORDER:
+            raise SnapshotError(f"snapshot built on a machine with another byte order: {path}")
+
+        self._sections: dict[str, memoryview] = {}
+        for i in range(count):
+            name, offset, length = _ENTRY.unpack_from(view, table_offset + i * _ENTRY.size)
+            self._sections[name.rstrip(b"\0").decode("ascii")] = view[offset:offset + length]
+
+        self.characters = self._strings("characters")
+        self.episodes = self._strings("episodes")
+        self.character_ids = self._column("quote.character", "I")
+        self.episode_ids = self._column("quote.episode", "I")
+        self.seasons = self._column("quote.season", "b")
+        self.texts = self._strings("text")
+        self.masked = self._strings("masked")
+        self.difficulty = self._column("difficulty", "f")
+        self.lowered = self._strings("lowered")
+
+    def __len__(self) -> int:
+        return len(self.character_ids)
+
+    def _section(self, name: str) -> memoryview:
+        try:
+            return self._sections[name]
+        except KeyError:
+            raise SnapshotError(f"snapshot has no '{name}' section") from None
+
+    def _column(self, name: str, fmt: str) -> memoryview:
+        return self._section(name).cast(fmt)
+
+    def _strings(self, name: str) -> StringTable:
+        return StringTable(self._column(name + ".off", "Q"), self._section(name + ".dat"))
+
+    def header_overrides(self) -> dict[int, str]:
+        """Quote position -> header, for the headers that don't follow the template."""
+        return dict(zip(self._column("header.ids", "I"), self._strings("header")))
+
+    def postings(self, name: str, fmt: str = "ids") -> dict[str, memoryview]:
+        """term -> slice of the postings (fmt 'ids') or weights (fmt 'wts') column."""
+        offsets = self._column(name + ".off", "Q")
+        values = self._column(f"{name}.{fmt}", "I" if fmt == "ids" else "f")
+        keys = self._strings(name + ".keys")
+        return {term: values[offsets[i]:offsets[i + 1]] for i, term in enumerate(keys)}
+
+    def is_fresh(self, source: str | Path) -> bool:
+        """True if the source JSON is unchanged since the snapshot was built."""
+        try:
+            stat = Path(source).stat()
+        except OSError:
+            return False
+        return stat.st_size == self.source_size and stat.st_mtime_ns == self.source_mtime
+
+    def matches(self, fingerprint: bytes) -> bool:
+        """True if the snapshot was built with the same derivation inputs (aliases, masking code, ...)."""
+        return self.fingerprint == fingerprint
+
+
+def main():
+    from core.config import get_settings
+    from core.quotes import load_quote_store, snapshot_fingerprint
+    from core.search import QuoteIndex
+
+    parser = argparse.ArgumentParser(description="Compile the quotes JSON into a binary snapshot.")
+    parser.add_argument("--json", default=get_settings().B99_QUOTES_JSON, help="Source quotes JSON")
+    parser.add_argument("--out", default=get_settings().B99_SNAPSHOT, help="Snapshot path")
+    parser.add_argument("--processes", type=int, default=None, help="Difficulty scoring workers (default: auto)")
+    args = parser.parse_args()
+
+    source = Path(args.json)
+    store = load_quote_store(source)
+    store.score_difficulty(processes=args.processes)
+    index = QuoteIndex(store.texts)
+    build_snapshot(store, index, source, Path(args.out), snapshot_fingerprint())
+    print(f"Wrote {args.out}: {len(store)} quotes, {os.path.getsize(args.out):,} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Shared key-value state for running several workers or nodes.
+
+Backends store opaque bytes with a TTL:
+- SQLiteStateStore: one file in WAL mode, shared by the workers of one host
+- RedisStateStore:  any Redis-protocol (RESP) server, over pooled sockets
+
+update() is an atomic read-modify-write that writes through: a SQLite
+transaction, or WATCH + GET then MULTI/EXEC on one Redis connection (two
+round trips), so workers updating the same key never lose each other's
+changes (on Redis the loser re-reads and retries).
+"""
+
+import socket
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from queue import Empty, LifoQueue
+from typing import Callable, Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+
+# Attempts at a contended Redis update before giving up
+UPDATE_ATTEMPTS = 16
+
+
+class StateError(Exception):
+    """The state backend failed or returned an error."""
+
+
+class StateStore(ABC):
+    """Bytes by key, each with its own TTL."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """The value, or None if missing or expired."""
+
+    @abstractmethod
+    def set_many(self, items: Iterable[tuple[str, bytes, float]]) -> None:
+        """Write (key, value, ttl seconds) items in one round trip."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def update(self, key: str, change: Callable[[bytes], bytes], ttl: float) -> Optional[bytes]:
+        """
+        Atomically replace the key's value with change(value). change may run
+        more than once if another writer got in first, so it must only
+        compute the new value.
+
+        Returns the value written, or None (writing nothing) if the key is
+        missing or expired.
+        """
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.set_many([(key, value, ttl)])
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStateStore(StateStore):
+    """
+    SQLite file in WAL mode: readers never block the writer, and every
+    worker process on the host opens the same file. One connection per thread.
+    """
+
+    # Expired rows are purged every this many writes
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str | Path):
+        self.path = str(path)
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS state ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            # WAL makes NORMAL durable enough: a crash can lose the last commits, never corrupt
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute(
+            "SELECT value FROM state WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def set_many(self, items: Iterable[tuple[str, bytes, float]]) -> None:
+        now = time.time()
+        rows = [(key, value, now + ttl) for key, value, ttl in items]
+        if not rows:
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)", rows)
+            self._writes += len(rows)
+            if self._writes >= self.PURGE_EVERY:
+                self._writes = 0
+                conn.execute("DELETE FROM state WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def update(self, key: str, change: Callable[[bytes], bytes], ttl: float) -> Optional[bytes]:
+        now = time.time()
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front, so no other worker commits in between
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM state WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            value = change(bytes(row[0]))
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value, expires_at) VALUES (?, ?, ?)", (key, value, now + ttl)
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return value
+
+    def delete(self, key: str) -> None:
+        self._conn().execute("DELETE FROM state WHERE key = ?", (key,))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def encode_command(*args) -> bytes:
+    """A command as a RESP array of bulk strings."""
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode("ascii")
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+class RESPConnection:
+    """One socket to a Redis-protocol server."""
+
+    def __init__(self, host: str, port: int, db: int = 0, timeout: float = 2.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._reader = self._sock.makefile("rb")
+        if db:
+            self.execute("SELECT", db)
+
+    def execute(self, *args):
+        return self.pipeline([args])[0]
+
+    def pipeline(self, commands: list[tuple]) -> list:
+        """Send every command in one write, then read all replies."""
+        self._sock.sendall(b"".join(encode_command(*c) for c in commands))
+        replies = [self._read_reply() for _ in commands]
+        for reply in replies:
+            if isinstance(reply, StateError):
+                raise reply
+        return replies
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("connection closed by server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            return StateError(body.decode())
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise StateError(f"unexpected reply: {line!r}")
+
+    def close(self) -> None:
+        try:
+            self._reader.close()
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisStateStore(StateStore):
+    """
+    Redis-protocol store (redis://host:port/db) with a pool of kept-open
+    connections. Batched writes are one pipelined round trip.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8, timeout: float = 2.0, key_prefix: str = "b99:"):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.strip("/") or 0)
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+        self._pool: LifoQueue[RESPConnection] = LifoQueue(maxsize=pool_size)
+
+    @contextmanager
+    def _connection(self) -> Iterator[RESPConnection]:
+        """A pooled connection, closed instead of returned if a command fails."""
+        try:
+            conn = self._pool.get_nowait()
+        except Empty:
+            conn = RESPConnection(self.host, self.port, self.db, self.timeout)
+        try:
+            yield conn
+        except (OSError, ConnectionError) as e:
+            conn.close()
+            raise StateError(f"redis {self.host}:{self.port}: {e}") from e
+        except BaseException:
+            conn.close()  # may be mid-transaction
+            raise
+        self._release(conn)
+
+    def _run(self, commands: list[tuple]) -> list:
+        with self._connection() as conn:
+            return conn.pipeline(commands)
+
+    def _release(self, conn: RESPConnection) -> None:
+        try:
+            self._pool.put_nowait(conn)
+        except Exception:
+            conn.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._run([("GET", self.key_prefix + key)])[0]
+
+    def set_many(self, items: Iterable[tuple[str, bytes, float]]) -> None:
+        commands = [
+            ("SET", self.key_prefix + key, value, "PX", max(int(ttl * 1000), 1))
+            for key, value, ttl in items
+        ]
+        if commands:
+            self._run(commands)
+
+    def update(self, key: str, change: Callable[[bytes], bytes], ttl: float) -> Optional[bytes]:
+        # WATCH makes EXEC fail (nil reply) if another client writes the key in between
+        key = self.key_prefix + key
+        with self._connection() as conn:
+            for _ in range(UPDATE_ATTEMPTS):
+                current = conn.pipeline([("WATCH", key), ("GET", key)])[1]
+                if current is None:
+                    conn.execute("UNWATCH")
+                    return None
+                value = change(current)
+                replies = conn.pipeline([("MULTI",), ("SET", key, value, "PX", max(int(ttl * 1000), 1)), ("EXEC",)])
+                if replies[-1] is not None:
+                    return value
+        raise StateError(f"{key}: too many concurrent updates")
+
+    def delete(self, key: str) -> None:
+        self._run([("DEL", self.key_prefix + key)])
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except Empty:
+                break
+
+
+def open_state_store(kind: str, url: str) -> StateStore:
+    """Store for B99_SESSION_BACKEND ("sqlite" or "redis") at B99_STATE_URL."""
+    if kind == "sqlite":
+        return SQLiteStateStore(url or "data/state.db")
+    if kind == "redis":
+        return RedisStateStore(url or "redis://localhost:6379/0")
+    raise ValueError(f"Unknown state backend: {kind!r}")
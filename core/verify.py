@@ -0,0 +1,155 @@
+"""
+Guess verification for /game/verify.
+
+For every known character, the set of normalized guesses that count as
+correct is computed once (aliases, name words, partial names), so grading
+a guess is a set lookup. Episodes are compared by their catalog key, so
+'The Fugitive Pt. 1' and 'The Fugitive (Part 1)' are the same answer.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional, Sequence
+
+from core.aliases import AliasIndex, normalize_name
+from core.episodes import EpisodeCatalog, normalize_episode
+
+# Partial names shorter than this are never accepted ('a' is in 'Jake')
+MIN_PARTIAL_LENGTH = 3
+
+
+@dataclass(frozen=True, slots=True)
+class Grade:
+    """Result of checking one guess."""
+    character_correct: bool
+    episode_correct: bool
+
+    @property
+    def correct(self) -> bool:
+        return self.character_correct and self.episode_correct
+
+
+class GuessVerifier:
+    """
+    Precomputed accepted-guess tables.
+
+    A character guess is correct when:
+    - it resolves (alias, or one typo away from one) to the answer, or
+    - it resolves to no character and is part of the answer's name
+      ('Sergeant' for 'Sergeant Jeffords')
+
+    The accepted sets hold every such guess drawn from the known names,
+    their words and the answer's own substrings; only guesses outside that
+    vocabulary fall back to a typo lookup.
+    """
+
+    def __init__(self, aliases: Mapping[str, Sequence[str]], alias_index: AliasIndex, catalog: EpisodeCatalog):
+        """
+        Args:
+            aliases: Canonical character -> name variations (CHARACTER_ALIASES)
+            alias_index: Index over the same table
+            catalog: Episode catalog for episode spellings
+        """
+        self._alias_index = alias_index
+        self._catalog = catalog
+        self._canonical_cache: dict[str, Optional[str]] = {}
+
+        vocabulary: set[str] = set(alias_index.names())
+        for name in list(vocabulary):
+            vocabulary.update(w for w in name.split() if len(w) >= MIN_PARTIAL_LENGTH)
+        self._accepted: dict[str, frozenset[str]] = {}
+        for answer in aliases:
+            key = normalize_name(answer)
+            candidates = vocabulary | _substrings(key)
+            self._accepted[key] = frozenset(g for g in candidates if self._match(g, key))
+        self._vocabulary = frozenset(vocabulary)
+
+        # Raw dropdown spelling -> episode key, so the common case skips normalizing
+        self._episode_keys: dict[str, str] = {}
+        for episode in catalog:
+            key = normalize_episode(episode.name)
+            for variant in episode.variants:
+                self._episode_keys[variant.casefold()] = key
+
+    def _canonical(self, guess: str) -> Optional[str]:
+        """Normalized canonical name for a normalized guess (memoized)."""
+        try:
+            return self._canonical_cache[guess]
+        except KeyError:
+            canonical = self._alias_index.canonical(guess, fuzzy=True)
+            result = normalize_name(canonical) if canonical else None
+            if len(self._canonical_cache) < 100_000:
+                self._canonical_cache[guess] = result
+            return result
+
+    def _match(self, guess: str, answer: str) -> bool:
+        """The full rule, on normalized strings."""
+        if not guess:
+            return False
+        canonical = self._canonical(guess)
+        if canonical is not None:
+            return canonical == answer
+        if guess == answer or answer in guess:
+            return True
+        return len(guess) >= MIN_PARTIAL_LENGTH and guess in answer
+
+    def character_correct(self, guess: str, answer: str) -> bool:
+        g = normalize_name(guess)
+        a = normalize_name(answer)
+        accepted = self._accepted.get(a)
+        if accepted is None:
+            # Answer outside the alias table: apply the rule directly
+            return self._match(g, a)
+        if g in accepted:
+            return True
+        if g in self._vocabulary or g in a:
+            return False
+        # Unseen guess: a typo of an alias, or something containing the answer
+        return self._match(g, a)
+
+    def _episode_key(self, name: str) -> str:
+        key = self._episode_keys.get(name.strip().casefold())
+        return key if key is not None else normalize_episode(name)
+
+    def episode_correct(self, guess: Optional[str], answer: Optional[str]) -> bool:
+        if guess and answer:
+            return self._episode_key(guess) == self._episode_key(answer)
+        # No guess for a known answer is wrong; no answer means nothing to check
+        return not answer
+
+    def grade(
+        self,
+        guess_character: str,
+        answer_character: str,
+        guess_episode: Optional[str] = None,
+        answer_episode: Optional[str] = None,
+    ) -> Grade:
+        return Grade(
+            character_correct=self.character_correct(guess_character, answer_character),
+            episode_correct=self.episode_correct(guess_episode, answer_episode),
+        )
+
+    def grade_many(
+        self, rows: Iterable[tuple[str, str, Optional[str], Optional[str]]]
+    ) -> list[Grade]:
+        """
+        Grade (guess, answer, guess_episode, answer_episode) rows, e.g. to
+        replay a game log. Repeated pairs are graded once.
+        """
+        memo: dict[tuple, Grade] = {}
+        grades = []
+        for row in rows:
+            grade = memo.get(row)
+            if grade is None:
+                grade = memo[row] = self.grade(*row)
+            grades.append(grade)
+        return grades
+
+
+def _substrings(name: str) -> set[str]:
+    n = len(name)
+    return {
+        name[i:j]
+        for i in range(n)
+        for j in range(i + MIN_PARTIAL_LENGTH, n + 1)
+        if name[i] != " " and name[j - 1] != " "
+    }
@@ -0,0 +1,64 @@
+"""
+Polling file watcher for corpus hot reload.
+Checks size and mtime of the corpus files on a daemon thread; no extra
+dependencies and works on every platform and filesystem.
+"""
+
+import os
+import threading
+from typing import Callable, Iterable, Optional
+
+
+def _signature(path: str) -> Optional[tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class FileWatcher:
+    """
+    Calls on_change() when any watched file is created, modified or removed.
+
+    A change is only reported once the file has looked the same for two
+    consecutive polls, so a file still being written is not picked up halfway.
+    """
+
+    def __init__(self, paths: Iterable[str], on_change: Callable[[], object], interval: float = 2.0):
+        self.paths = [p for p in paths if p]
+        self.interval = interval
+        self._on_change = on_change
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seen = {p: _signature(p) for p in self.paths}
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="quotes-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        pending: dict[str, Optional[tuple[int, int]]] = {}
+        while not self._stop.wait(self.interval):
+            changed = False
+            for path in self.paths:
+                current = _signature(path)
+                if current == self._seen[path]:
+                    pending.pop(path, None)
+                elif pending.get(path, ...) == current:
+                    # Stable since the last poll: the write has finished
+                    self._seen[path] = current
+                    del pending[path]
+                    changed = True
+                else:
+                    pending[path] = current
+            if changed:
+                print(f"Corpus files changed, reloading: {', '.join(self.paths)}")
+                self._on_change()
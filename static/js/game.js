@@ -4,14 +4,30 @@
  */
 
 // Game State
+let sessionId = null;
+let currentRound = null;
 let currentAnswer = null;
 let currentEpisode = null;
 let currentSeason = null;
 let currentStreak = 0;
 let bestStreak = 0;
+// Part of currentStreak from before the session (the server's streak starts at 0)
+let streakOffset = 0;
 let characters = [];
 let episodesBySeason = {};
 
+// Data inlined by the pre-rendered page (characters, episodes, first-round quotes)
+const bootstrapEl = document.getElementById('bootstrap');
+const bootstrap = bootstrapEl ? JSON.parse(bootstrapEl.textContent) : null;
+// Session round of the pool quote on screen, until POST /game/session returns
+let firstRound = null;
+
+// Prefetched rounds (from /game/session/quotes)
+const BATCH_SIZE = 20;
+const REFILL_AT = 5;
+let quoteQueue = [];
+let refillPromise = null;
+
 // DOM Elements
 const quoteText = document.getElementById('quote-text');
 const guessInput = document.getElementById('guess');
@@ -35,6 +51,10 @@ document.addEventListener('DOMContentLoaded', () => {
 
 // Load character list for autocomplete
 async function loadCharacters() {
+    if (bootstrap && bootstrap.characters) {
+        characters = bootstrap.characters;
+        return;
+    }
     try {
         const response = await fetch('/game/characters');
         const data = await response.json();
@@ -62,9 +82,13 @@ function saveStreakToStorage() {
 // Load episodes grouped by season
 async function loadEpisodes() {
     try {
-        const response = await fetch('/game/episodes');
-        const data = await response.json();
-        episodesBySeason = data.episodes_by_season || {};
+        if (bootstrap && bootstrap.episodes_by_season) {
+            episodesBySeason = bootstrap.episodes_by_season;
+        } else {
+            const response = await fetch('/game/episodes');
+            const data = await response.json();
+            episodesBySeason = data.episodes_by_season || {};
+        }
         
         // Populate season dropdown
         if (guessSeason) {
@@ -106,14 +130,13 @@ async function loadNewQuote() {
     submitBtn.disabled = false;
     nextBtn.classList.add('hidden');
     resultDiv.classList.add('hidden');
+    currentRound = null;
     currentAnswer = null;
     currentEpisode = null;
     currentSeason = null;
 
     try {
-        // Always hide episode hint - player must guess both
-        const response = await fetch('/game/quote?hard_mode=true');
-        const data = await response.json();
+        const data = await nextQuote();
 
         if (data.error) {
             quoteText.textContent = data.error;
@@ -121,15 +144,102 @@ async function loadNewQuote() {
         }
 
         quoteText.textContent = `"${data.text}"`;
+        currentRound = data.round || null;
         currentAnswer = data.answer_character;
         currentEpisode = data.answer_episode;
         currentSeason = data.answer_season;
+
+        if (data.firstRound) {
+            // Pool quote: shown now, its round arrives with the session
+            firstRound = data.firstRound;
+            currentRound = await firstRound;
+            firstRound = null;
+            if (!currentRound) loadNewQuote();  // Pool expired: deal from the session instead
+        }
     } catch (error) {
         console.error('Failed to load quote:', error);
         quoteText.textContent = 'Failed to load quote. Please try again.';
     }
 }
 
+// Start a server-side session (its deck never repeats a quote)
+async function createSession() {
+    const response = await fetch('/game/session', { method: 'POST' });
+    const data = await response.json();
+    sessionId = data.session_id;
+    sessionStorage.setItem('holt_session', sessionId);
+    quoteQueue = [];
+    streakOffset = currentStreak;
+}
+
+// Start the session (or continue the tab's) with the pool quote on screen as
+// its next round, so the server grades it; resolves to that round (null if
+// the pool expired)
+async function startFromPool(pool, poolRound) {
+    const previous = sessionId || sessionStorage.getItem('holt_session');
+    let url = `/game/session?pool=${encodeURIComponent(pool)}&round=${poolRound}`;
+    if (previous) url += `&session_id=${encodeURIComponent(previous)}`;
+    const response = await fetch(url, { method: 'POST' });
+    const data = await response.json();
+    if (data.session_id !== previous) quoteQueue = [];
+    sessionId = data.session_id;
+    sessionStorage.setItem('holt_session', sessionId);
+    streakOffset = Math.max(currentStreak - (data.streak || 0), 0);
+    return data.round;
+}
+
+// Fetch a batch of rounds into the queue (one request in flight at a time)
+function refillQuoteQueue() {
+    if (!refillPromise) {
+        refillPromise = (async () => {
+            if (!sessionId) sessionId = sessionStorage.getItem('holt_session');
+            if (!sessionId) await createSession();
+            let response = await fetch(`/game/session/quotes?session_id=${encodeURIComponent(sessionId)}&n=${BATCH_SIZE}`);
+            if (response.status === 404) {
+                // Session expired: start a new one
+                await createSession();
+                response = await fetch(`/game/session/quotes?session_id=${encodeURIComponent(sessionId)}&n=${BATCH_SIZE}`);
+            }
+            const data = await response.json();
+            quoteQueue.push(...(data.quotes || []));
+        })()
+            .catch(error => console.error('Failed to prefetch quotes:', error))
+            .finally(() => { refillPromise = null; });
+    }
+    return refillPromise;
+}
+
+// Next round: from the queue when possible, topping it up in the background
+async function nextQuote() {
+    // First round: a random quote from the page's inlined pool, while the
+    // session deck loads in the background
+    if (bootstrap && bootstrap.quotes && bootstrap.quotes.length > 0) {
+        const pool = bootstrap.quotes;
+        bootstrap.quotes = null;
+        const pick = pool[Math.floor(Math.random() * pool.length)];
+        const round = startFromPool(bootstrap.pool, pick.round).catch(error => {
+            console.error('Failed to start session:', error);
+            return null;
+        });
+        // Fill the queue once the session exists (or a fresh one is needed)
+        round.then(() => refillQuoteQueue());
+        return { text: pick.text, firstRound: round };
+    }
+    if (quoteQueue.length === 0) {
+        await refillQuoteQueue();
+    }
+    if (quoteQueue.length <= REFILL_AT) {
+        refillQuoteQueue();
+    }
+    if (quoteQueue.length > 0) {
+        return quoteQueue.shift();
+    }
+    // Sessions unavailable: fall back to a single quote (answer sent to the client)
+    // Always hide episode hint - player must guess both
+    const response = await fetch('/game/quote?hard_mode=true');
+    return response.json();
+}
+
 // Setup event listeners
 function setupEventListeners() {
     // Submit answer
@@ -196,16 +306,23 @@ function handleAutocomplete() {
 // Submit answer
 async function submitAnswer() {
     const guess = guessInput.value.trim();
+    if (firstRound) await firstRound;
     
-    if (!guess || !currentAnswer) return;
+    if (!guess || (!currentRound && !currentAnswer)) return;
 
     submitBtn.disabled = true;
     guessInput.disabled = true;
 
     try {
         // Build query params - check character + episode
-        let params = `guess=${encodeURIComponent(guess)}&answer=${encodeURIComponent(currentAnswer)}`;
-        params += `&answer_episode=${encodeURIComponent(currentEpisode || '')}`;
+        let params = `guess=${encodeURIComponent(guess)}`;
+        if (currentRound) {
+            // The server holds the answer for this round
+            params += `&session_id=${encodeURIComponent(sessionId)}&round=${currentRound}`;
+        } else {
+            params += `&answer=${encodeURIComponent(currentAnswer)}`;
+            params += `&answer_episode=${encodeURIComponent(currentEpisode || '')}`;
+        }
         
         if (guessEpisode && guessEpisode.value) {
             params += `&guess_episode=${encodeURIComponent(guessEpisode.value)}`;
@@ -215,18 +332,33 @@ async function submitAnswer() {
             method: 'POST'
         });
         const data = await response.json();
+        currentAnswer = data.actual_character;
+        currentEpisode = data.actual_episode;
+        if (data.actual_season !== undefined) currentSeason = data.actual_season;
 
         // Both character AND episode must be correct for streak
         const isCorrect = data.character_correct && data.episode_correct;
         
-        if (isCorrect) {
+        if (data.scored === false) {
+            // Practice round (the page's first quote): graded, but not scored
+        } else if (data.streak !== undefined) {
+            // Session rounds: the server keeps score (shared by every worker),
+            // added to the streak carried over from before the session
+            if (data.streak === 0) streakOffset = 0;
+            currentStreak = streakOffset + data.streak;
+            bestStreak = Math.max(bestStreak, currentStreak);
+        } else if (isCorrect) {
             currentStreak++;
             if (currentStreak > bestStreak) {
                 bestStreak = currentStreak;
             }
-            resultDiv.className = 'mt-6 p-4 rounded-lg bg-green-50 border border-green-200';
         } else {
             currentStreak = 0;
+        }
+
+        if (isCorrect) {
+            resultDiv.className = 'mt-6 p-4 rounded-lg bg-green-50 border border-green-200';
+        } else {
             resultDiv.className = 'mt-6 p-4 rounded-lg bg-red-50 border border-red-200';
         }
 